@@ -0,0 +1,112 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+# Bump when the generated data changes so stale cached databases are rebuilt.
+CATALOG_VERSION = 1
+WRITE_BATCH_ROWS = 50_000
+
+PRODUCTS = {
+    "Electronics": ["Headphones", "Smartphone", "Laptop", "Smartwatch", "Bluetooth Speaker", "Tablet"],
+    "Clothing": ["Jacket", "T-Shirt", "Jeans", "Hoodie", "Sneakers", "Raincoat"],
+    "Home": ["Blender", "Coffee Maker", "Desk Lamp", "Air Purifier", "Cookware Set", "Vacuum Cleaner"],
+    "Sports": ["Yoga Mat", "Running Shoes", "Dumbbell Set", "Hiking Backpack", "Tennis Racket", "Cycling Helmet"],
+    "Books": ["Cookbook", "Mystery Novel", "Travel Guide", "Science Fiction Novel", "Biography", "Notebook"],
+}
+BRANDS = ["Samsung", "Sony", "Apple", "Nike", "Adidas", "Philips", "Dell", "Puma", "Bosch", "Lenovo"]
+ADJECTIVES = ["Wireless", "Classic", "Premium", "Compact", "Waterproof", "Lightweight", "Pro", "Eco"]
+COLORS = ["Black", "White", "Blue", "Red", "Green", "Grey"]
+
+
+def catalog_frame(start: int, rows: int, seed: int = 7) -> pd.DataFrame:
+    """Rows `start`..`start + rows` of the synthetic catalog; the same arguments always give the same frame."""
+    rng = np.random.default_rng(seed + start)
+    categories = np.array(list(PRODUCTS))
+    category_idx = rng.integers(0, len(categories), rows)
+    product_idx = rng.integers(0, 6, rows)
+    products = np.array([PRODUCTS[c][i] for c, i in zip(categories[category_idx], product_idx)], dtype=object)
+    brands = np.array(BRANDS, dtype=object)[rng.integers(0, len(BRANDS), rows)]
+    adjectives = np.array(ADJECTIVES, dtype=object)[rng.integers(0, len(ADJECTIVES), rows)]
+    ids = np.arange(start, start + rows)
+
+    names = brands + " " + adjectives + " " + products + " " + ids.astype(str)
+    # A known model line so keyword lookups have matches at every size.
+    names[ids % 97 == 0] = "Samsung Galaxy S21 " + ids[ids % 97 == 0].astype(str)
+
+    return pd.DataFrame({
+        "Product_Name": names,
+        "Category": categories[category_idx],
+        "Brand": brands,
+        "Price": np.round(rng.uniform(5, 2000, rows), 2),
+        "Rating": np.round(rng.uniform(1, 5, rows), 1),
+        "Color": np.array(COLORS, dtype=object)[rng.integers(0, len(COLORS), rows)],
+        "Stock": rng.integers(0, 500, rows),
+    })
+
+
+def catalog_csv(rows: int) -> bytes:
+    """The catalog as an uploadable CSV file."""
+    return pd.concat(
+        [catalog_frame(start, min(WRITE_BATCH_ROWS, rows - start)) for start in range(0, rows, WRITE_BATCH_ROWS)]
+    ).to_csv(index=False).encode("utf-8")
+
+
+def _build(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    try:
+        for start in range(0, rows, WRITE_BATCH_ROWS):
+            catalog_frame(start, min(WRITE_BATCH_ROWS, rows - start)).to_sql(
+                "Ecommerce_Data", conn, if_exists="append", index=False
+            )
+
+        # Existing orders: one per ten products, so the user id seed query scans a real table.
+        order_count = max(1, rows // 10)
+        orders = pd.DataFrame({
+            "order_id": [f"order_{i:010d}" for i in range(order_count)],
+            "product_name": catalog_frame(0, order_count)["Product_Name"],
+            "user_id": np.arange(order_count) // 3 + 10,
+            "is_complaint": 0,
+            "complaint_text": None,
+            "complaint_file_url": None,
+        })
+        conn.execute("""
+            CREATE TABLE orders (
+                order_id VARCHAR(255) PRIMARY KEY,
+                product_name VARCHAR(255) NOT NULL,
+                user_id INT NOT NULL,
+                is_complaint TINYINT(1) DEFAULT 0,
+                complaint_text TEXT,
+                complaint_file_url VARCHAR(500),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        orders.to_sql("orders", conn, if_exists="append", index=False)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def working_database(rows: int) -> str:
+    """
+    A private copy of the cached catalog database with `rows` products.
+    Benchmarks write orders and upload tables, so every run starts from the
+    same pristine file.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    cached = os.path.join(DATA_DIR, f"catalog_v{CATALOG_VERSION}_{rows}.sqlite")
+    if not os.path.exists(cached):
+        partial = cached + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        _build(partial, rows)
+        os.replace(partial, cached)
+
+    fd, path = tempfile.mkstemp(prefix=f"bench_{rows}_", suffix=".sqlite")
+    os.close(fd)
+    shutil.copyfile(cached, path)
+    return path
@@ -0,0 +1,106 @@
+"""
+Import-time profile of the app.
+
+Imports `main` in a fresh interpreter under `python -X importtime` (with the
+benchmark stand-ins, so no credentials or network are needed), then builds
+every registered component the way the startup warm-up does. Reports the
+slowest imports by cumulative and self time and each component's build time:
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --top 40 --output import_profile.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import asyncio, json, sys, time
+from benchmarks import standins
+standins.install(sys.argv[1])
+start = time.perf_counter()
+import main
+import_seconds = time.perf_counter() - start
+from common.registry import registry
+start = time.perf_counter()
+asyncio.run(registry.warm_up())
+print(json.dumps({
+    "import_seconds": round(import_seconds, 3),
+    "warm_up_seconds": round(time.perf_counter() - start, 3),
+    "components": registry.stats(),
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, self ms, cumulative ms) for every line of -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="slowest imports to list")
+    parser.add_argument("--output", help="also write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    fd, db_path = tempfile.mkstemp(prefix="import_profile_", suffix=".sqlite")
+    os.close(fd)
+    try:
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD, db_path],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        os.remove(db_path)
+
+    if child.returncode != 0:
+        print(child.stderr[-4000:], file=sys.stderr)
+        return child.returncode
+
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(child.stderr)
+    app_packages = ("main", "common", "core", "db", "utils")
+
+    print(f"import main: {result['import_seconds']}s   component warm-up: {result['warm_up_seconds']}s\n")
+
+    print(f"Slowest imports by cumulative time (top {args.top}):")
+    for name, self_ms, cumulative_ms in sorted(modules, key=lambda m: -m[2])[:args.top]:
+        print(f"  {cumulative_ms:>9.1f} ms  {name}")
+
+    print(f"\nSlowest imports by self time (top {args.top}):")
+    for name, self_ms, cumulative_ms in sorted(modules, key=lambda m: -m[1])[:args.top]:
+        print(f"  {self_ms:>9.1f} ms  {name}")
+
+    print("\nApp modules (cumulative):")
+    for name, self_ms, cumulative_ms in sorted(modules, key=lambda m: -m[2]):
+        if name.split(".")[0] in app_packages:
+            print(f"  {cumulative_ms:>9.1f} ms  {name}")
+
+    print("\nComponent builds (parallel, including waits on dependencies):")
+    for name, component in sorted(result["components"].items(), key=lambda c: -(c[1]["build_seconds"] or 0)):
+        status = f"error: {component['error']}" if component["error"] else f"{component['build_seconds']}s"
+        print(f"  {name:<28} {status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({**result, "imports": [
+                {"module": name, "self_ms": self_ms, "cumulative_ms": cumulative_ms} for name, self_ms, cumulative_ms in modules
+            ]}, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Offline per-component benchmarks.
+
+Runs the workflow nodes, the order tools, upload ingestion and /ViewData
+against a local SQLite catalog and a deterministic fake chat model, for each
+catalog size in its own process. Results are written as JSON and can be
+compared against an earlier run:
+
+    python -m benchmarks.run --sizes 1000,10000,100000
+    python -m benchmarks.run --sizes 1000,1000000 --repeat 5
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json
+
+benchmarks/results/baseline.json was recorded with the default sizes and
+repeat count; absolute timings are machine-specific, so regenerate it on
+the machine that runs the comparison.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+DEFAULT_SIZES = "1000,10000,100000"
+# Changes smaller than this are treated as timer noise, whatever the ratio.
+# Repeated runs on an unchanged tree differ by up to ~0.8 ms on the
+# millisecond-scale benchmarks.
+NOISE_FLOOR_MS = 1.0
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+def measure(fn, repeat: int) -> dict:
+    """Calls `fn(i)` `repeat` times after one untimed warm-up call (i = -1)."""
+    fn(-1)
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+# --- worker: one catalog size per process --------------------------------------
+
+def run_size(size: int, repeat: int, llm_latency_ms: float) -> dict:
+    from benchmarks import catalog, standins
+
+    db_path = catalog.working_database(size)
+    standins.install(db_path, llm_latency_ms)
+
+    # Imported only after the stand-ins are installed.
+    from fastapi.testclient import TestClient
+
+    import main
+    from common.registry import registry
+    from core.agents import tools
+    from core.search.bm25_index import catalog_search
+    from core.workflow import nodes
+    from core.workflow.query_cache import nl_sql_cache
+    from core.workflow.schema_cache import schema_cache
+    from db.migrations import run_migrations
+
+    loop = asyncio.new_event_loop()
+    run = loop.run_until_complete
+    client = TestClient(main.app)
+    run_migrations()
+
+    results = {}
+    slow_repeat = max(1, min(repeat, 3))
+
+    def bench(name: str, fn, times: int = repeat):
+        results[name] = measure(fn, times)
+        print(f"  {size:>9} {name:<36} median {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    bench("catalog_index.build", lambda i: catalog_search.rebuild(), slow_repeat)
+
+    schema = run(nodes.inspect_schema_node({}))
+    state = {"user_query": "samsung galaxy s21", "session_id": "bench", **schema}
+    select_sql = "SELECT * FROM Ecommerce_Data WHERE Product_Name LIKE '%jacket%' LIMIT 10;"
+    rows = nodes._run_select(select_sql.rstrip(";"))
+
+    bench("node.intent_detector.local", lambda i: run(nodes.intent_detector_node(state)))
+
+    def intent_llm(i):
+        nodes.INTENT_DETECTOR_LLM = True
+        try:
+            run(nodes.intent_detector_node({**state, "user_query": f"show me some good jackets {i}"}))
+        finally:
+            nodes.INTENT_DETECTOR_LLM = False
+
+    bench("node.intent_detector.llm", intent_llm)
+
+    def schema_cold(i):
+        schema_cache.invalidate()
+        run(nodes.inspect_schema_node(state))
+
+    bench("node.inspect_schema.cold", schema_cold)
+    bench("node.inspect_schema.warm", lambda i: run(nodes.inspect_schema_node(state)))
+
+    bench("node.catalog_search.bm25", lambda i: nodes.catalog_search_node(state))
+    bench(
+        "node.catalog_search.semantic",
+        lambda i: nodes.catalog_search_node({**state, "user_query": "warm waterproof jacket for hiking in the rain"}),
+    )
+
+    # Distinct numbers defeat both the NL-to-SQL cache and the LLM response cache.
+    bench(
+        "node.generate_query.cold",
+        lambda i: run(nodes.generate_query_node({**state, "user_query": f"wireless headphones under {100 + i} dollars"})),
+    )
+    nl_sql_cache.store("cheap waterproof jackets", select_sql)
+    bench(
+        "node.generate_query.warm",
+        lambda i: run(nodes.generate_query_node({**state, "user_query": "cheap waterproof jackets"})),
+    )
+
+    bench("node.validate_query", lambda i: nodes.validate_query_node({**state, "sql_query": select_sql}))
+
+    bench(
+        "node.execute_query.cold",
+        lambda i: run(nodes.execute_query_node({**state, "sql_query": select_sql.replace("LIMIT 10", f"LIMIT {20 + i}")})),
+    )
+    bench("node.execute_query.warm", lambda i: run(nodes.execute_query_node({**state, "sql_query": select_sql})))
+
+    bench(
+        "node.format_response.template",
+        lambda i: run(nodes.format_response_node({**state, "user_query": "jackets", "query_results": rows})),
+    )
+    bench(
+        "node.format_response.llm",
+        lambda i: run(nodes.format_response_node({**state, "user_query": f"compare these jackets {i}", "query_results": rows})),
+    )
+
+    def graph_turn(i):
+        config = {"configurable": {"thread_id": f"bench_graph_{i}"}}
+        run(registry.get("recommendation_graph").ainvoke(
+            {"user_query": f"warm jacket under {200 + i} dollars", "session_id": "bench", "node_timings": None},
+            config,
+        ))
+
+    bench("graph.recommendation", graph_turn)
+
+    # Whole /Chat turns, one new session each: through the supervisor's
+    # routing call, and dispatched directly by the pre-router.
+    def chat(query: str):
+        def turn(i):
+            body = client.post("/Chat", params={"query": query}).raise_for_status().json()
+            if not body["response"]:
+                raise RuntimeError(body["message"])
+        return turn
+
+    bench("api.chat.supervisor", chat("samsung galaxy s21"))
+    bench("api.chat.direct", chat("show me samsung laptops"))
+
+    bench("tool.get_next_user_id", lambda i: tools.get_next_user_id())
+    bench(
+        "tool.save_order_tool",
+        lambda i: run(tools.save_order_tool.ainvoke({"order_details": {"product_name": f"Samsung Galaxy S21 {i}"}})),
+    )
+
+    upload = catalog.catalog_csv(size)
+
+    def ingest(i):
+        response = client.post(
+            "/uploadfile/",
+            params={"table_name": "Bench_Upload"},
+            files={"file": ("catalog.csv", upload, "text/csv")},
+        )
+        if not isinstance(response.json(), dict):
+            raise RuntimeError(response.json())
+
+    bench("api.uploadfile", ingest, slow_repeat)
+    bench("api.view_data", lambda i: client.get("/ViewData").raise_for_status())
+
+    loop.close()
+    os.remove(db_path)
+    return results
+
+
+# --- driver ------------------------------------------------------------------
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """(size, benchmark, baseline median, current median) for every median that got slower than allowed."""
+    regressions = []
+    for size, benchmarks in current["results"].items():
+        for name, result in benchmarks.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            before, after = previous["median_ms"], result["median_ms"]
+            if after > before * (1 + threshold) and after - before > NOISE_FLOOR_MS:
+                regressions.append((size, name, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated catalog row counts (1000 to 1000000)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per benchmark")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated latency of each fake LLM call")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<UTC timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown ratio before failing")
+    parser.add_argument("--worker-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker_size:
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(run_size(args.worker_size, args.repeat, args.llm_latency_ms)))
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "llm_latency_ms": args.llm_latency_ms,
+            "git_commit": subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+            ).stdout.strip(),
+        },
+        "results": {},
+    }
+
+    for size in sizes:
+        print(f"[BENCH] Catalog of {size} rows", file=sys.stderr)
+        worker = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.run",
+                "--worker-size", str(size),
+                "--repeat", str(args.repeat),
+                "--llm-latency-ms", str(args.llm_latency_ms),
+            ],
+            cwd=REPO_ROOT,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        if worker.returncode != 0:
+            print(f"[BENCH] Size {size} failed with exit code {worker.returncode}", file=sys.stderr)
+            return worker.returncode
+        report["results"][str(size)] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Results written to {output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for size, name, before, after in regressions:
+            print(f"[BENCH] REGRESSION {size} {name}: {before:.3f} ms -> {after:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"[BENCH] No regressions against {args.baseline}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
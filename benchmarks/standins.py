@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import types
+import uuid
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# Environment the app reads at import time. Responses must come from the fake
+# model on every call, so the LLM response cache keeps no disk tier here.
+BENCH_ENV = {
+    "GROQ_API_KEY": "bench",
+    "OPEN_ROUTER_API_KEY": "bench",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_KEY": "bench",
+    "LLM_CACHE_PATH": "",
+    "CHECKPOINT_SPILL_PATH": "",
+}
+
+
+class BenchChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the provider models. Answers each workflow
+    prompt with a well-formed response derived from the user query, after an
+    optional fixed delay that stands in for network and generation time.
+    """
+
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "bench"
+
+    def bind_tools(self, tools, **kwargs):
+        # Tools are bound as OpenAI-style schemas, as the provider integrations do.
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def respond(self, messages) -> str:
+        prompt = messages[-1].content if isinstance(messages[-1].content, str) else str(messages[-1].content)
+        match = re.search(r"User Query:\s*(.*)", prompt)
+        query = match.group(1).strip() if match else prompt.strip()
+        words = re.findall(r"[a-z0-9]+", query.lower())
+
+        if isinstance(messages[-1], ToolMessage):
+            return prompt
+        if "Return JSON" in prompt:
+            return json.dumps({"clean_query": query, "intent": "semantic_search", "keywords": words})
+        if "Generate the SQL query" in prompt:
+            term = max(words, key=len) if words else ""
+            return f"SELECT * FROM Ecommerce_Data WHERE Product_Name LIKE '%{term}%' LIMIT 10;"
+        if "Format response" in prompt:
+            return f"Here are the products I found for \"{query}\"."
+        return "OK"
+
+    def message(self, messages, tools=None) -> AIMessage:
+        """The supervisor's turns are routed to recommendation_tool; every other call gets a text answer."""
+        names = {tool["function"]["name"] for tool in tools or []}
+        match = re.search(r"Session ID:\s*(.*?)\s*\| User Query:\s*(.*)", str(messages[-1].content))
+        if "recommendation_tool" in names and isinstance(messages[-1], HumanMessage) and match:
+            tool_call = {
+                "name": "recommendation_tool",
+                "args": {"request": match.group(2).strip(), "session_id": match.group(1)},
+                "id": f"call_bench_{uuid.uuid4().hex[:12]}",
+            }
+            return AIMessage(content="", tool_calls=[tool_call])
+        return AIMessage(content=self.respond(messages))
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self.message(messages, tools))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self.message(messages, tools))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        result = await self._agenerate(messages, stop=stop, **kwargs)
+        message = result.generations[0].message
+        if message.tool_calls:
+            chunks = [
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunks))
+            return
+        for word in message.content.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+def _install_llm(latency_ms: float):
+    """Replaces common.llm with the gateway around BenchChatModel, registering the same components."""
+    from common.llm_gateway import GatewayChatModel, ProviderLimiter
+    from common.registry import registry
+
+    module = types.ModuleType("common.llm")
+    module.llm_limiters = {
+        "groq": ProviderLimiter("groq", int(os.getenv("LLM_MAX_CONCURRENCY_GROQ", "4"))),
+        "openrouter": ProviderLimiter("openrouter", int(os.getenv("LLM_MAX_CONCURRENCY_OPENROUTER", "8"))),
+    }
+    for provider, limiter in module.llm_limiters.items():
+        model = GatewayChatModel(inner=BenchChatModel(latency_ms=latency_ms), provider=provider, limiter=limiter)
+        registry.register("groq_model" if provider == "groq" else "gemini_model", lambda model=model: model)
+    module.llm_gateway_stats = lambda: {name: limiter.stats() for name, limiter in module.llm_limiters.items()}
+    sys.modules["common.llm"] = module
+
+
+def _install_supabase():
+    """Supabase client whose uploads return a local URL without leaving the process."""
+
+    class Bucket:
+        def __init__(self, name):
+            self.name = name
+
+        def upload(self, path, data, *args, **kwargs):
+            while hasattr(data, "read") and data.read(64 * 1024):
+                pass
+            return {"path": path}
+
+        def get_public_url(self, path):
+            return f"http://localhost/storage/{self.name}/{path}"
+
+    class Storage:
+        def from_(self, name):
+            return Bucket(name)
+
+    class Client:
+        storage = Storage()
+
+    module = types.ModuleType("supabase")
+    module.create_client = lambda *args, **kwargs: Client()
+    module.Client = Client
+    sys.modules["supabase"] = module
+
+
+def install(db_path: str, llm_latency_ms: float = 0.0):
+    """Must run before any app module is imported."""
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    _install_supabase()
+    _install_llm(llm_latency_ms)
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional TTL and an optional byte budget.
+    `sizeof` estimates an entry's size; when set, entries are evicted until
+    the total stays under `max_bytes` (entries larger than the budget are not stored).
+    """
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = None, max_bytes: int = None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
+
+    def _drop(self, key):
+        _, _, size = self._data.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, stored_at, _ = item
+            if self._expired(stored_at):
+                self._drop(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+
+            self._data[key] = (value, time.monotonic(), size)
+            self.total_bytes += size
+
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def items(self):
+        """Snapshot of live (key, value) pairs, oldest first. Does not touch LRU order or counters."""
+        with self._lock:
+            return [(k, v) for k, (v, stored_at, _) in self._data.items() if not self._expired(stored_at)]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,268 @@
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.store.memory import InMemoryStore
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """
+    InMemorySaver with a cap on resident threads (sessions) and serialized bytes.
+    Threads are kept in LRU order; idle threads past `ttl_seconds` and the
+    least recently used ones beyond either cap are evicted as a whole. With
+    `spill_path` set, evicted threads are written to a local SQLite file and
+    loaded back transparently on their next access; otherwise they are dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_sessions: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 6 * 3600,
+        spill_path: str = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.name = name
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_path = spill_path
+
+        self._lock = threading.RLock()
+        # thread_id -> {"bytes", "last_used", "writes", "blobs"}; the key sets
+        # make evicting one thread independent of the total number of keys.
+        self._threads = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = {"ttl": 0, "sessions": 0, "bytes": 0}
+        self.spills = 0
+        self.restores = 0
+
+        self._spill = None
+        if spill_path:
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False)
+            self._spill.execute("""
+                CREATE TABLE IF NOT EXISTS spilled_threads (
+                    saver TEXT NOT NULL,
+                    thread_id TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    spilled_at REAL NOT NULL,
+                    PRIMARY KEY (saver, thread_id)
+                )
+            """)
+            self._spill.commit()
+
+    # --- bookkeeping -------------------------------------------------------
+
+    def _touch(self, thread_id: str) -> dict:
+        """Marks the thread as most recently used, restoring it from the spill file if needed."""
+        entry = self._threads.get(thread_id)
+        if entry is None:
+            entry = {"bytes": 0, "last_used": 0.0, "writes": set(), "blobs": set()}
+            self._threads[thread_id] = entry
+            if self._spill is not None:
+                self._restore(thread_id, entry)
+        else:
+            self._threads.move_to_end(thread_id)
+        entry["last_used"] = time.monotonic()
+        return entry
+
+    def _resize(self, entry: dict, delta: int):
+        entry["bytes"] += delta
+        self.total_bytes += delta
+
+    def _drop(self, thread_id: str) -> dict:
+        """Removes a thread from memory and returns its raw entries."""
+        entry = self._threads.pop(thread_id)
+        self.total_bytes -= entry["bytes"]
+        return {
+            "storage": {ns: dict(checkpoints) for ns, checkpoints in self.storage.pop(thread_id, {}).items()},
+            "writes": {key: self.writes.pop(key) for key in entry["writes"] if key in self.writes},
+            "blobs": {key: self.blobs.pop(key) for key in entry["blobs"] if key in self.blobs},
+            "bytes": entry["bytes"],
+        }
+
+    def _evict(self, thread_id: str, reason: str):
+        data = self._drop(thread_id)
+        self.evictions[reason] += 1
+        if self._spill is not None and data["storage"]:
+            self._spill.execute(
+                "INSERT OR REPLACE INTO spilled_threads (saver, thread_id, payload, spilled_at) VALUES (?, ?, ?, ?)",
+                (self.name, thread_id, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), time.time()),
+            )
+            self._spill.commit()
+            self.spills += 1
+
+    def _restore(self, thread_id: str, entry: dict):
+        row = self._spill.execute(
+            "SELECT payload FROM spilled_threads WHERE saver = ? AND thread_id = ?", (self.name, thread_id)
+        ).fetchone()
+        if row is None:
+            return
+
+        data = pickle.loads(row[0])
+        for ns, checkpoints in data["storage"].items():
+            self.storage[thread_id][ns].update(checkpoints)
+        self.writes.update(data["writes"])
+        self.blobs.update(data["blobs"])
+        entry["writes"].update(data["writes"])
+        entry["blobs"].update(data["blobs"])
+        self._resize(entry, data["bytes"])
+
+        self._spill.execute("DELETE FROM spilled_threads WHERE saver = ? AND thread_id = ?", (self.name, thread_id))
+        self._spill.commit()
+        self.restores += 1
+
+    def _enforce_limits(self, current: str):
+        """Evicts expired threads, then LRU threads over either cap. Never evicts `current`."""
+        now = time.monotonic()
+        while self._threads:
+            thread_id, entry = next(iter(self._threads.items()))
+            if thread_id == current or now - entry["last_used"] < self.ttl_seconds:
+                break
+            self._evict(thread_id, "ttl")
+
+        while len(self._threads) > self.max_sessions or self.total_bytes > self.max_bytes:
+            thread_id = next(iter(self._threads))
+            if thread_id == current:
+                break
+            self._evict(thread_id, "sessions" if len(self._threads) > self.max_sessions else "bytes")
+
+    # --- BaseCheckpointSaver -------------------------------------------------
+
+    def get_tuple(self, config):
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            if config:
+                self._touch(config["configurable"]["thread_id"])
+            # Materialized so the lock is not held across the caller's iteration.
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def get_delta_channel_history(self, *, config, channels):
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            return super().get_delta_channel_history(config=config, channels=channels)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        with self._lock:
+            entry = self._touch(thread_id)
+            blob_keys = [(thread_id, checkpoint_ns, k, v) for k, v in new_versions.items()]
+            replaced = sum(len(self.blobs[key][1]) for key in blob_keys if key in self.blobs)
+
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            added = sum(len(self.blobs[key][1]) for key in blob_keys) + len(saved[1]) + len(saved_metadata[1])
+            entry["blobs"].update(blob_keys)
+            self._resize(entry, added - replaced)
+
+            self._enforce_limits(thread_id)
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+
+        def size():
+            return sum(len(value[2][1]) for value in self.writes.get(outer_key, {}).values())
+
+        with self._lock:
+            entry = self._touch(thread_id)
+            before = size()
+            super().put_writes(config, writes, task_id, task_path)
+            entry["writes"].add(outer_key)
+            self._resize(entry, size() - before)
+
+            self._enforce_limits(thread_id)
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            if thread_id in self._threads:
+                self._drop(thread_id)
+            self.storage.pop(thread_id, None)
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM spilled_threads WHERE saver = ? AND thread_id = ?", (self.name, thread_id))
+                self._spill.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            spilled = 0
+            if self._spill is not None:
+                spilled = self._spill.execute(
+                    "SELECT COUNT(*) FROM spilled_threads WHERE saver = ?", (self.name,)
+                ).fetchone()[0]
+            return {
+                "resident_sessions": len(self._threads),
+                "resident_bytes": self.total_bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": dict(self.evictions),
+                "spilled_sessions": spilled,
+                "spills": self.spills,
+                "restores": self.restores,
+            }
+
+
+class BoundedInMemoryStore(InMemoryStore):
+    """
+    InMemoryStore with a cap on namespaces (one per session or user) and an
+    idle TTL, like BoundedInMemorySaver. Namespaces are kept in order of their
+    last write; expired ones and the least recently written beyond
+    `max_namespaces` are dropped as a whole, items and vectors together.
+    """
+
+    def __init__(self, max_namespaces: int = 1000, ttl_seconds: float = 6 * 3600, **kwargs):
+        super().__init__(**kwargs)
+        self.max_namespaces = max_namespaces
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._written = OrderedDict()  # namespace -> monotonic time of the last write
+        self.evictions = {"ttl": 0, "namespaces": 0}
+
+    def _apply_put_ops(self, put_ops):
+        with self._lock:
+            super()._apply_put_ops(put_ops)
+            now = time.monotonic()
+            for namespace, _ in put_ops:
+                self._written[namespace] = now
+                self._written.move_to_end(namespace)
+            self._enforce_limits(now)
+
+    def _enforce_limits(self, now: float):
+        while self._written:
+            namespace, last_write = next(iter(self._written.items()))
+            if now - last_write >= self.ttl_seconds:
+                reason = "ttl"
+            elif len(self._written) > self.max_namespaces:
+                reason = "namespaces"
+            else:
+                break
+            del self._written[namespace]
+            self._data.pop(namespace, None)
+            self._vectors.pop(namespace, None)
+            self.evictions[reason] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "namespaces": len(self._written),
+                "items": sum(len(items) for items in self._data.values()),
+                "max_namespaces": self.max_namespaces,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": dict(self.evictions),
+            }
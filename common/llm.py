@@ -1,7 +1,8 @@
 import os
-from langchain_openai import ChatOpenAI
+import httpx
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+
+from common.registry import registry
 
 load_dotenv()
 
@@ -13,19 +14,73 @@ if not GROQ_API_KEY:
         "Please set it in your Hugging Face Space settings under 'Variables and secrets'."
     )
 
-groq_model = ChatGroq(
-    model="moonshotai/kimi-k2-instruct-0905",
-    api_key=GROQ_API_KEY,
-    temperature=0.3
-)
+# Concurrent upstream calls per provider; further calls queue in the gateway.
+LLM_MAX_CONCURRENCY_GROQ = int(os.getenv("LLM_MAX_CONCURRENCY_GROQ", "4"))
+LLM_MAX_CONCURRENCY_OPENROUTER = int(os.getenv("LLM_MAX_CONCURRENCY_OPENROUTER", "8"))
+LLM_COALESCE = os.getenv("LLM_COALESCE", "true").lower() == "true"
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+
+# provider -> ProviderLimiter, filled in as the models are built.
+llm_limiters = {}
+
+
+def http_clients(max_concurrency: int):
+    """Sync and async clients with a keep-alive pool sized to the provider's cap."""
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    return (
+        httpx.Client(limits=limits, timeout=LLM_HTTP_TIMEOUT),
+        httpx.AsyncClient(limits=limits, timeout=LLM_HTTP_TIMEOUT),
+    )
+
+
+# The provider SDKs are imported by the factories: they are the slowest
+# imports in the app, and only needed once a model is built.
+
+def build_groq_model():
+    from langchain_groq import ChatGroq
+    from common.llm_gateway import GatewayChatModel, ProviderLimiter
+
+    llm_limiters["groq"] = ProviderLimiter("groq", LLM_MAX_CONCURRENCY_GROQ)
+    http_client, async_http_client = http_clients(LLM_MAX_CONCURRENCY_GROQ)
+    return GatewayChatModel(
+        inner=ChatGroq(
+            model="moonshotai/kimi-k2-instruct-0905",
+            api_key=GROQ_API_KEY,
+            temperature=0.3,
+            http_client=http_client,
+            http_async_client=async_http_client,
+        ),
+        provider="groq",
+        limiter=llm_limiters["groq"],
+        coalesce=LLM_COALESCE,
+    )
+
+
+def build_gemini_model():
+    from langchain_openai import ChatOpenAI
+    from common.llm_gateway import GatewayChatModel, ProviderLimiter
+
+    llm_limiters["openrouter"] = ProviderLimiter("openrouter", LLM_MAX_CONCURRENCY_OPENROUTER)
+    http_client, async_http_client = http_clients(LLM_MAX_CONCURRENCY_OPENROUTER)
+    return GatewayChatModel(
+        inner=ChatOpenAI(
+            # model="google/gemini-2.0-flash-lite-001",
+            model = "deepseek/deepseek-v3.2",
+            api_key=os.getenv("OPEN_ROUTER_API_KEY"),
+            base_url="https://openrouter.ai/api/v1",
+            temperature=0.3,
+            http_client=http_client,
+            http_async_client=async_http_client,
+        ),
+        provider="openrouter",
+        limiter=llm_limiters["openrouter"],
+        coalesce=LLM_COALESCE,
+    )
+
 
+registry.register("groq_model", build_groq_model)
+registry.register("gemini_model", build_gemini_model)
 
 
-openrouter_api_key = os.getenv("OPEN_ROUTER_API_KEY")
-gemini_model = ChatOpenAI(
-    # model="google/gemini-2.0-flash-lite-001",
-    model = "deepseek/deepseek-v3.2",
-    api_key=openrouter_api_key,
-    base_url="https://openrouter.ai/api/v1",
-    temperature=0.3,
-)
\ No newline at end of file
+def llm_gateway_stats() -> dict:
+    return {provider: limiter.stats() for provider, limiter in llm_limiters.items()}
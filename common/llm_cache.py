@@ -0,0 +1,164 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation
+
+from common.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+# SQLite file for the disk tier; empty keeps the cache in memory only.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+
+# Only generation and message classes are revived from the disk tier.
+ALLOWED_OBJECTS = [Generation, ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """`llm_string` identifies the model and its parameters (temperature included)."""
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+    """Disk tier: serialized generations with an expiry time, shared by all node caches."""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                generations TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("DELETE FROM llm_responses WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generations FROM llm_responses WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, generations: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, generations, expires_at) VALUES (?, ?, ?)",
+                (key, generations, time.time() + self.ttl_seconds),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain response cache for one workflow node: an in-process LRU tier in
+    front of the shared SQLite tier. Disk hits are promoted to memory.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, disk: SQLiteResponseStore = None):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = cache_key(prompt, llm_string)
+
+        generations = self.memory.get(key)
+        if generations is not None:
+            self.memory_hits += 1
+            return generations
+
+        if self.disk is not None:
+            try:
+                stored = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"[LLM_CACHE] Disk lookup failed: {e}")
+                stored = None
+            if stored is not None:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", LangChainBetaWarning)
+                    generations = loads(stored, allowed_objects=ALLOWED_OBJECTS)
+                self.memory.put(key, generations)
+                self.disk_hits += 1
+                return generations
+
+        self.misses += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        key = cache_key(prompt, llm_string)
+        self.memory.put(key, return_val)
+        self.writes += 1
+
+        if self.disk is not None:
+            try:
+                self.disk.put(key, dumps(return_val))
+            except sqlite3.Error as e:
+                logger.warning(f"[LLM_CACHE] Disk write failed: {e}")
+
+    def clear(self, **kwargs):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+        }
+
+
+_disk_store = None
+llm_caches = {}
+
+
+def llm_cache_for(name: str) -> LLMResponseCache:
+    """The response cache for a node, created on first use."""
+    global _disk_store
+
+    if name not in llm_caches:
+        if LLM_CACHE_PATH and _disk_store is None:
+            _disk_store = SQLiteResponseStore(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS)
+        llm_caches[name] = LLMResponseCache(
+            name,
+            LRUCache(maxsize=LLM_CACHE_SIZE, ttl_seconds=LLM_CACHE_TTL_SECONDS),
+            _disk_store,
+        )
+    return llm_caches[name]
+
+
+def cached_model(model, name: str):
+    """A copy of `model` whose responses go through the named node cache."""
+    return model.model_copy(update={"cache": llm_cache_for(name)})
+
+
+def llm_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in llm_caches.items()}
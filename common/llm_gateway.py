@@ -0,0 +1,249 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from pydantic import ConfigDict, PrivateAttr
+
+from common.telemetry import record_llm_usage, record_span, span
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderLimiter:
+    """
+    Concurrency cap and queue metrics for one LLM provider. Calls beyond
+    `max_concurrency` wait in FIFO order; async and sync callers have
+    separate slots of the same size.
+    """
+
+    def __init__(self, provider: str, max_concurrency: int):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self._async_slots = asyncio.Semaphore(max_concurrency)
+        self._sync_slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.max_queued = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _enqueue(self):
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+    def _start(self, waited: float):
+        record_span("llm_queue", self.provider, waited)
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+            self.calls += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def _finish(self, failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.errors += 1
+
+    @asynccontextmanager
+    async def aslot(self):
+        self._enqueue()
+        start = time.perf_counter()
+        try:
+            await self._async_slots.acquire()
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        self._start(time.perf_counter() - start)
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._finish(failed)
+            self._async_slots.release()
+
+    @contextmanager
+    def slot(self):
+        self._enqueue()
+        start = time.perf_counter()
+        self._sync_slots.acquire()
+        self._start(time.perf_counter() - start)
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._finish(failed)
+            self._sync_slots.release()
+
+    def record_coalesced(self):
+        with self._lock:
+            self.coalesced += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queued,
+                "max_queue_depth": self.max_queued,
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "avg_wait_ms": round(self.wait_total / self.calls * 1000, 2) if self.calls else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 2),
+            }
+
+
+def request_key(provider: str, params: dict, messages: list, stop, kwargs: dict) -> str:
+    """Identical provider, model parameters, messages, stop words and bound tools give the same key."""
+    # Message ids are per-run uuids (LangGraph assigns one to every message), not content.
+    dumped = [{k: v for k, v in message.model_dump().items() if k != "id"} for message in messages]
+    payload = json.dumps(
+        [provider, params, dumped, stop, kwargs],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GatewayChatModel(BaseChatModel):
+    """
+    Wraps a provider chat model. Identical requests that are already in
+    flight share one upstream call (single-flight), and all calls pass
+    through the provider's limiter. Streaming calls are limited but not
+    coalesced, since each caller consumes its own token stream.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    provider: str
+    limiter: Any
+    coalesce: bool = True
+
+    # In-flight requests by request_key. model_copy() shares these, so a copy
+    # with a response cache attached still coalesces with the original.
+    _inflight: dict = PrivateAttr(default_factory=dict)
+    _sync_inflight: dict = PrivateAttr(default_factory=dict)
+    _sync_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"gateway-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"provider": self.provider, **self.inner._identifying_params}
+
+    def bind_tools(self, tools, **kwargs):
+        # Let the provider model format the tools, then bind the same
+        # request kwargs to the gateway so calls still go through it.
+        binding = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+
+    def _key(self, messages, stop, kwargs) -> str:
+        return request_key(self.provider, self.inner._identifying_params, messages, stop, kwargs)
+
+    @property
+    def upstream_model(self) -> str:
+        return self.inner._identifying_params.get("model_name") or self.inner._llm_type
+
+    def _record_usage(self, result):
+        for generation in result.generations:
+            record_llm_usage(self.provider, self.upstream_model, getattr(generation.message, "usage_metadata", None))
+
+    async def _call(self, messages, stop, kwargs):
+        async with self.limiter.aslot():
+            with span("llm", f"{self.provider}/{self.upstream_model}"):
+                result = await self.inner._agenerate(messages, stop=stop, **kwargs)
+        self._record_usage(result)
+        return result
+
+    def _call_sync(self, messages, stop, kwargs):
+        with self.limiter.slot():
+            with span("llm", f"{self.provider}/{self.upstream_model}"):
+                result = self.inner._generate(messages, stop=stop, **kwargs)
+        self._record_usage(result)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if not self.coalesce:
+            return await self._call(messages, stop, kwargs)
+
+        key = self._key(messages, stop, kwargs)
+        loop = asyncio.get_running_loop()
+        call = self._inflight.get(key)
+        if call is not None and call.get_loop() is loop:
+            self.limiter.record_coalesced()
+        else:
+            # The upstream call is its own task, shielded from every caller:
+            # a cancelled caller (client gone) neither cancels it nor fails
+            # the other callers waiting on it.
+            call = loop.create_task(self._call(messages, stop, kwargs))
+            self._inflight[key] = call
+            call.add_done_callback(functools.partial(self._call_done, key))
+        return await asyncio.shield(call)
+
+    def _call_done(self, key: str, call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        if not call.cancelled():
+            # Marks the exception retrieved when every caller has gone away.
+            call.exception()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if not self.coalesce:
+            return self._call_sync(messages, stop, kwargs)
+
+        key = self._key(messages, stop, kwargs)
+        with self._sync_lock:
+            leader = self._sync_inflight.get(key)
+            if leader is None:
+                future = Future()
+                self._sync_inflight[key] = future
+
+        if leader is not None:
+            self.limiter.record_coalesced()
+            return leader.result()
+
+        try:
+            result = self._call_sync(messages, stop, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._sync_lock:
+                self._sync_inflight.pop(key, None)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self.limiter.aslot():
+            with span("llm", f"{self.provider}/{self.upstream_model}", streamed=True):
+                async for chunk in self.inner._astream(messages, stop=stop, **kwargs):
+                    record_llm_usage(self.provider, self.upstream_model, getattr(chunk.message, "usage_metadata", None))
+                    yield chunk
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        with self.limiter.slot():
+            with span("llm", f"{self.provider}/{self.upstream_model}", streamed=True):
+                for chunk in self.inner._stream(messages, stop=stop, **kwargs):
+                    record_llm_usage(self.provider, self.upstream_model, getattr(chunk.message, "usage_metadata", None))
+                    yield chunk
@@ -0,0 +1,76 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def process_start_time() -> float:
+    """Wall-clock time the process started (from /proc on Linux); falls back to now."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesized command name; starttime is field 22 overall.
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class Readiness:
+    """
+    Startup phases and their durations, from process start to the point the
+    app is ready to serve. Backs /ready.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.process_started_at = process_start_time()
+        self.phases = {}
+        self.errors = {}
+        self.ready_at = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times a startup step. A failure is recorded but not raised; the app starts degraded."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.errors[name] = str(e)
+            logger.error(f"[STARTUP] {name} failed: {e}")
+        finally:
+            with self._lock:
+                self.phases[name] = round(time.perf_counter() - start, 3)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = round(seconds, 3)
+
+    def mark_ready(self):
+        self.ready_at = time.time()
+        logger.info(
+            f"[STARTUP] Ready {self.ready_at - self.process_started_at:.2f}s after process start "
+            + " ".join(f"{name}={seconds}s" for name, seconds in self.phases.items())
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        return self.ready_at is not None and not self.errors
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.is_ready,
+                "seconds_to_ready": round(self.ready_at - self.process_started_at, 3) if self.ready_at else None,
+                "uptime_seconds": round(time.time() - self.process_started_at, 3),
+                "phases": dict(self.phases),
+                "errors": dict(self.errors),
+            }
+
+
+readiness = Readiness()
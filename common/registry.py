@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# blocking   - startup waits for every component before reporting ready
+# background - components build alongside and after startup; early requests
+#              wait only for what they use
+# off        - each component is built by its first request
+COMPONENT_WARMUP = os.getenv("COMPONENT_WARMUP", "background").lower()
+
+
+class ComponentRegistry:
+    """
+    Heavy objects (LLM clients, agents, the compiled graph, external clients)
+    registered by name with a factory. Each is built once, on its first get()
+    or during warm_up(); concurrent callers wait for the same build. Factories
+    may get() the components they depend on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._factories = {}
+        self._instances = {}
+        self._build_locks = {}
+        self.build_seconds = {}
+        self.errors = {}
+
+    def register(self, name: str, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._build_locks[name] = threading.Lock()
+            self._instances.pop(name, None)
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._build_locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                try:
+                    self._instances[name] = self._factories[name]()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    raise
+                self.build_seconds[name] = round(time.perf_counter() - start, 3)
+                self.errors.pop(name, None)
+                logger.info(f"[REGISTRY] Built {name} in {self.build_seconds[name]}s")
+            return self._instances[name]
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    async def warm_up(self, names: list = None):
+        """Builds the named components (all by default) in parallel threads; failures are logged, not raised."""
+        names = list(names or self._factories)
+
+        async def build(name):
+            try:
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.error(f"[REGISTRY] Building {name} failed: {e}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(build(name) for name in names))
+        logger.info(f"[REGISTRY] Warmed up {len(names)} components in {time.perf_counter() - start:.2f}s")
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "built": name in self._instances,
+                "build_seconds": self.build_seconds.get(name),
+                "error": self.errors.get(name),
+            }
+            for name in self._factories
+        }
+
+
+registry = ComponentRegistry()
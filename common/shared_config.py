@@ -1,5 +1,24 @@
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.store.memory import InMemoryStore
+import os
 
-checkpointer = InMemorySaver()
-store = InMemoryStore()
\ No newline at end of file
+from common.checkpointer import BoundedInMemorySaver, BoundedInMemoryStore
+
+CHECKPOINT_MAX_SESSIONS = int(os.getenv("CHECKPOINT_MAX_SESSIONS", "1000"))
+CHECKPOINT_MAX_BYTES = int(os.getenv("CHECKPOINT_MAX_BYTES", str(256 * 1024 * 1024)))
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", str(6 * 3600)))
+# Local SQLite file that evicted sessions are spilled to; empty drops them instead.
+CHECKPOINT_SPILL_PATH = os.getenv("CHECKPOINT_SPILL_PATH", "")
+STORE_MAX_NAMESPACES = int(os.getenv("STORE_MAX_NAMESPACES", str(CHECKPOINT_MAX_SESSIONS)))
+
+
+def bounded_saver(name: str) -> BoundedInMemorySaver:
+    return BoundedInMemorySaver(
+        name,
+        max_sessions=CHECKPOINT_MAX_SESSIONS,
+        max_bytes=CHECKPOINT_MAX_BYTES,
+        ttl_seconds=CHECKPOINT_TTL_SECONDS,
+        spill_path=CHECKPOINT_SPILL_PATH or None,
+    )
+
+
+checkpointer = bounded_saver("agents")
+store = BoundedInMemoryStore(max_namespaces=STORE_MAX_NAMESPACES, ttl_seconds=CHECKPOINT_TTL_SECONDS)
@@ -0,0 +1,212 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+TRACE_HISTORY = int(os.getenv("TRACE_HISTORY", "200"))
+MAX_SPANS_PER_TRACE = int(os.getenv("TRACE_MAX_SPANS", "500"))
+
+# LLM calls and uploads take seconds; pool checkouts and cached SQL take microseconds.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+span_seconds = Histogram(
+    "sparkmart_span_seconds",
+    "Duration of instrumented operations",
+    ["kind", "name", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+llm_tokens = Counter("sparkmart_llm_tokens", "LLM tokens by provider, model and direction", ["provider", "model", "direction"])
+db_rows = Counter("sparkmart_db_rows", "Rows returned or affected by SQL statements", ["operation"])
+
+# The trace of the request being served: {"request_id", "session_id", "spans"}.
+# Tasks and DB executor threads started from the request copy the context, so
+# they append to the same trace.
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class TraceLog:
+    """The most recent finished request traces, for /traces."""
+
+    def __init__(self, maxlen: int):
+        self._lock = threading.Lock()
+        self._traces = deque(maxlen=maxlen)
+
+    def add(self, trace: dict):
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, limit: int = 20, session_id: str = None) -> list:
+        with self._lock:
+            traces = list(self._traces)
+        if session_id:
+            traces = [trace for trace in traces if trace.get("session_id") == session_id]
+        return list(reversed(traces[-limit:]))
+
+
+trace_log = TraceLog(TRACE_HISTORY)
+
+
+def start_trace(request_id: str = None, session_id: str = None):
+    """Starts a trace in the current context and returns (trace, token to reset it)."""
+    trace = {"request_id": request_id or uuid.uuid4().hex, "session_id": session_id, "spans": []}
+    return trace, current_trace.set(trace)
+
+
+def bind_session(session_id: str):
+    """Tags the current trace with the chat session once it is known."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace["session_id"] = session_id
+
+
+def record_span(kind: str, name: str, seconds: float, status: str = "ok", **attrs):
+    """Records a finished span in the histogram and in the current trace."""
+    span_seconds.labels(kind, name, status).observe(seconds)
+
+    trace = current_trace.get()
+    if trace is not None:
+        if len(trace["spans"]) < MAX_SPANS_PER_TRACE:
+            trace["spans"].append({"kind": kind, "name": name, "ms": round(seconds * 1000, 2), "status": status, **attrs})
+        logger.debug(
+            f"[SPAN] {kind}:{name} {seconds * 1000:.1f}ms {status} "
+            f"request={trace['request_id']} session={trace['session_id']}"
+        )
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs):
+    """Times the block as one span; the yielded dict can carry extra attributes."""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield attrs
+        status = "ok"
+    finally:
+        record_span(kind, name, time.perf_counter() - start, status, **attrs)
+
+
+def summarize(trace: dict) -> dict:
+    """Total milliseconds and span count per kind, e.g. how much of a turn was LLM vs SQL."""
+    breakdown = {}
+    for item in trace["spans"]:
+        entry = breakdown.setdefault(item["kind"], {"count": 0, "ms": 0.0})
+        entry["count"] += 1
+        entry["ms"] = round(entry["ms"] + item["ms"], 2)
+    return breakdown
+
+
+def record_llm_usage(provider: str, model: str, usage: dict):
+    if not usage:
+        return
+    llm_tokens.labels(provider, model, "input").inc(usage.get("input_tokens", 0))
+    llm_tokens.labels(provider, model, "output").inc(usage.get("output_tokens", 0))
+
+
+def instrument_engine(engine):
+    """Records every statement on `engine` as an "sql" span named by its verb, with row counts."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "unknown"
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        # MySQL reports the buffered row count for SELECTs too; SQLite reports -1.
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        if rows is not None:
+            db_rows.labels(operation).inc(rows)
+        record_span("sql", operation, seconds, rows=rows)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            statement = context.statement or ""
+            operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "unknown"
+            record_span("sql", operation, time.perf_counter() - conn.info["query_start"].pop(), "error")
+
+
+def route_template(scope, root_path: str = "") -> str:
+    """
+    The matched route's path template (e.g. /items/{item_id}), so metric
+    labels stay bounded: files under a mount are labelled by the mount, and
+    anything the router did not match by a fixed "unmatched".
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    mount_path = scope.get("root_path", "")
+    if mount_path != root_path:
+        return f"{mount_path[len(root_path):]}/{{path}}"
+    return "unmatched"
+
+
+class RequestTracingMiddleware:
+    """
+    ASGI middleware: every HTTP request gets a trace and a request id (taken
+    from X-Request-ID when the client sends one, echoed back in the response).
+    The request span ends when the response body is fully sent, so streamed
+    responses are timed to their last chunk.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode() or None
+        session_id = headers.get(b"session-id", b"").decode() or None
+        trace, token = start_trace(request_id, session_id)
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", trace["request_id"].encode())]
+            await send(message)
+
+        root_path = scope.get("root_path", "")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            seconds = time.perf_counter() - start
+            name = f"{scope['method']} {route_template(scope, root_path)}"
+            status = "error" if status_code >= 500 else "ok"
+            span_seconds.labels("request", name, status).observe(seconds)
+            current_trace.reset(token)
+
+            finished = {
+                "request_id": trace["request_id"],
+                "session_id": trace["session_id"],
+                "route": name,
+                "path": scope["path"],
+                "status_code": status_code,
+                "ms": round(seconds * 1000, 2),
+                "breakdown": summarize(trace),
+                "spans": trace["spans"],
+            }
+            trace_log.add(finished)
+            logger.info(
+                f"[REQUEST] {name} {status_code} {finished['ms']}ms request={trace['request_id']} "
+                f"session={trace['session_id']} "
+                + " ".join(f"{kind}={entry['ms']}ms/{entry['count']}" for kind, entry in finished["breakdown"].items())
+            )
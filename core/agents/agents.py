@@ -1,16 +1,17 @@
 import logging
+import time
 import traceback
-from langchain.agents import create_agent
-from langchain_community.agent_toolkits import SQLDatabaseToolkit
-from langchain.tools import tool
+from langchain_core.tools import tool
 
-from common.llm import groq_model, gemini_model
+import common.llm  # registers the LLM components
 from core.prompts.prompts import GENERAL_QUERY_PROMPT, COMPLAINT_HANDLER_PROMPT,PURCHASE_AGENT_PROMPT
 from db.database import db
 from core.agents.tools import save_order_tool
+from common.registry import registry
 from common.shared_config import checkpointer, store
+from common.telemetry import span
 
-from core.workflow.recommendation_graph import recommendation_graph
+from core.workflow.recommendation_graph import graph_timings
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,36 +19,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-toolkit = SQLDatabaseToolkit(db=db, llm=gemini_model)
-complaint_tools = toolkit.get_tools() + [save_order_tool]
 
-general_query_agent = create_agent(
-    gemini_model,
-    tools=[],
-    checkpointer=checkpointer,
-    store=store,
-    system_prompt=GENERAL_QUERY_PROMPT
-)
+# Agents are built by the component registry on first use or during startup
+# warm-up. langchain.agents and the SQL toolkit are imported here, not at module
+# level, so importing this module stays cheap.
 
-complain_handler_agent = create_agent(
-    gemini_model,
-    tools=complaint_tools,
-    checkpointer=checkpointer,
-    store=store,
-    system_prompt=COMPLAINT_HANDLER_PROMPT
-)
+def _build_agent(agent_name: str, tools: list, system_prompt: str):
+    from langchain.agents import create_agent
+    from core.agents.history import history_middleware
+    from core.agents.spans import ToolSpanMiddleware
+
+    return create_agent(
+        registry.get("gemini_model"),
+        tools=tools,
+        checkpointer=checkpointer,
+        store=store,
+        system_prompt=system_prompt,
+        middleware=[history_middleware(agent_name), ToolSpanMiddleware(agent_name)],
+    )
+
+
+def build_general_query_agent():
+    return _build_agent("general_query", [], GENERAL_QUERY_PROMPT)
+
+
+def build_complain_handler_agent():
+    from langchain_community.agent_toolkits import SQLDatabaseToolkit
+
+    toolkit = SQLDatabaseToolkit(db=db, llm=registry.get("gemini_model"))
+    complaint_tools = toolkit.get_tools() + [save_order_tool]
+    return _build_agent("complaint", complaint_tools, COMPLAINT_HANDLER_PROMPT)
 
-purchase_agent = create_agent(
-    gemini_model,
-    tools=[save_order_tool],
-    checkpointer=checkpointer,
-    store=store,
-    system_prompt=PURCHASE_AGENT_PROMPT
-)
+
+def build_purchase_agent():
+    return _build_agent("purchase", [save_order_tool], PURCHASE_AGENT_PROMPT)
+
+
+registry.register("general_query_agent", build_general_query_agent)
+registry.register("complain_handler_agent", build_complain_handler_agent)
+registry.register("purchase_agent", build_purchase_agent)
 
 
 @tool("general_query_tool")
-def general_query_tool(request: str, session_id: str) -> str:
+async def general_query_tool(request: str, session_id: str) -> str:
     """
     Handle general customer queries such as greetings, store info,
     policies, and non-specific questions.
@@ -58,10 +72,11 @@ def general_query_tool(request: str, session_id: str) -> str:
     logger.info(f"[GENERAL_QUERY] Session: {session_id} | Request: {request[:100]}")
 
     try:
-        result = general_query_agent.invoke(
-            {"messages": [{"role": "user", "content": request}]},
-            {"configurable": {"thread_id": session_id}}
-        )
+        with span("agent", "general_query"):
+            result = await registry.get("general_query_agent").ainvoke(
+                {"messages": [{"role": "user", "content": request}]},
+                {"configurable": {"thread_id": session_id}}
+            )
         response = result["messages"][-1].content
         logger.info(f"[GENERAL_QUERY] Response generated successfully")
         return response
@@ -73,7 +88,7 @@ def general_query_tool(request: str, session_id: str) -> str:
 
 
 @tool("recommendation_tool")
-def recommendation_tool(request: str, session_id: str) -> str:
+async def recommendation_tool(request: str, session_id: str) -> str:
     """
     Handle product recommendations, searches, filtering, and guiding users
     to select/purchase items.
@@ -96,16 +111,22 @@ def recommendation_tool(request: str, session_id: str) -> str:
             "intent": "",
             "keywords": [],
             "sql_query": "",
+            "search_source": "",
+            "candidate_products": [],
             "validation_errors": [],
             "query_results": [],
             "formatted_response": "",
-            "error_message": ""
+            "error_message": "",
+            "node_timings": None
         }
 
         logger.info("[RECOMMENDATION_GRAPH] Invoking graph workflow with memory...")
 
         config = {"configurable": {"thread_id": session_id}}
-        final_state = recommendation_graph.invoke(initial_state, config)
+        start = time.perf_counter()
+        with span("agent", "recommendation_graph"):
+            final_state = await registry.get("recommendation_graph").ainvoke(initial_state, config)
+        graph_timings.record(final_state.get("node_timings") or {}, time.perf_counter() - start)
 
         response_text = final_state.get("formatted_response", "")
 
@@ -140,7 +161,7 @@ def recommendation_tool(request: str, session_id: str) -> str:
 
 
 @tool("purchase_agent_tool")
-def purchase_agent_tool(request: str, session_id: str) -> str:
+async def purchase_agent_tool(request: str, session_id: str) -> str:
     """
     Handle purchase requests and order placement.
     This agent:
@@ -163,10 +184,11 @@ def purchase_agent_tool(request: str, session_id: str) -> str:
     try:
         enhanced_request = f"{request}\n\nSession ID: {session_id}"
 
-        result = purchase_agent.invoke(
-            {"messages": [{"role": "user", "content": enhanced_request}]},
-            {"configurable": {"thread_id": session_id}}
-        )
+        with span("agent", "purchase"):
+            result = await registry.get("purchase_agent").ainvoke(
+                {"messages": [{"role": "user", "content": enhanced_request}]},
+                {"configurable": {"thread_id": session_id}}
+            )
 
         response = result["messages"][-1].content
 
@@ -194,7 +216,7 @@ def purchase_agent_tool(request: str, session_id: str) -> str:
 
 
 @tool("complain_handler_tool")
-def complain_handler_tool(request: str, session_id: str) -> str:
+async def complain_handler_tool(request: str, session_id: str) -> str:
     """
     Handle customer complaints, refund requests, damaged product issues,
     or any order-related concerns.
@@ -217,10 +239,11 @@ def complain_handler_tool(request: str, session_id: str) -> str:
     logger.info("=" * 80)
 
     try:
-        result = complain_handler_agent.invoke(
-            {"messages": [{"role": "user", "content": request}]},
-            {"configurable": {"thread_id": session_id}}
-        )
+        with span("agent", "complaint"):
+            result = await registry.get("complain_handler_agent").ainvoke(
+                {"messages": [{"role": "user", "content": request}]},
+                {"configurable": {"thread_id": session_id}}
+            )
 
         response = result["messages"][-1].content
 
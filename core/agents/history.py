@@ -0,0 +1,198 @@
+import logging
+import os
+import re
+import threading
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "6"))
+
+# Approximate prompt tokens of conversation history each agent may resend per
+# model call (system prompt and tool schemas excluded). The current turn is
+# always kept whole, even when it alone is over budget.
+DEFAULT_TOKEN_BUDGETS = {
+    "supervisor": 1500,
+    "general_query": 2000,
+    "purchase": 3000,
+    "complaint": 4000,
+}
+
+ORDER_ID = re.compile(r"\border_[A-Za-z0-9]+\b")
+USER_ID = re.compile(r"user[ _]?id\W{0,4}(\d+)", re.IGNORECASE)
+BOLD = re.compile(r"\*\*([^*\n]{3,80})\*\*")
+FILE_URL = re.compile(r"(?:FILE_ATTACHED:|FileURL:)\s*(\S+?)\]?(?:\s|$)")
+USER_QUERY = re.compile(r"User Query:\s*(.*?)(?:\s\|\sFileURL:|$)", re.DOTALL)
+
+MAX_FACT_ITEMS = 5
+MAX_QUERY_CHARS = 120
+
+
+def agent_token_budget(agent_name: str) -> int:
+    return int(os.getenv(f"HISTORY_TOKEN_BUDGET_{agent_name.upper()}", str(DEFAULT_TOKEN_BUDGETS[agent_name])))
+
+
+def _text(message) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def _last_unique(values: list, limit: int = MAX_FACT_ITEMS) -> list:
+    seen = []
+    for value in reversed(values):
+        if value not in seen:
+            seen.append(value)
+        if len(seen) == limit:
+            break
+    return list(reversed(seen))
+
+
+def extract_facts(messages: list) -> str:
+    """Order ids, user id, products and attachments mentioned in `messages`, as a short note."""
+    order_ids, user_ids, products, files, queries = [], [], [], [], []
+
+    for message in messages:
+        text = _text(message)
+        order_ids.extend(ORDER_ID.findall(text))
+        user_ids.extend(USER_ID.findall(text))
+        files.extend(FILE_URL.findall(text))
+
+        if isinstance(message, HumanMessage):
+            match = USER_QUERY.search(text)
+            query = (match.group(1) if match else text).strip()
+            if query:
+                queries.append(query[:MAX_QUERY_CHARS])
+        else:
+            products.extend(name.strip() for name in BOLD.findall(text))
+
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                if call["args"].get("product_name"):
+                    products.append(call["args"]["product_name"])
+
+    facts = []
+    if user_ids:
+        facts.append(f"- User ID: {user_ids[-1]}")
+    if order_ids:
+        facts.append(f"- Order IDs: {', '.join(_last_unique(order_ids))}")
+    if products:
+        facts.append(f"- Products discussed (most recent last): {', '.join(_last_unique(products))}")
+    if files:
+        facts.append(f"- Attached files: {', '.join(_last_unique(files))}")
+    if queries:
+        facts.append(f"- Earlier user requests: {' / '.join(_last_unique(queries, 3))}")
+
+    if not facts:
+        return ""
+    return "Facts from earlier in this conversation (older messages are omitted):\n" + "\n".join(facts)
+
+
+class HistoryCompactionMiddleware(AgentMiddleware):
+    """
+    Caps the history sent on each model call: the last `max_turns` turns (a
+    turn starts at a user message) are sent verbatim while they fit in
+    `token_budget`, and everything older is replaced by facts extracted from
+    it, appended to the system prompt. Only the model request is changed; the
+    checkpointed history stays complete.
+    """
+
+    def __init__(self, agent_name: str, max_turns: int = HISTORY_MAX_TURNS, token_budget: int = None):
+        super().__init__()
+        self.agent_name = agent_name
+        self.max_turns = max(1, max_turns)
+        self.token_budget = token_budget if token_budget is not None else agent_token_budget(agent_name)
+        self._lock = threading.Lock()
+        self.model_calls = 0
+        self.compacted_calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @property
+    def name(self) -> str:
+        return f"HistoryCompaction[{self.agent_name}]"
+
+    def compact(self, messages: list):
+        """Returns (messages to send, facts note or "")."""
+        turn_starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        if len(turn_starts) <= 1:
+            return messages, ""
+
+        tokens = [count_tokens_approximately([message]) for message in messages]
+        suffix_tokens = [0] * (len(messages) + 1)
+        for i in range(len(messages) - 1, -1, -1):
+            suffix_tokens[i] = suffix_tokens[i + 1] + tokens[i]
+
+        keep_from = turn_starts[-1]
+        for start in turn_starts[-self.max_turns:]:
+            if suffix_tokens[start] <= self.token_budget:
+                keep_from = start
+                break
+
+        if keep_from == 0:
+            return messages, ""
+        return messages[keep_from:], extract_facts(messages[:keep_from])
+
+    def _apply(self, request):
+        messages, facts = self.compact(request.messages)
+        before = count_tokens_approximately(request.messages)
+        after = before
+
+        if len(messages) < len(request.messages):
+            after = count_tokens_approximately(messages)
+            if facts:
+                after += count_tokens_approximately([facts])
+
+        # Short histories can cost more as facts than verbatim.
+        if after >= before:
+            with self._lock:
+                self.model_calls += 1
+                self.tokens_before += before
+                self.tokens_after += before
+            return request
+
+        with self._lock:
+            self.model_calls += 1
+            self.compacted_calls += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+        system_prompt = request.system_message.content if request.system_message else ""
+        if facts:
+            system_prompt = f"{system_prompt}\n\n{facts}" if system_prompt else facts
+
+        logger.info(f"[HISTORY] {self.agent_name}: sent {len(messages)}/{len(request.messages)} messages, ~{before - after} tokens saved")
+        return request.override(messages=messages, system_message=SystemMessage(content=system_prompt) if system_prompt else None)
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._apply(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._apply(request))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_turns": self.max_turns,
+                "token_budget": self.token_budget,
+                "model_calls": self.model_calls,
+                "compacted_calls": self.compacted_calls,
+                "history_tokens_before": self.tokens_before,
+                "history_tokens_sent": self.tokens_after,
+                "tokens_saved": self.tokens_before - self.tokens_after,
+            }
+
+
+history_middlewares = {}
+
+
+def history_middleware(agent_name: str) -> HistoryCompactionMiddleware:
+    """One middleware per agent, registered for /history_stats."""
+    middleware = HistoryCompactionMiddleware(agent_name)
+    history_middlewares[agent_name] = middleware
+    return middleware
+
+
+def history_stats() -> dict:
+    return {name: middleware.stats() for name, middleware in history_middlewares.items()}
@@ -0,0 +1,23 @@
+from langchain.agents.middleware import AgentMiddleware
+
+from common.telemetry import span
+
+
+class ToolSpanMiddleware(AgentMiddleware):
+    """Records every tool call an agent makes as a "tool" span."""
+
+    def __init__(self, agent_name: str):
+        super().__init__()
+        self.agent_name = agent_name
+
+    @property
+    def name(self) -> str:
+        return f"ToolSpans[{self.agent_name}]"
+
+    def wrap_tool_call(self, request, handler):
+        with span("tool", request.tool_call["name"], agent=self.agent_name):
+            return handler(request)
+
+    async def awrap_tool_call(self, request, handler):
+        with span("tool", request.tool_call["name"], agent=self.agent_name):
+            return await handler(request)
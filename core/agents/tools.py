@@ -1,46 +1,81 @@
 import logging
 import uuid
 import hashlib
-from langchain.tools import tool
+from langchain_core.tools import tool
 from sqlalchemy import text
 
-from db.database import engine
+from db.database import engine, run_db
+from db.id_allocator import user_id_allocator
+from utils.storage import uploads
 
 logger = logging.getLogger(__name__)
 
 
 def get_next_user_id():
     """
-    Get the next available user_id:
-    - First tries to find an available 2-digit number (10-99)
-    - If all 2-digit numbers are taken, moves to 3-digit (100+)
+    Get the next user_id from the user_id sequence:
+    - Numbering starts at 10, so ids are 2-digit (10-99) first
+    - Then continues into 3-digit (100+)
+    Safe across concurrent workers; at most one round trip per reserved block.
     """
-    try:
-        with engine.connect() as conn:
-            query = text("SELECT user_id FROM orders WHERE user_id IS NOT NULL")
-            result = conn.execute(query)
-            existing_ids = set(row[0] for row in result.fetchall())
+    user_id = user_id_allocator.next_id()
+    logger.info(f"Allocated user_id: {user_id}")
+    return user_id
 
-            logger.info(f"Existing user_ids: {existing_ids}")
 
-            for num in range(10, 100):
-                if num not in existing_ids:
-                    logger.info(f"Found available 2-digit user_id: {num}")
-                    return num
-            next_id = 100
-            while next_id in existing_ids:
-                next_id += 1
+def _record_complaint(order_id: str, complaint_text, complaint_file_url) -> bool:
+    """
+    Blocking helper: marks an order as a complaint and, if given, adds the
+    evidence URL to complaint_attachments, both in one transaction.
+    Returns False when no such order exists.
+    """
+    with engine.begin() as conn:
+        update_query = text("""
+            UPDATE orders
+            SET 
+                is_complaint = 1,
+                complaint_text = COALESCE(:complaint_text, complaint_text)
+            WHERE order_id = :order_id
+        """)
+
+        result = conn.execute(update_query, {
+            "complaint_text": complaint_text,
+            "order_id": order_id
+        })
+
+        if result.rowcount == 0:
+            return False
+
+        if complaint_file_url:
+            insert_query = text("""
+                INSERT INTO complaint_attachments (order_id, file_url)
+                VALUES (:order_id, :file_url)
+            """)
+            conn.execute(insert_query, {"order_id": order_id, "file_url": complaint_file_url})
 
-            logger.info(f"All 2-digit IDs taken, using 3-digit user_id: {next_id}")
-            return next_id
+    return True
 
-    except Exception as e:
-        logger.error(f"Error getting next user_id: {e}")
-        return 10
+
+def _insert_order(order_id: str, product_name: str, user_id: int):
+    """
+    Blocking helper: inserts a new order row
+    """
+    with engine.connect() as conn:
+        insert_query = text("""
+            INSERT INTO orders (order_id, product_name,user_id)
+            VALUES (:order_id, :product_name, :user_id)
+        """)
+
+        conn.execute(insert_query, {
+            "order_id": order_id,
+            "product_name": product_name,
+            "user_id": user_id
+        })
+        conn.commit()
 
 
 @tool("save_order_tool")
-def save_order_tool(order_details: dict):
+async def save_order_tool(order_details: dict):
     """
     - Creates new orders (normal purchase)
     - Updates existing orders with complaint details (file + text)
@@ -53,53 +88,29 @@ def save_order_tool(order_details: dict):
     """
 
     product_name = order_details.get("product_name")
-    user_id = get_next_user_id()
     order_id = order_details.get("order_id")
     complaint_text = order_details.get("complaint_text")
     complaint_file_url = order_details.get("complaint_file_url")
 
 
     logger.info(f"save_order_tool called with:")
-    logger.info(f"user_id: {user_id}")
+    logger.info(f"product_name: {product_name}")
     logger.info(f"order_id: {order_id}")
     logger.info(f"complaint_text: {complaint_text}")
     logger.info(f"complaint_file_url: {complaint_file_url}")
 
     if order_id and (complaint_text or complaint_file_url):
+        if complaint_file_url:
+            # The chat turn starts while the attachment is still uploading.
+            upload_error = await uploads.wait(complaint_file_url)
+            if upload_error:
+                logger.error(f"Attachment upload failed for {order_id}: {upload_error}")
+                return f"I could not store the attached file ({upload_error}). Please attach it again."
+
         try:
-            with engine.connect() as conn:
-                check_query = text("""
-                    SELECT complaint_file_url FROM orders 
-                    WHERE order_id = :order_id
-                """)
-                result = conn.execute(check_query, {"order_id": order_id})
-                row = result.fetchone()
-
-                existing_urls = None
-                if row and row[0]:
-                    existing_urls = row[0]
-
-                final_url = complaint_file_url
-                if complaint_file_url and existing_urls:
-                    final_url = f"{existing_urls};{complaint_file_url}"
-                elif not complaint_file_url and existing_urls:
-                    final_url = existing_urls
-
-                update_query = text("""
-                    UPDATE orders
-                    SET 
-                        is_complaint = 1,
-                        complaint_text = COALESCE(:complaint_text, complaint_text),
-                        complaint_file_url = :complaint_file_url
-                    WHERE order_id = :order_id
-                """)
-
-                conn.execute(update_query, {
-                    "complaint_text": complaint_text,
-                    "complaint_file_url": final_url,
-                    "order_id": order_id
-                })
-                conn.commit()
+            found = await run_db(_record_complaint, order_id, complaint_text, complaint_file_url)
+            if not found:
+                return f"I could not find an order with ID `{order_id}`. Please check the Order ID and try again."
 
             file_msg = " with attached evidence" if complaint_file_url else ""
             return f"Complaint recorded for Order `{order_id}`{file_msg}. Our team will review your issue and respond within 24 hours."
@@ -114,18 +125,8 @@ def save_order_tool(order_details: dict):
     generated_order_id = f"order_{uuid.uuid4().hex[:10]}"
     logger.info(f"generated_order_id {generated_order_id}")
     try:
-        with engine.connect() as conn:
-            insert_query = text("""
-                INSERT INTO orders (order_id, product_name,user_id)
-                VALUES (:order_id, :product_name, :user_id)
-            """)
-
-            conn.execute(insert_query, {
-                "order_id": generated_order_id,
-                "product_name": product_name,
-                "user_id": user_id
-            })
-            conn.commit()
+        user_id = await run_db(get_next_user_id)
+        await run_db(_insert_order, generated_order_id, product_name, user_id)
 
         return (
             f"Your order for **{product_name}** has been placed successfully!\n"
@@ -0,0 +1,268 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Optional
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from common.telemetry import bind_session, span
+import core.supervisor_agent  # registers the agents
+from common.registry import registry
+from core.search.bm25_index import catalog_search
+from core.search.tokenizer import tokenize
+from core.workflow.query_cache import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+PRE_ROUTER_ENABLED = os.getenv("PRE_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+GREETING = re.compile(
+    r"(hi|hii+|hello|hey|hiya|good (morning|afternoon|evening)|thanks|thank you|thank you so much|"
+    r"how are you|who are you|what is your name|what can you do)( there)?( sparkmart)?[\s!.,?]*"
+)
+COMPLAINT = re.compile(
+    r"\b(broken|defective|damaged|faulty|refund|complaint|complain|wrong item|not working|"
+    r"stopped working|doesn'?t work|cracked|scratched|missing parts?)\b"
+)
+ORDER_LOOKUP = re.compile(r"\border_[a-z0-9]+\b|\btrack (my|the|this) order\b|\bwhere is my order\b|\border status\b")
+# Anchored and word-bounded, so "buying guide", "buyers", "purchased" and
+# "checkout the new jackets" fall through to the supervisor. "buy"/"purchase"
+# need an object, and "checkout" must be the whole message.
+PURCHASE = re.compile(
+    r"^(i want to buy|i would like to buy|i'd like to buy|i'?ll take|i will take|buy (it|this|that|the|a|an)|"
+    r"purchase (it|this|that|the)|add (it |this |that )?to (my )?cart|"
+    r"(checkout|check out)( (it|this|that|my cart|now))?(?=[\s!.]*$)|"
+    r"order (it|this|that|the)|get me (it|this|that))\b"
+)
+# A purchase phrase that also asks for advice ("i want to buy headphones, what
+# do you recommend") has not picked a product yet.
+UNDECIDED = re.compile(
+    r"\b(recommend\w*|suggest\w*|which|what|any|should|advice|advise|options?|compare|better|or)\b|\?"
+)
+BROWSE = re.compile(
+    r"^(show me|do you have|what do you have|what (products|items|categories)|i'?m looking for|"
+    r"looking for|recommend|suggest|find me)\b"
+)
+CATALOG_WORDS = {"product", "item", "categorie", "category", "deal"}
+# Store and order topics that share browse phrasing ("do you have a refund policy").
+SERVICE_WORDS = {
+    "order", "refund", "return", "policy", "delivery", "shipping", "payment", "account",
+    "warranty", "cancel", "cancellation", "invoice", "store", "support", "complaint",
+}
+
+
+def is_browse(query: str) -> bool:
+    """
+    A browse phrase about something the catalog sells: at least one word is a
+    term in the catalog index (a product, brand or category name). Without a
+    ready index nothing is dispatched as a browse.
+    """
+    if not BROWSE.match(query):
+        return False
+    words = set(tokenize(query)) - STOPWORDS
+    if words & SERVICE_WORDS:
+        return False
+    return bool(words & CATALOG_WORDS) or catalog_search.knows_any(words)
+
+
+# (rule, tool, matcher). A query is dispatched only when every matching rule
+# agrees on the tool; anything else goes to the supervisor.
+RULES = [
+    ("complaint_attachment", "complain_handler_tool", lambda q, has_file: has_file),
+    ("complaint_keywords", "complain_handler_tool", lambda q, has_file: bool(COMPLAINT.search(q))),
+    ("order_lookup", "complain_handler_tool", lambda q, has_file: bool(ORDER_LOOKUP.search(q))),
+    ("purchase_phrase", "purchase_agent_tool", lambda q, has_file: bool(PURCHASE.match(q)) and not UNDECIDED.search(q)),
+    ("greeting", "general_query_tool", lambda q, has_file: bool(GREETING.fullmatch(q))),
+    ("browse_phrase", "recommendation_tool", lambda q, has_file: is_browse(q)),
+]
+
+
+def build_supervisor_input(session_id: str, query: str, file_url: Optional[str] = None) -> str:
+    supervisor_input = f"Session ID: {session_id} | User Query: {query}"
+
+    if file_url:
+        supervisor_input += f" | FileURL: {file_url}"
+
+    return supervisor_input
+
+
+def tool_request(query: str, file_url: Optional[str] = None) -> str:
+    """The request string the supervisor is instructed to pass to a tool."""
+    return f"{query} [FILE_ATTACHED: {file_url}]" if file_url else query
+
+
+class TurnMonitor(AsyncCallbackHandler):
+    """
+    Counts the LLM calls made during one turn, by the supervisor and by the
+    sub-agents, and times the supervisor's first call (its routing decision).
+    """
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.supervisor_calls = 0
+        self._routing_run = None
+        self._routing_start = None
+        self.routing_seconds = None
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self.llm_calls += 1
+        if (metadata or {}).get("checkpoint_ns", "").startswith("tools:"):
+            return
+        self.supervisor_calls += 1
+        if self._routing_run is None:
+            self._routing_run = run_id
+            self._routing_start = time.perf_counter()
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        if run_id == self._routing_run:
+            self.routing_seconds = time.perf_counter() - self._routing_start
+
+
+class TurnStats:
+    """LLM calls and latency per turn, split by whether the supervisor relayed the tool's answer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.modes = {
+            mode: {"turns": 0, "llm_calls": 0, "supervisor_calls": 0, "seconds": 0.0}
+            for mode in ("direct_response", "relayed")
+        }
+
+    def record(self, monitor: TurnMonitor, seconds: float, last_message):
+        mode = "direct_response" if isinstance(last_message, ToolMessage) else "relayed"
+        with self._lock:
+            totals = self.modes[mode]
+            totals["turns"] += 1
+            totals["llm_calls"] += monitor.llm_calls
+            totals["supervisor_calls"] += monitor.supervisor_calls
+            totals["seconds"] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                mode: {
+                    "turns": totals["turns"],
+                    "avg_llm_calls": round(totals["llm_calls"] / totals["turns"], 2) if totals["turns"] else 0.0,
+                    "avg_supervisor_calls": round(totals["supervisor_calls"] / totals["turns"], 2) if totals["turns"] else 0.0,
+                    "avg_turn_ms": round(totals["seconds"] / totals["turns"] * 1000, 1) if totals["turns"] else 0.0,
+                }
+                for mode, totals in self.modes.items()
+            }
+
+
+class PreRouter:
+    """
+    Keyword rules in front of the supervisor. Confident matches skip the
+    supervisor's routing LLM call; the tool call is written into the
+    supervisor's thread and executed from there, so history, sub-agent
+    checkpoints and streaming look exactly like a supervisor-routed turn.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.fallbacks = 0
+        self.route_hits = {rule: 0 for rule, _, _ in RULES}
+        self.route_seconds = {rule: 0.0 for rule, _, _ in RULES}
+        self.routing_calls = 0
+        self.routing_seconds = 0.0
+
+    def route(self, query: str, file_url: Optional[str] = None):
+        """Returns (rule, tool_name) for a confident match, else None."""
+        if not self.enabled:
+            return None
+
+        normalized = " ".join(query.lower().split())
+        matches = [(rule, tool) for rule, tool, matcher in RULES if matcher(normalized, bool(file_url))]
+        if not matches or len({tool for _, tool in matches}) > 1:
+            return None
+        return matches[0]
+
+    async def prepare_direct_turn(self, tool_name: str, supervisor_input: str, request: str, session_id: str):
+        """Appends the user message and the chosen tool call to the supervisor's thread."""
+        tool_call = {
+            "name": tool_name,
+            "args": {"request": request, "session_id": session_id},
+            "id": f"call_router_{uuid.uuid4().hex[:12]}",
+        }
+        await registry.get("supervisor_agent").aupdate_state(
+            {"configurable": {"thread_id": session_id}},
+            {"messages": [HumanMessage(content=supervisor_input), AIMessage(content="", tool_calls=[tool_call])]},
+            as_node="model",
+        )
+
+    def record_direct(self, rule: str, seconds: float):
+        with self._lock:
+            self.turns += 1
+            self.route_hits[rule] += 1
+            self.route_seconds[rule] += seconds
+
+    def record_fallback(self, routing_seconds: Optional[float]):
+        with self._lock:
+            self.turns += 1
+            self.fallbacks += 1
+            if routing_seconds is not None:
+                self.routing_calls += 1
+                self.routing_seconds += routing_seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            direct = self.turns - self.fallbacks
+            avg_routing = self.routing_seconds / self.routing_calls if self.routing_calls else 0.0
+            tools = {rule: tool for rule, tool, _ in RULES}
+            return {
+                "enabled": self.enabled,
+                "turns": self.turns,
+                "direct": direct,
+                "fallbacks": self.fallbacks,
+                "direct_rate": round(direct / self.turns, 3) if self.turns else 0.0,
+                "routes": {
+                    rule: {
+                        "tool": tools[rule],
+                        "hits": hits,
+                        "hit_rate": round(hits / self.turns, 3) if self.turns else 0.0,
+                        "avg_turn_ms": round(self.route_seconds[rule] / hits * 1000, 1) if hits else 0.0,
+                    }
+                    for rule, hits in self.route_hits.items()
+                },
+                # Measured on fallback turns: the supervisor call that picks the tool.
+                "avg_routing_call_ms": round(avg_routing * 1000, 1),
+                "estimated_latency_saved_ms": round(direct * avg_routing * 1000, 1),
+            }
+
+
+pre_router = PreRouter(PRE_ROUTER_ENABLED)
+turn_stats = TurnStats()
+
+
+async def run_chat_turn(session_id: str, query: str, file_url: Optional[str] = None) -> str:
+    """One /Chat turn: direct dispatch when the pre-router is confident, otherwise the supervisor."""
+    supervisor_input = build_supervisor_input(session_id, query, file_url)
+    monitor = TurnMonitor()
+    config = {"configurable": {"thread_id": session_id}, "callbacks": [monitor]}
+    start = time.perf_counter()
+    decision = pre_router.route(query, file_url)
+    bind_session(session_id)
+
+    with span("agent", "supervisor", route="direct" if decision else "supervisor"):
+        if decision:
+            rule, tool_name = decision
+            logger.info(f"[PRE_ROUTER] {rule} -> {tool_name}")
+            await pre_router.prepare_direct_turn(tool_name, supervisor_input, tool_request(query, file_url), session_id)
+            result = await registry.get("supervisor_agent").ainvoke(None, config)
+            pre_router.record_direct(rule, time.perf_counter() - start)
+        else:
+            result = await registry.get("supervisor_agent").ainvoke(
+                {"messages": [{"role": "user", "content": supervisor_input}]},
+                config,
+            )
+            pre_router.record_fallback(monitor.routing_seconds)
+
+    last = result["messages"][-1]
+    turn_stats.record(monitor, time.perf_counter() - start, last)
+    return last.content if hasattr(last, 'content') else str(last)
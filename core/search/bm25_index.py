@@ -0,0 +1,298 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import inspect, text
+
+from db.database import db_executor, engine
+from db.table_versions import add_table_listener, get_table_version
+from core.workflow.query_cache import REFERENTIAL_WORDS, STOPWORDS
+from core.search.tokenizer import tokenize
+from core.search.vector_index import (
+    VECTOR_INDEX_DIM,
+    VECTOR_INDEX_MMAP_DIR,
+    VECTOR_INDEX_QUANTIZE,
+    VECTOR_RETRIEVAL_MODE,
+    VectorIndex,
+)
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLE = "Ecommerce_Data"
+MAX_INDEXED_ROWS = int(os.getenv("CATALOG_INDEX_MAX_ROWS", "200000"))
+LOAD_BATCH_ROWS = 5000
+
+# Queries containing any of these need ranking, comparison or numeric
+# constraints, which only the SQL generator handles.
+NON_LOOKUP_WORDS = {
+    "compare", "comparison", "vs", "versus", "better", "best", "difference",
+    "cheap", "cheapest", "budget", "affordable", "expensive", "premium", "price",
+    "under", "below", "above", "over", "between", "less", "more", "than",
+    "rating", "rated", "top", "recommend", "suggest", "why", "how",
+}
+MAX_LOOKUP_TERMS = 6
+
+
+class BM25Index:
+    """
+    In-memory inverted index over catalog rows with Okapi BM25 ranking.
+    Documents are added in batches, so a rebuild never needs the whole
+    table in one result set. There is no per-row update: the only writers,
+    /uploadfile/ and /ClearData, replace or empty the whole table, so the
+    index is always rebuilt in full.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.rows = {}
+        self.doc_lengths = {}
+        self.postings = defaultdict(dict)
+        self.total_length = 0
+        self.text_columns = None
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _document_terms(self, row: dict) -> list:
+        if self.text_columns is None:
+            self.text_columns = [col for col, value in row.items() if isinstance(value, str)]
+        terms = []
+        for column in self.text_columns:
+            value = row.get(column)
+            if value is not None:
+                terms.extend(tokenize(value))
+        return terms
+
+    def add_documents(self, rows: list) -> list:
+        """Indexes rows and returns their document ids."""
+        doc_ids = []
+        for row in rows:
+            doc_id = self._next_id
+            self._next_id += 1
+            doc_ids.append(doc_id)
+            terms = self._document_terms(row)
+            self.rows[doc_id] = row
+            self.doc_lengths[doc_id] = len(terms)
+            self.total_length += len(terms)
+            for term, freq in Counter(terms).items():
+                self.postings[term][doc_id] = freq
+        return doc_ids
+
+    def search(self, query: str, k: int = 10, require_all_terms: bool = False) -> list:
+        """Returns up to k (score, row) pairs, best first."""
+        terms = [t for t in tokenize(query) if t not in STOPWORDS]
+        if not terms or not self.rows:
+            return []
+
+        n_docs = len(self.rows)
+        avg_length = self.total_length / n_docs if n_docs else 0.0
+        scores = defaultdict(float)
+        matched_terms = defaultdict(int)
+
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                if require_all_terms:
+                    return []
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, freq in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length) if avg_length else self.k1
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+                matched_terms[doc_id] += 1
+
+        needed = len(set(terms)) if require_all_terms else 1
+        ranked = sorted(
+            (doc_id for doc_id in scores if matched_terms[doc_id] >= needed),
+            key=lambda doc_id: scores[doc_id],
+            reverse=True,
+        )
+
+        return [(scores[doc_id], self.rows[doc_id]) for doc_id in ranked[:k]]
+
+
+def is_simple_lookup(user_query: str) -> bool:
+    """True for short keyword lookups such as 'samsung galaxy s21' that need no SQL reasoning."""
+    words = re.findall(r"[a-z0-9]+", user_query.lower())
+    if any(word in REFERENTIAL_WORDS or word in NON_LOOKUP_WORDS for word in words):
+        return False
+    terms = [word for word in words if word not in STOPWORDS]
+    return 0 < len(terms) <= MAX_LOOKUP_TERMS
+
+
+class CatalogSnapshot(NamedTuple):
+    """A BM25 index and the vector index built from the same pass over one table version."""
+
+    index: BM25Index
+    vectors: Optional[VectorIndex]
+    version: int
+
+
+class CatalogSearch:
+    """
+    Owns the BM25 index and the vector index over the catalog table, built
+    from the same pass over the rows. Rebuilds happen on the DB executor, off
+    the request path; both indexes are swapped in together, as one snapshot,
+    only when a rebuild finishes, and are used only while their table
+    version is current. Readers take one reference to the snapshot, so they
+    never pair rows from one catalog version with vectors from another.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.snapshot = None
+        self._rebuild_lock = threading.Lock()
+        self._pending = False
+        self.lookups = 0
+        self.fast_path_hits = 0
+        self.semantic_searches = 0
+        self.last_build_seconds = None
+
+    def _new_vector_index(self, version: int, capacity: int):
+        if VECTOR_RETRIEVAL_MODE == "off":
+            return None
+        mmap_path = None
+        if VECTOR_INDEX_MMAP_DIR:
+            # Unique per build: a rebuild at the same version must not reopen the served index's files.
+            mmap_path = os.path.join(VECTOR_INDEX_MMAP_DIR, f"{self.table_name.lower()}_v{version}_{uuid.uuid4().hex}")
+        return VectorIndex(VECTOR_INDEX_DIM, quantize=VECTOR_INDEX_QUANTIZE, mmap_path=mmap_path, capacity=capacity)
+
+    def _load_into(self, index: BM25Index, version: int):
+        """Fills `index` from the table and returns the matching vector index, or False if unavailable."""
+        with engine.connect() as conn:
+            if not inspect(conn).has_table(self.table_name):
+                return False
+
+            count = conn.execute(text(f"SELECT COUNT(*) FROM {self.table_name}")).scalar()
+            if count > MAX_INDEXED_ROWS:
+                logger.warning(f"[CATALOG_SEARCH] {count} rows exceed CATALOG_INDEX_MAX_ROWS; index disabled")
+                return False
+
+            vectors = self._new_vector_index(version, count)
+
+            result = conn.execution_options(stream_results=True).execute(text(f"SELECT * FROM {self.table_name}"))
+            columns = list(result.keys())
+            for batch in result.partitions(LOAD_BATCH_ROWS):
+                rows = [dict(zip(columns, row)) for row in batch]
+                index.add_documents(rows)
+                if vectors is not None:
+                    vectors.add_documents([
+                        " ".join(str(row[col]) for col in index.text_columns if row.get(col) is not None)
+                        for row in rows
+                    ])
+
+        if vectors is not None:
+            vectors.finalize()
+        return vectors
+
+    def rebuild(self):
+        """Builds a fresh index from the table. Concurrent requests collapse into one follow-up rebuild."""
+        if not self._rebuild_lock.acquire(blocking=False):
+            self._pending = True
+            return
+
+        try:
+            while True:
+                self._pending = False
+                start = time.perf_counter()
+                version = get_table_version(self.table_name)
+                index = BM25Index()
+                previous = self.snapshot
+
+                vectors = self._load_into(index, version)
+                self.snapshot = None if vectors is False else CatalogSnapshot(index, vectors, version)
+
+                previous_vectors = previous.vectors if previous else None
+                current_vectors = self.snapshot.vectors if self.snapshot else None
+                if (
+                    previous_vectors is not None
+                    and previous_vectors is not current_vectors
+                    and previous_vectors.mmap_path != getattr(current_vectors, "mmap_path", None)
+                ):
+                    previous_vectors.remove_files()
+
+                self.last_build_seconds = round(time.perf_counter() - start, 3)
+                logger.info(f"[CATALOG_SEARCH] Indexed {len(index)} rows in {self.last_build_seconds}s")
+
+                if not self._pending:
+                    break
+        except Exception as e:
+            logger.error(f"[CATALOG_SEARCH] Rebuild failed: {e}")
+            self.snapshot = None
+        finally:
+            self._rebuild_lock.release()
+
+    def schedule_rebuild(self):
+        db_executor.submit(self.rebuild)
+
+    def _on_table_change(self, table_name: str, version: int):
+        if table_name == self.table_name.lower():
+            self.schedule_rebuild()
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The snapshot if it matches the table's current version, else None."""
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version != get_table_version(self.table_name):
+            return None
+        return snapshot
+
+    def is_ready(self) -> bool:
+        return self.current() is not None
+
+    def knows_any(self, terms) -> bool:
+        """True when any of the (tokenized) terms occurs in the current catalog."""
+        snapshot = self.current()
+        return snapshot is not None and any(term in snapshot.index.postings for term in terms)
+
+    def lookup(self, user_query: str, k: int = 10):
+        """
+        Fast-path answer for simple keyword lookups: rows containing every
+        query term, BM25-ranked. Returns None when the query should go to SQL.
+        """
+        self.lookups += 1
+        snapshot = self.current()
+        if snapshot is None or not is_simple_lookup(user_query):
+            return None
+
+        matches = snapshot.index.search(user_query, k=k, require_all_terms=True)
+        if not matches:
+            return None
+
+        self.fast_path_hits += 1
+        return [row for _, row in matches]
+
+    def semantic_search(self, user_query: str, k: int = 10) -> list:
+        """(cosine score, row) pairs from the vector index; empty when it is unavailable."""
+        snapshot = self.current()
+        if snapshot is None or snapshot.vectors is None:
+            return []
+
+        self.semantic_searches += 1
+        # BM25 doc ids and vector positions are both assigned in load order.
+        return [(score, snapshot.index.rows[position]) for score, position in snapshot.vectors.search(user_query, k)]
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot
+        return {
+            "ready": self.is_ready(),
+            "documents": len(snapshot.index) if snapshot else 0,
+            "terms": len(snapshot.index.postings) if snapshot else 0,
+            "lookups": self.lookups,
+            "fast_path_hits": self.fast_path_hits,
+            "semantic_searches": self.semantic_searches,
+            "vector_mode": VECTOR_RETRIEVAL_MODE,
+            "vector_bytes": snapshot.vectors.nbytes() if snapshot and snapshot.vectors else 0,
+            "last_build_seconds": self.last_build_seconds,
+        }
+
+
+catalog_search = CatalogSearch(CATALOG_TABLE)
+add_table_listener(catalog_search._on_table_change)
@@ -0,0 +1,11 @@
+import re
+
+
+def tokenize(value) -> list:
+    """Lowercase alphanumeric tokens with a naive plural strip ('headphones' -> 'headphone')."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", str(value).lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
@@ -0,0 +1,196 @@
+import logging
+import os
+import zlib
+
+import numpy as np
+
+from core.search.tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_DIM = int(os.getenv("VECTOR_INDEX_DIM", "256"))
+VECTOR_INDEX_QUANTIZE = os.getenv("VECTOR_INDEX_QUANTIZE", "false").lower() in ("1", "true", "yes")
+# When set, vectors live in .npy files under this directory and are memory-mapped.
+VECTOR_INDEX_MMAP_DIR = os.getenv("VECTOR_INDEX_MMAP_DIR", "")
+
+# off        - no vector retrieval
+# candidates - nearest products are handed to the SQL generator as context
+# replace    - confident vector matches answer the query instead of SQL
+# Off by default: at 200k rows the float32 index holds ~205MB and makes each
+# catalog rebuild about 4x slower (~22s vs ~6s); the int8 index
+# (VECTOR_INDEX_QUANTIZE) holds ~52MB but builds no faster.
+VECTOR_RETRIEVAL_MODE = os.getenv("VECTOR_RETRIEVAL_MODE", "off").lower()
+VECTOR_MIN_SCORE = float(os.getenv("VECTOR_MIN_SCORE", "0.35"))
+
+SEARCH_BLOCK_ROWS = 65536
+CHAR_NGRAM_WEIGHT = 0.5
+
+
+class HashingVectorizer:
+    """
+    Stateless text -> vector mapping: word tokens plus character trigrams,
+    feature-hashed with a sign bit into `dim` buckets. crc32 keeps the
+    mapping identical across processes.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _add(self, vector: np.ndarray, feature: str, weight: float):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % self.dim] += weight if (h // self.dim) & 1 else -weight
+
+    def transform(self, texts: list) -> np.ndarray:
+        """Sublinear term-frequency vectors, one row per text."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, value in enumerate(texts):
+            for word in tokenize(value):
+                self._add(matrix[i], "w:" + word, 1.0)
+                padded = f"#{word}#"
+                for j in range(len(padded) - 2):
+                    self._add(matrix[i], "c:" + padded[j:j + 3], CHAR_NGRAM_WEIGHT)
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        return matrix
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """
+    Dense cosine-similarity index over hashed TF-IDF vectors.
+    Rows are appended in batches, then `finalize()` applies IDF weights and
+    L2 normalization. Optional storage modes for large catalogs:
+      - quantize: int8 vectors with a per-row float32 scale (4x smaller)
+      - mmap_path: vectors are written to and searched from .npy memmaps
+    """
+
+    def __init__(self, dim: int = VECTOR_INDEX_DIM, quantize: bool = False, mmap_path: str = None, capacity: int = None):
+        if mmap_path and capacity is None:
+            raise ValueError("capacity is required for memory-mapped storage")
+
+        self.vectorizer = HashingVectorizer(dim)
+        self.dim = dim
+        self.capacity = capacity
+        self.quantize = quantize
+        self.mmap_path = mmap_path
+        self.size = 0
+        self.matrix = None
+        self.scales = None
+        self.idf = np.ones(dim, dtype=np.float32)
+        self._df = np.zeros(dim, dtype=np.int64)
+        self._blocks = []
+        self._raw = None
+
+        if mmap_path:
+            os.makedirs(os.path.dirname(mmap_path) or ".", exist_ok=True)
+            self._raw = np.lib.format.open_memmap(mmap_path + ".raw.npy", mode="w+", dtype=np.float32, shape=(capacity, dim))
+
+    def add_documents(self, texts: list):
+        if self.capacity is not None and self.size + len(texts) > self.capacity:
+            raise ValueError(f"VectorIndex capacity of {self.capacity} rows exceeded")
+
+        block = self.vectorizer.transform(texts)
+        self._df += np.count_nonzero(block, axis=0)
+
+        if self._raw is not None:
+            self._raw[self.size:self.size + len(block)] = block
+        else:
+            self._blocks.append(block)
+        self.size += len(block)
+
+    def finalize(self):
+        self.idf = (np.log((1 + self.size) / (1 + self._df)) + 1).astype(np.float32)
+        raw = self._raw[:self.size] if self._raw is not None else (
+            np.vstack(self._blocks) if self._blocks else np.zeros((0, self.dim), dtype=np.float32)
+        )
+        self._blocks = []
+
+        if self.quantize:
+            if self.mmap_path:
+                self.matrix = np.lib.format.open_memmap(self.mmap_path + ".int8.npy", mode="w+", dtype=np.int8, shape=(self.size, self.dim))
+            else:
+                self.matrix = np.empty((self.size, self.dim), dtype=np.int8)
+            self.scales = np.empty(self.size, dtype=np.float32)
+        else:
+            self.matrix = raw
+
+        for start in range(0, self.size, SEARCH_BLOCK_ROWS):
+            block = _normalize_rows(raw[start:start + SEARCH_BLOCK_ROWS] * self.idf)
+            if self.quantize:
+                scales = np.abs(block).max(axis=1) / 127.0
+                scales[scales == 0] = 1.0
+                self.matrix[start:start + len(block)] = np.round(block / scales[:, None]).astype(np.int8)
+                self.scales[start:start + len(block)] = scales
+            else:
+                self.matrix[start:start + len(block)] = block
+
+        if self.mmap_path:
+            if isinstance(self.matrix, np.memmap):
+                self.matrix.flush()
+            if self.quantize:
+                del raw
+                self._raw = None
+                os.remove(self.mmap_path + ".raw.npy")
+                self.matrix = np.load(self.mmap_path + ".int8.npy", mmap_mode="r")
+            else:
+                self._raw.flush()
+                self._raw = None
+                self.matrix = np.load(self.mmap_path + ".raw.npy", mmap_mode="r")[:self.size]
+
+    def _embed_queries(self, queries: list) -> np.ndarray:
+        return _normalize_rows(self.vectorizer.transform(queries) * self.idf)
+
+    def search_batch(self, queries: list, k: int = 10) -> list:
+        """Top-k (cosine score, row position) pairs for each query, best first."""
+        if not queries:
+            return []
+        if self.matrix is None or self.size == 0:
+            return [[] for _ in queries]
+
+        q = self._embed_queries(queries)
+        k = min(k, self.size)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, self.size, SEARCH_BLOCK_ROWS):
+            block = self.matrix[start:start + SEARCH_BLOCK_ROWS]
+            if self.quantize:
+                scores = (q @ block.T.astype(np.float32)) * self.scales[start:start + len(block)]
+            else:
+                scores = q @ block.T
+
+            take = min(k, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_ids = np.concatenate([best_ids, top + start], axis=1)
+
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_ids = np.take_along_axis(best_ids, keep, axis=1)
+
+        results = []
+        for scores, ids in zip(best_scores, best_ids):
+            order = np.argsort(-scores)
+            results.append([(float(scores[i]), int(ids[i])) for i in order])
+        return results
+
+    def search(self, query: str, k: int = 10) -> list:
+        return self.search_batch([query], k)[0]
+
+    def remove_files(self):
+        """Deletes the backing .npy files of a memory-mapped index that is no longer served."""
+        if not self.mmap_path:
+            return
+        for suffix in (".raw.npy", ".int8.npy"):
+            if os.path.exists(self.mmap_path + suffix):
+                os.remove(self.mmap_path + suffix)
+
+    def nbytes(self) -> int:
+        if self.matrix is None:
+            return 0
+        return int(self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0))
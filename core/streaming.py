@@ -0,0 +1,82 @@
+import logging
+import time
+from typing import Optional
+
+from common.telemetry import bind_session, record_span
+import core.supervisor_agent  # registers the agents
+from common.registry import registry
+from core.router import TurnMonitor, build_supervisor_input, pre_router, tool_request, turn_stats
+
+logger = logging.getLogger(__name__)
+
+# Only these graph nodes produce user-facing text. Tokens from the intent
+# detector and the SQL generator are internal and never leave the server.
+STREAMED_TOKEN_NODES = {"model", "response_formatter"}
+
+
+def _source(metadata: dict) -> str:
+    """Sub-agents and the recommendation graph run inside a supervisor tool call."""
+    checkpoint_ns = metadata.get("checkpoint_ns") or ""
+    return "sub_agent" if checkpoint_ns.startswith("tools:") else "supervisor"
+
+
+async def stream_chat_events(session_id: str, query: str, file_url: Optional[str] = None):
+    """
+    Runs one turn (pre-routed or through the supervisor) and yields JSON-serializable events:
+      - token: a piece of user-facing text from the supervisor or a sub-agent
+      - tool:  a sub-agent tool started or finished
+      - node:  a graph node inside a sub-agent started or finished
+      - done:  the final response, identical to what /Chat would return
+    """
+    final_response = ""
+    supervisor_input = build_supervisor_input(session_id, query, file_url)
+    monitor = TurnMonitor()
+    config = {"configurable": {"thread_id": session_id}, "callbacks": [monitor]}
+    start = time.perf_counter()
+    decision = pre_router.route(query, file_url)
+    last_message = None
+    bind_session(session_id)
+
+    if decision:
+        await pre_router.prepare_direct_turn(decision[1], supervisor_input, tool_request(query, file_url), session_id)
+        events = registry.get("supervisor_agent").astream_events(None, config, version="v2")
+    else:
+        events = registry.get("supervisor_agent").astream_events(
+            {"messages": [{"role": "user", "content": supervisor_input}]},
+            config,
+            version="v2",
+        )
+
+    async for event in events:
+        kind = event["event"]
+        name = event["name"]
+        metadata = event.get("metadata", {})
+        node = metadata.get("langgraph_node")
+
+        if kind == "on_chat_model_stream" and node in STREAMED_TOKEN_NODES:
+            content = event["data"]["chunk"].content
+            if isinstance(content, str) and content:
+                yield {"type": "token", "source": _source(metadata), "node": node, "content": content}
+
+        elif kind in ("on_tool_start", "on_tool_end"):
+            yield {"type": "tool", "tool": name, "status": "start" if kind == "on_tool_start" else "end"}
+
+        elif kind in ("on_chain_start", "on_chain_end") and name == node and _source(metadata) == "sub_agent":
+            yield {"type": "node", "node": name, "status": "start" if kind == "on_chain_start" else "end"}
+
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            messages = event["data"].get("output", {}).get("messages", [])
+            if messages:
+                last_message = messages[-1]
+                final_response = last_message.content if hasattr(last_message, 'content') else str(last_message)
+
+    record_span("agent", "supervisor", time.perf_counter() - start, route="direct" if decision else "supervisor", streamed=True)
+    if decision:
+        pre_router.record_direct(decision[0], time.perf_counter() - start)
+    else:
+        pre_router.record_fallback(monitor.routing_seconds)
+    turn_stats.record(monitor, time.perf_counter() - start, last_message)
+
+    logger.info(f"[STREAM] Session {session_id} finished streaming")
+
+    yield {"type": "done", "response": final_response}
@@ -1,6 +1,6 @@
-from langchain.agents import create_agent
+import os
 
-from common.llm import groq_model, gemini_model
+import common.llm  # registers the LLM components
 from core.prompts.prompts import SUPERVISOR_AGENT_PROMPT
 from core.agents.agents import (
     general_query_tool,
@@ -9,17 +9,42 @@ from core.agents.agents import (
     complain_handler_tool,
 )
 
+from common.registry import registry
 from common.shared_config import checkpointer, store
 
-supervisor_agent = create_agent(
-    gemini_model,
-    tools=[
-        general_query_tool,
-        recommendation_tool,
-        purchase_agent_tool,
-        complain_handler_tool,
-    ],
-    checkpointer=checkpointer,
-    store=store,
-    system_prompt=SUPERVISOR_AGENT_PROMPT,
-)
+supervisor_tools = [
+    general_query_tool,
+    recommendation_tool,
+    purchase_agent_tool,
+    complain_handler_tool,
+]
+
+# Tools whose answer is returned to the user as-is. The supervisor stops after
+# the tool call instead of spending another LLM call restating the answer.
+# Set DIRECT_RESPONSE_TOOLS="" to have the supervisor relay every answer.
+DIRECT_RESPONSE_TOOLS = {
+    name.strip()
+    for name in os.getenv("DIRECT_RESPONSE_TOOLS", ",".join(t.name for t in supervisor_tools)).split(",")
+    if name.strip()
+}
+
+for supervisor_tool in supervisor_tools:
+    supervisor_tool.return_direct = supervisor_tool.name in DIRECT_RESPONSE_TOOLS
+
+
+def build_supervisor_agent():
+    from langchain.agents import create_agent
+    from core.agents.history import history_middleware
+    from core.agents.spans import ToolSpanMiddleware
+
+    return create_agent(
+        registry.get("gemini_model"),
+        tools=supervisor_tools,
+        checkpointer=checkpointer,
+        store=store,
+        system_prompt=SUPERVISOR_AGENT_PROMPT,
+        middleware=[history_middleware("supervisor"), ToolSpanMiddleware("supervisor")],
+    )
+
+
+registry.register("supervisor_agent", build_supervisor_agent)
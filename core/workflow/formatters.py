@@ -0,0 +1,123 @@
+import os
+import re
+import threading
+
+from core.workflow.query_cache import REFERENTIAL_WORDS
+
+# auto     - render locally unless the query needs comparison or reasoning
+# llm      - always format with the LLM
+# template - never call the LLM
+RESPONSE_FORMATTER_MODE = os.getenv("RESPONSE_FORMATTER_MODE", "auto").lower()
+MAX_LISTED_PRODUCTS = int(os.getenv("RESPONSE_FORMATTER_MAX_PRODUCTS", "5"))
+
+# Queries with these words ask for a judgement or an explanation, not a list.
+# "recommend", "suggest" and "advice" are how shoppers ask for a list, so
+# they are not among them.
+REASONING_WORDS = {
+    "compare", "comparison", "vs", "versus", "better", "best", "worse", "difference",
+    "differ", "why", "which", "should", "worth", "pros", "cons", "explain", "suitable",
+}
+
+# Display label -> column names it may appear under, matched case-insensitively.
+NAME_COLUMNS = ("product_name", "name", "title", "product")
+DETAIL_COLUMNS = [
+    ("Category", ("category", "sub_category", "subcategory")),
+    ("Brand", ("brand", "manufacturer")),
+    ("Price", ("price", "selling_price", "discounted_price")),
+    ("Rating", ("rating", "ratings", "avg_rating", "product_rating")),
+    ("Color", ("color", "colour")),
+    ("Stock", ("stock", "quantity", "availability")),
+]
+
+
+class FormatterCounts:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.template = 0
+        self.llm = 0
+
+    def record(self, used_llm: bool):
+        with self._lock:
+            if used_llm:
+                self.llm += 1
+            else:
+                self.template += 1
+
+    def stats(self) -> dict:
+        total = self.template + self.llm
+        return {
+            "mode": RESPONSE_FORMATTER_MODE,
+            "template": self.template,
+            "llm": self.llm,
+            "template_rate": round(self.template / total, 3) if total else 0.0,
+        }
+
+
+formatter_counts = FormatterCounts()
+
+
+def needs_llm(user_query: str) -> bool:
+    """True when the answer needs comparison, reasoning or reference to earlier products."""
+    if RESPONSE_FORMATTER_MODE == "llm":
+        return True
+    if RESPONSE_FORMATTER_MODE == "template":
+        return False
+    words = set(re.findall(r"[a-z]+", user_query.lower()))
+    return bool(words & (REASONING_WORDS | REFERENTIAL_WORDS))
+
+
+def _find_column(columns: dict, candidates: tuple):
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+
+def _format_value(label: str, value) -> str:
+    if label == "Price":
+        try:
+            return f"${float(value):,.2f}"
+        except (TypeError, ValueError):
+            return str(value)
+    if label == "Rating":
+        try:
+            return f"{float(value):g}/5"
+        except (TypeError, ValueError):
+            return str(value)
+    return str(value)
+
+
+def render_products(user_query: str, rows: list, categories: list = None) -> str:
+    """Bulleted product list built from whichever known columns the rows have."""
+    if not rows:
+        response = f"I'm sorry, we don't have products matching \"{user_query}\" right now."
+        if categories:
+            response += f" We have products in {', '.join(categories[:5])}."
+        return response + " Can I help you find something else?"
+
+    columns = {column.lower(): column for column in rows[0].keys()}
+    name_column = _find_column(columns, NAME_COLUMNS)
+    details = [
+        (label, column)
+        for label, candidates in DETAIL_COLUMNS
+        if (column := _find_column(columns, candidates)) and column != name_column
+    ]
+    if not name_column and not details:
+        # Unknown catalog layout: show the first few columns as they are.
+        details = [(column, column) for column in list(rows[0].keys())[:4]]
+
+    shown = rows[:MAX_LISTED_PRODUCTS]
+    if len(rows) > len(shown):
+        response = f"I found {len(rows)} products for \"{user_query}\". Here are the top {len(shown)}:\n\n"
+    else:
+        response = f"Here {'is what' if len(rows) == 1 else 'are the products'} I found for \"{user_query}\":\n\n"
+
+    for idx, row in enumerate(shown, 1):
+        name = row.get(name_column) if name_column else None
+        response += f"{idx}. **{name if name is not None else 'Product'}**\n"
+        for label, column in details:
+            value = row.get(column)
+            if value is not None and value != "":
+                response += f"   {label}: {_format_value(label, value)}\n"
+
+    return response.rstrip()
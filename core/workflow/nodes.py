@@ -1,90 +1,194 @@
+import functools
+import json
 import logging
+import os
 import re
 from langchain_core.prompts import ChatPromptTemplate
 from sqlalchemy import text, inspect
 
-from common.llm import groq_model, gemini_model
-from db.database import engine
+import common.llm  # registers the LLM components
+from common.llm_cache import cached_model
+from common.registry import registry
+from db.database import engine, run_db
 from core.prompts.prompts import INTENT_DETECTION_PROMPT,QUERY_GENERATOR_PROMPT,RESPONSE_FORMATTER_PROMPT
 from core.workflow.schema import RecommendationState
+from core.workflow.schema_cache import schema_cache
+from core.workflow.query_cache import nl_sql_cache
+from core.workflow.result_cache import result_cache
+from core.workflow.formatters import formatter_counts, needs_llm, render_products
+from core.search.bm25_index import catalog_search, is_simple_lookup
+from core.search.vector_index import VECTOR_MIN_SCORE, VECTOR_RETRIEVAL_MODE
+from core.workflow.query_cache import REFERENTIAL_WORDS, STOPWORDS
 
 logger = logging.getLogger(__name__)
 
-def intent_detector_node(state: RecommendationState) -> RecommendationState:
+# Opt-in: comma-separated nodes whose LLM responses are cached on (model,
+# parameters, rendered prompt), from intent_detector, query_generator and
+# response_formatter. Off by default; the models sample at temperature 0.3,
+# so caching replays one sample where a fresh call could answer differently.
+LLM_CACHE_NODES = {
+    name.strip()
+    for name in os.getenv("LLM_CACHE_NODES", "").split(",")
+    if name.strip()
+}
+
+
+def _build_node_model(node_name: str):
+    gemini_model = registry.get("gemini_model")
+    return cached_model(gemini_model, node_name) if node_name in LLM_CACHE_NODES else gemini_model
+
+
+def node_model(node_name: str):
+    """The model a node calls, built on first use."""
+    return registry.get(f"{node_name}_model")
+
+
+for _node_name in ("intent_detector", "query_generator", "response_formatter"):
+    registry.register(f"{_node_name}_model", functools.partial(_build_node_model, _node_name))
+
+# The LLM rewrite adds a model call to every turn; by default intent and
+# keywords are derived locally and the user's query is used as typed.
+INTENT_DETECTOR_LLM = os.getenv("INTENT_DETECTOR_LLM", "false").lower() in ("1", "true", "yes")
+
+
+def _local_intent(user_query: str) -> dict:
+    words = re.findall(r"[a-z0-9]+", user_query.lower())
+    if any(word in REFERENTIAL_WORDS for word in words):
+        intent = "follow_up"
+    elif is_simple_lookup(user_query):
+        intent = "product_lookup"
+    else:
+        intent = "semantic_search"
+    return {"intent": intent, "keywords": [word for word in words if word not in STOPWORDS]}
+
+
+async def intent_detector_node(state: RecommendationState) -> dict:
     """
-    Converts vague user queries into a clear, structured intent form.
-    Overwrites state['user_query'] with a cleaned version.
-    Extracts:
-      - intent (semantic_search, category_browse, product_lookup, follow_up)
-      - keywords (list)
-    Then forwards the updated user_query to the next node.
+    Classifies the query (semantic_search, category_browse, product_lookup,
+    follow_up) and extracts keywords. Runs in parallel with schema inspection.
+    With INTENT_DETECTOR_LLM the LLM also rewrites vague queries into a
+    clean, explicit user_query for the nodes downstream.
     """
 
     logger.info("[INTENT_DETECTOR] Analyzing user intent...")
 
     raw_query = state.get("user_query", "")
+    update = _local_intent(raw_query)
+
+    if not INTENT_DETECTOR_LLM:
+        logger.info(f"[INTENT_DETECTOR] Intent: {update['intent']}")
+        return update
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", INTENT_DETECTION_PROMPT),
-        ("human", f"User Query: {raw_query}\nReturn JSON:")
+        ("human", "User Query: {user_query}\nReturn JSON:")
     ])
 
     try:
-        chain = prompt | gemini_model
-        response = chain.invoke({})
-        content = response.content.strip()
-
-        import json
-        data = json.loads(content)
+        chain = prompt | node_model("intent_detector")
+        response = await chain.ainvoke({"user_query": raw_query})
+        data = json.loads(response.content.strip())
 
-        state["user_query"] = data.get("clean_query", raw_query)
+        update["user_query"] = data.get("clean_query") or raw_query
+        update["intent"] = data.get("intent") or update["intent"]
+        update["keywords"] = data.get("keywords") or update["keywords"]
 
-        logger.info(f"[INTENT_DETECTOR] Clean Query: {state['user_query']}")
+        logger.info(f"[INTENT_DETECTOR] Clean Query: {update['user_query']}")
 
     except Exception as e:
         logger.error(f"[INTENT_DETECTOR] Error: {e}")
-        state["user_query"] = raw_query
 
-    return state
+    return update
+
+
+def _fetch_schema():
+    """
+    Blocking helper: reads columns, categories and sample products of Ecommerce_Data
+    """
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns('Ecommerce_Data')]
+
+    with engine.connect() as conn:
+        result = conn.execute(text("SELECT DISTINCT Category FROM Ecommerce_Data LIMIT 20"))
+        categories = [row[0] for row in result.fetchall()]
+
+        result = conn.execute(text("SELECT Product_Name FROM Ecommerce_Data LIMIT 10"))
+        sample_products = [row[0] for row in result.fetchall()]
+
+    return columns, categories, sample_products
 
 
-def inspect_schema_node(state: RecommendationState) -> RecommendationState:
+async def inspect_schema_node(state: RecommendationState) -> dict:
     """
     Fetches actual database schema and sample data
+    Served from the schema cache until the catalog table is rewritten
     """
     logger.info("[SCHEMA_INSPECTOR] Fetching database schema...")
 
     try:
-        inspector = inspect(engine)
-        columns = [col['name'] for col in inspector.get_columns('Ecommerce_Data')]
-        state["available_columns"] = columns
-
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT DISTINCT Category FROM Ecommerce_Data LIMIT 20"))
-            state["available_categories"] = [row[0] for row in result.fetchall()]
-
-            result = conn.execute(text("SELECT Product_Name FROM Ecommerce_Data LIMIT 10"))
-            state["sample_products"] = [row[0] for row in result.fetchall()]
+        columns, categories, sample_products = await schema_cache.get(lambda: run_db(_fetch_schema))
 
         logger.info(f"[SCHEMA_INSPECTOR] Found {len(columns)} columns")
-        logger.info(f"[SCHEMA_INSPECTOR] Found {len(state['available_categories'])} categories")
+        logger.info(f"[SCHEMA_INSPECTOR] Found {len(categories)} categories")
+
+        return {
+            "available_columns": columns,
+            "available_categories": categories,
+            "sample_products": sample_products,
+        }
 
     except Exception as e:
         logger.error(f"[SCHEMA_INSPECTOR] Error: {e}")
-        state["error_message"] = f"Database schema inspection failed: {e}"
+        return {"error_message": f"Database schema inspection failed: {e}"}
 
-    return state
 
+def catalog_search_node(state: RecommendationState) -> dict:
+    """
+    Answers simple keyword lookups (e.g. "samsung galaxy s21") from the in-process
+    BM25 catalog index so the graph can skip SQL generation entirely
+    Otherwise retrieves nearest products from the vector index, either as
+    context for the SQL generator or, in "replace" mode, as the answer
+    """
+    logger.info("[CATALOG_SEARCH] Trying BM25 fast path...")
+
+    results = catalog_search.lookup(state["user_query"])
+    if results:
+        logger.info(f"[CATALOG_SEARCH] Fast path found {len(results)} results")
+        return {"query_results": results, "search_source": "bm25"}
+
+    update = {"search_source": "sql"}
+
+    words = set(re.findall(r"[a-z0-9]+", state["user_query"].lower()))
+    if VECTOR_RETRIEVAL_MODE == "off" or words & REFERENTIAL_WORDS:
+        return update
+
+    matches = catalog_search.semantic_search(state["user_query"], k=10)
+    if not matches:
+        return update
 
-def generate_query_node(state: RecommendationState) -> RecommendationState:
+    if VECTOR_RETRIEVAL_MODE == "replace" and matches[0][0] >= VECTOR_MIN_SCORE:
+        update["query_results"] = [row for score, row in matches if score >= VECTOR_MIN_SCORE]
+        update["search_source"] = "vector"
+        logger.info(f"[CATALOG_SEARCH] Vector search found {len(update['query_results'])} results")
+    else:
+        update["candidate_products"] = [row.get("Product_Name") for _, row in matches[:5] if row.get("Product_Name")]
+        logger.info(f"[CATALOG_SEARCH] Passing {len(update['candidate_products'])} candidates to the query generator")
+
+    return update
+
+
+async def generate_query_node(state: RecommendationState) -> dict:
     """
     Uses LLM to understand intent and generate SQL query
     The LLM has access to conversation history via checkpointer
+    Near-identical queries reuse SQL from the NL-to-SQL cache without an LLM call
     """
     logger.info("[QUERY_GENERATOR] Generating SQL query with LLM...")
 
-    if state.get("error_message"):
-        return state
+    cached_sql = nl_sql_cache.lookup(state["user_query"])
+    if cached_sql:
+        logger.info(f"[QUERY_GENERATOR] Reusing cached query: {cached_sql}")
+        return {"sql_query": cached_sql}
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", QUERY_GENERATOR_PROMPT),
@@ -92,12 +196,12 @@ def generate_query_node(state: RecommendationState) -> RecommendationState:
     ])
 
     try:
-        chain = prompt | gemini_model
-        response = chain.invoke({
+        chain = prompt | node_model("query_generator")
+        response = await chain.ainvoke({
             "user_query": state["user_query"],
             "columns": ", ".join(state["available_columns"]),
             "categories": ", ".join(state["available_categories"][:10]),
-            "sample_products": ", ".join(state["sample_products"][:5])
+            "sample_products": ", ".join((state.get("candidate_products") or []) + state["sample_products"][:5])
         })
 
         sql_query = response.content.strip()
@@ -108,25 +212,20 @@ def generate_query_node(state: RecommendationState) -> RecommendationState:
         if not sql_query.endswith(';'):
             sql_query += ';'
 
-        state["sql_query"] = sql_query
         logger.info(f"[QUERY_GENERATOR] Generated query: {sql_query}")
+        return {"sql_query": sql_query}
 
     except Exception as e:
         logger.error(f"[QUERY_GENERATOR] Error: {e}")
-        state["error_message"] = f"Query generation failed: {e}"
-
-    return state
+        return {"error_message": f"Query generation failed: {e}"}
 
 
-def validate_query_node(state: RecommendationState) -> RecommendationState:
+def validate_query_node(state: RecommendationState) -> dict:
     """
     Validates SQL query for safety and syntax
     """
     logger.info("[QUERY_VALIDATOR] Validating SQL query...")
 
-    if state.get("error_message"):
-        return state
-
     sql_query = state["sql_query"]
     errors = []
 
@@ -144,59 +243,77 @@ def validate_query_node(state: RecommendationState) -> RecommendationState:
     if 'FROM' not in sql_query.upper():
         errors.append("Query must include FROM clause")
 
-    state["validation_errors"] = errors
-
     if errors:
         logger.warning(f"[QUERY_VALIDATOR] ✗ Validation failed: {errors}")
-        state["error_message"] = f"Invalid query: {', '.join(errors)}"
-    else:
-        logger.info("[QUERY_VALIDATOR] Query is valid and safe")
+        return {"validation_errors": errors, "error_message": f"Invalid query: {', '.join(errors)}"}
 
-    return state
+    logger.info("[QUERY_VALIDATOR] Query is valid and safe")
+    return {"validation_errors": []}
 
 
-def execute_query_node(state: RecommendationState) -> RecommendationState:
+def _run_select(sql_query: str) -> list:
+    """
+    Blocking helper: runs a SELECT and materializes the rows as dicts
+    """
+    with engine.connect() as conn:
+        result = conn.execute(text(sql_query))
+        rows = result.fetchall()
+        columns = result.keys()
+
+    return [dict(zip(columns, row)) for row in rows]
+
+
+async def execute_query_node(state: RecommendationState) -> dict:
     """
     Executes the validated SQL query
+    Repeated queries against an unchanged catalog are served from the result cache
     """
     logger.info("[QUERY_EXECUTOR] Executing SQL query...")
 
-    if state.get("error_message") or state.get("validation_errors"):
-        return state
-
     try:
-        with engine.connect() as conn:
-            sql_query = state["sql_query"].rstrip(';')
+        sql_query = state["sql_query"].rstrip(';')
 
-            result = conn.execute(text(sql_query))
-            rows = result.fetchall()
-            columns = result.keys()
+        cache_key, results = result_cache.get(sql_query)
+        if results is None:
+            results = await run_db(_run_select, sql_query)
+            result_cache.put(cache_key, results)
+        else:
+            logger.info("[QUERY_EXECUTOR] Served from result cache")
 
-            results = [dict(zip(columns, row)) for row in rows]
-            state["query_results"] = results
+        nl_sql_cache.store(state["user_query"], state["sql_query"])
 
-            logger.info(f"[QUERY_EXECUTOR] Found {len(results)} results")
+        logger.info(f"[QUERY_EXECUTOR] Found {len(results)} results")
+        return {"query_results": results}
 
     except Exception as e:
         logger.error(f"[QUERY_EXECUTOR] Error: {e}")
-        state["error_message"] = f"Query execution failed: {e}"
-
-    return state
+        return {"error_message": f"Query execution failed: {e}"}
 
 
-def format_response_node(state: RecommendationState) -> RecommendationState:
+async def format_response_node(state: RecommendationState) -> dict:
     """
-    Uses LLM to format results into natural language response
+    Renders results with the local template; the LLM is used only when the
+    query needs comparison or reasoning over the results
     The LLM has access to conversation history via checkpointer
     """
     logger.info("[RESPONSE_FORMATTER] Formatting response...")
 
     if state.get("error_message"):
-        state["formatted_response"] = (
-            "I apologize, but I encountered an issue searching for products. "
-            "Could you please rephrase your request or try browsing our categories?"
-        )
-        return state
+        return {
+            "formatted_response": (
+                "I apologize, but I encountered an issue searching for products. "
+                "Could you please rephrase your request or try browsing our categories?"
+            )
+        }
+
+    if not needs_llm(state["user_query"]):
+        formatter_counts.record(used_llm=False)
+        logger.info("[RESPONSE_FORMATTER]  Response rendered from template")
+        return {
+            "formatted_response": render_products(
+                state["user_query"], state["query_results"], state.get("available_categories", [])
+            )
+        }
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", RESPONSE_FORMATTER_PROMPT),
@@ -206,26 +323,21 @@ def format_response_node(state: RecommendationState) -> RecommendationState:
     ])
 
     try:
-        chain = prompt | gemini_model
-        response = chain.invoke({
+        chain = prompt | node_model("response_formatter")
+        response = await chain.ainvoke({
             "user_query": state["user_query"],
             "results": state["query_results"][:10],
             "categories": ", ".join(state.get("available_categories", [])[:5])
         })
 
-        state["formatted_response"] = response.content
+        formatter_counts.record(used_llm=True)
         logger.info("[RESPONSE_FORMATTER]  Response formatted")
+        return {"formatted_response": response.content}
 
     except Exception as e:
         logger.error(f"[RESPONSE_FORMATTER] Error: {e}")
-        results = state["query_results"][:5]
-        response = f"Found {len(state['query_results'])} products:\n\n"
-        for idx, product in enumerate(results, 1):
-            response += f"{idx}. {product.get('Product_Name', 'N/A')}\n"
-            if 'Category' in product:
-                response += f"   Category: {product['Category']}\n"
-            if 'Price' in product:
-                response += f"   Price: ${product['Price']}\n"
-        state["formatted_response"] = response
-
-    return state
+        return {
+            "formatted_response": render_products(
+                state["user_query"], state["query_results"], state.get("available_categories", [])
+            )
+        }
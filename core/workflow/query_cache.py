@@ -0,0 +1,140 @@
+import logging
+import os
+import re
+
+from common.cache import LRUCache
+from db.table_versions import get_table_version
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {
+    "a", "an", "the", "me", "i", "im", "you", "we", "my", "our", "some", "any", "please",
+    "show", "find", "get", "give", "list", "see", "want", "need", "looking", "look",
+    "search", "can", "could", "would", "do", "does", "have", "has", "is", "are", "there",
+    "what", "which", "for", "of", "in", "on", "to", "with", "and", "or", "all", "your",
+}
+
+# Words that point back at earlier turns. The SQL for such queries depends on
+# conversation history, so they are never served from or written to the cache.
+REFERENTIAL_WORDS = {
+    "it", "its", "this", "that", "these", "those", "them", "one", "ones",
+    "first", "second", "third", "last", "previous", "above", "same",
+}
+
+PHRASE_SYNONYMS = {
+    "under budget": "cheap",
+    "within budget": "cheap",
+    "low price": "cheap",
+    "low cost": "cheap",
+    "high end": "premium",
+}
+
+# Superlatives and quality words (cheapest, good, top, best) stay distinct:
+# they change the ordering or the LIMIT of the SQL, not just its wording.
+WORD_SYNONYMS = {
+    "budget": "cheap",
+    "affordable": "cheap",
+    "inexpensive": "cheap",
+    "lowcost": "cheap",
+    "expensive": "premium",
+    "luxury": "premium",
+    "costly": "premium",
+}
+
+# Nouns that name the catalog itself rather than narrowing it; a query that
+# differs from a cached one only by these asks for the same rows.
+FILLER_WORDS = {"product", "item", "option", "stuff", "thing"}
+
+
+def normalize_query(user_query: str):
+    """
+    Reduces a shopper query to a sorted tuple of content tokens, or None when
+    the query refers to earlier turns and must not be cached.
+    """
+    text = " ".join(re.sub(r"[^a-z0-9]+", " ", user_query.lower()).split())
+
+    for phrase, replacement in PHRASE_SYNONYMS.items():
+        text = text.replace(phrase, replacement)
+
+    tokens = set()
+    for word in text.split():
+        if word in REFERENTIAL_WORDS:
+            return None
+        if word in STOPWORDS:
+            continue
+        word = WORD_SYNONYMS.get(word, word)
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+
+    return tuple(sorted(tokens)) or None
+
+
+class NLToSQLCache:
+    """
+    Maps normalized user queries to SQL that already passed validation.
+    Two tiers:
+      - exact:   same normalized tokens and same catalog version
+      - similar: same tokens once FILLER_WORDS are dropped. Any other extra
+                 or missing token may be a filter in the entry's SQL (or one
+                 it lacks), e.g. "hiking jackets" vs "hiking jackets men".
+    Entries from an older catalog version are never returned.
+    """
+
+    def __init__(self, table_name: str, maxsize: int, ttl_seconds: float):
+        self.table_name = table_name
+        self._cache = LRUCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def lookup(self, user_query: str):
+        tokens = normalize_query(user_query)
+        if tokens is None:
+            self.uncacheable += 1
+            return None
+
+        version = get_table_version(self.table_name)
+
+        sql_query = self._cache.get((version, tokens))
+        if sql_query is not None:
+            self.exact_hits += 1
+            logger.info(f"[NL_SQL_CACHE] Exact hit for {tokens}")
+            return sql_query
+
+        content = set(tokens) - FILLER_WORDS
+        for (entry_version, entry_tokens), entry_sql in self._cache.items():
+            if entry_version == version and set(entry_tokens) - FILLER_WORDS == content:
+                self.similar_hits += 1
+                logger.info(f"[NL_SQL_CACHE] Similar hit for {tokens} (cached as {entry_tokens})")
+                return entry_sql
+
+        self.misses += 1
+        return None
+
+    def store(self, user_query: str, sql_query: str):
+        tokens = normalize_query(user_query)
+        if tokens is None:
+            return
+        self._cache.put((get_table_version(self.table_name), tokens), sql_query)
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "evictions": self._cache.evictions,
+            "exact_hit_rate": round(self.exact_hits / lookups, 4) if lookups else 0.0,
+            "similar_hit_rate": round(self.similar_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+nl_sql_cache = NLToSQLCache(
+    "Ecommerce_Data",
+    maxsize=int(os.getenv("NL_SQL_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("NL_SQL_CACHE_TTL_SECONDS", "3600")),
+)
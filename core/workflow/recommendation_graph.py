@@ -1,11 +1,18 @@
+import inspect
 import logging
-from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+import threading
+import time
+from langgraph.graph import StateGraph, START, END
+
+from common.registry import registry
+from common.shared_config import bounded_saver
+from common.telemetry import span
 
 from core.workflow.schema import RecommendationState
 from core.workflow.nodes import (
     intent_detector_node,
     inspect_schema_node,
+    catalog_search_node,
     generate_query_node,
     validate_query_node,
     execute_query_node,
@@ -13,32 +20,126 @@ from core.workflow.nodes import (
 
 logger = logging.getLogger(__name__)
 
-graph_checkpointer = MemorySaver()
+graph_checkpointer = bounded_saver("recommendation_graph")
+
+
+def timed(name: str, node):
+    """Wraps a node so its update also records the node's wall-clock time, and emits it as a span."""
+    if inspect.iscoroutinefunction(node):
+        async def run(state: RecommendationState) -> dict:
+            start = time.perf_counter()
+            with span("node", name):
+                update = await node(state)
+            return {**update, "node_timings": {name: round((time.perf_counter() - start) * 1000, 2)}}
+    else:
+        def run(state: RecommendationState) -> dict:
+            start = time.perf_counter()
+            with span("node", name):
+                update = node(state)
+            return {**update, "node_timings": {name: round((time.perf_counter() - start) * 1000, 2)}}
+    return run
+
+
+def route_after_catalog_search(state: RecommendationState) -> str:
+    """Index hits (BM25 or vector) go straight to formatting; everything else goes through SQL"""
+    if state.get("error_message") or state.get("search_source") in ("bm25", "vector"):
+        return "response_formatter"
+    return "query_generator"
+
+
+def continue_unless_error(next_node: str):
+    """On the error path the remaining SQL steps are skipped and the formatter reports the error."""
+    def route(state: RecommendationState) -> str:
+        return "response_formatter" if state.get("error_message") else next_node
+    return route
+
 
 def build_recommendation_graph():
     """
     Builds the LangGraph workflow for product recommendations
+    Intent detection and schema inspection run in parallel; catalog search
+    waits for both. Errors route straight to the response formatter.
     Memory is managed by the checkpointer automatically
     """
     workflow = StateGraph(RecommendationState)
 
-    workflow.add_node("intent_detector", intent_detector_node)
-    workflow.add_node("schema_inspector", inspect_schema_node)
-    workflow.add_node("query_generator", generate_query_node)
-    workflow.add_node("query_validator", validate_query_node)
-    workflow.add_node("query_executor", execute_query_node)
-    workflow.add_node("response_formatter", format_response_node)
-
-    workflow.set_entry_point("schema_inspector")
-    workflow.add_edge("schema_inspector", "query_generator")
-    workflow.add_edge("query_generator", "query_validator")
-    workflow.add_edge("query_validator", "query_executor")
+    workflow.add_node("intent_detector", timed("intent_detector", intent_detector_node))
+    workflow.add_node("schema_inspector", timed("schema_inspector", inspect_schema_node))
+    workflow.add_node("catalog_search", timed("catalog_search", catalog_search_node))
+    workflow.add_node("query_generator", timed("query_generator", generate_query_node))
+    workflow.add_node("query_validator", timed("query_validator", validate_query_node))
+    workflow.add_node("query_executor", timed("query_executor", execute_query_node))
+    workflow.add_node("response_formatter", timed("response_formatter", format_response_node))
+
+    workflow.add_edge(START, "intent_detector")
+    workflow.add_edge(START, "schema_inspector")
+    workflow.add_edge(["intent_detector", "schema_inspector"], "catalog_search")
+    workflow.add_conditional_edges(
+        "catalog_search",
+        route_after_catalog_search,
+        {"response_formatter": "response_formatter", "query_generator": "query_generator"},
+    )
+    workflow.add_conditional_edges(
+        "query_generator",
+        continue_unless_error("query_validator"),
+        {"response_formatter": "response_formatter", "query_validator": "query_validator"},
+    )
+    workflow.add_conditional_edges(
+        "query_validator",
+        continue_unless_error("query_executor"),
+        {"response_formatter": "response_formatter", "query_executor": "query_executor"},
+    )
     workflow.add_edge("query_executor", "response_formatter")
     workflow.add_edge("response_formatter", END)
 
-    return workflow.compile(checkpointer=graph_checkpointer)
+    graph = workflow.compile(checkpointer=graph_checkpointer)
+    logger.info(" Recommendation graph compiled successfully with short-term memory")
+    return graph
+
+
+class GraphTimings:
+    """
+    Per-node wall-clock averages across turns. `serial_ms` is what the nodes
+    that ran would take back to back; the gap to `wall_ms` is the time the
+    parallel branches saved on the critical path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.wall_seconds = 0.0
+        self.serial_ms = 0.0
+        self.node_ms = {}
+        self.node_runs = {}
+
+    def record(self, node_timings: dict, wall_seconds: float):
+        with self._lock:
+            self.runs += 1
+            self.wall_seconds += wall_seconds
+            self.serial_ms += sum(node_timings.values())
+            for name, ms in node_timings.items():
+                self.node_ms[name] = self.node_ms.get(name, 0.0) + ms
+                self.node_runs[name] = self.node_runs.get(name, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            if not self.runs:
+                return {"runs": 0}
+            wall_ms = self.wall_seconds / self.runs * 1000
+            serial_ms = self.serial_ms / self.runs
+            return {
+                "runs": self.runs,
+                "avg_wall_ms": round(wall_ms, 2),
+                "avg_serial_ms": round(serial_ms, 2),
+                "avg_parallel_saving_ms": round(max(serial_ms - wall_ms, 0.0), 2),
+                "nodes": {
+                    name: {"runs": self.node_runs[name], "avg_ms": round(total / self.node_runs[name], 2)}
+                    for name, total in self.node_ms.items()
+                },
+            }
+
 
+graph_timings = GraphTimings()
 
-recommendation_graph = build_recommendation_graph()
 
-logger.info(" Recommendation graph compiled successfully with short-term memory")
\ No newline at end of file
+registry.register("recommendation_graph", build_recommendation_graph)
\ No newline at end of file
@@ -0,0 +1,104 @@
+import logging
+import os
+import re
+import sys
+
+from common.cache import LRUCache
+from db.table_versions import add_table_listener, get_table_version
+
+logger = logging.getLogger(__name__)
+
+# Only tables whose writers bump db.table_versions may be cached; anything
+# else (e.g. orders) changes without notice and always goes to the database.
+CACHEABLE_TABLES = {"ecommerce_data"}
+
+_STRING_LITERAL = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\")")
+_TABLE_REFERENCE = re.compile(r"\b(?:from|join)\s+[`\"]?(\w+)[`\"]?", re.IGNORECASE)
+
+
+def canonicalize_sql(sql_query: str) -> str:
+    """Lowercases and collapses whitespace outside string literals and drops the trailing ';'."""
+    parts = _STRING_LITERAL.split(sql_query.strip().rstrip(';').strip())
+    canonical = []
+    for idx, part in enumerate(parts):
+        if idx % 2:
+            canonical.append(part)
+        else:
+            canonical.append(" ".join(part.lower().split()))
+    return " ".join(p for p in canonical if p)
+
+
+def referenced_tables(canonical_sql: str) -> set:
+    code_only = _STRING_LITERAL.sub("''", canonical_sql)
+    return {name.lower() for name in _TABLE_REFERENCE.findall(code_only)}
+
+
+def estimate_rows_size(rows: list) -> int:
+    """Rough in-memory footprint of materialized rows, in bytes."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row.values():
+            size += sys.getsizeof(value)
+    return size
+
+
+class ResultCache:
+    """
+    Caches materialized SELECT results keyed on canonical SQL plus the versions
+    of the tables it reads. Bounded by entry count and by estimated bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self._cache = LRUCache(
+            maxsize=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=estimate_rows_size,
+        )
+        self.bypassed = 0
+        add_table_listener(self._on_table_change)
+
+    def _key(self, sql_query: str):
+        canonical = canonicalize_sql(sql_query)
+        tables = referenced_tables(canonical)
+        if not tables or not tables <= CACHEABLE_TABLES:
+            return None
+        return canonical, tuple(sorted((t, get_table_version(t)) for t in tables))
+
+    def get(self, sql_query: str):
+        """
+        Returns (key, rows): rows is None on a miss, key is None when the query
+        is not cacheable. Pass the key to put() so results are stored under the
+        table versions read before the query ran.
+        """
+        key = self._key(sql_query)
+        if key is None:
+            self.bypassed += 1
+            return None, None
+
+        rows = self._cache.get(key)
+        return key, [dict(row) for row in rows] if rows is not None else None
+
+    def put(self, key, rows: list):
+        if key is not None:
+            self._cache.put(key, [dict(row) for row in rows])
+
+    def _on_table_change(self, table_name: str, version: int):
+        if table_name in CACHEABLE_TABLES:
+            # Old entries can never match again; free their memory right away.
+            self._cache.clear()
+            logger.info(f"[RESULT_CACHE] Cleared after {table_name} changed (version {version})")
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats["bypassed"] = self.bypassed
+        stats["max_bytes"] = self._cache.max_bytes
+        return stats
+
+
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600")),
+)
@@ -1,18 +1,34 @@
-from typing import TypedDict
+from typing import Annotated, TypedDict
+
+
+def merge_timings(current: dict, update: dict) -> dict:
+    """Reducer for node_timings: nodes add their entry; a None input starts a fresh turn."""
+    if update is None:
+        return {}
+    return {**(current or {}), **update}
+
 
 class RecommendationState(TypedDict):
     """State that flows through the graph"""
     user_query: str
     session_id: str
 
+    intent: str
+    keywords: list
+
     available_columns: list
     available_categories: list
     sample_products: list
 
     sql_query: str
+    search_source: str
+    candidate_products: list
 
     validation_errors: list
     query_results: list
 
     formatted_response: str
-    error_message: str
\ No newline at end of file
+    error_message: str
+
+    # node name -> wall-clock milliseconds for the current turn
+    node_timings: Annotated[dict, merge_timings]
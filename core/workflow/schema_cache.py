@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import os
+import time
+
+from db.table_versions import get_table_version
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCache:
+    """
+    Holds columns, categories and sample products of a catalog table in memory.
+    An entry is valid while the table version it was loaded at is current
+    and it is younger than the TTL (a safety net for writes made by other workers).
+    """
+
+    def __init__(self, table_name: str, ttl_seconds: float):
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self._entry = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._entry is not None
+            and self._version == get_table_version(self.table_name)
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    async def get(self, loader):
+        """
+        Returns the cached metadata, awaiting `loader()` on a miss.
+        Concurrent misses share a single load.
+        """
+        if self._is_fresh():
+            self.hits += 1
+            return self._entry
+
+        async with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return self._entry
+
+            self.misses += 1
+            version = get_table_version(self.table_name)
+            entry = await loader()
+
+            self._entry = entry
+            self._version = version
+            self._loaded_at = time.monotonic()
+            logger.info(f"[SCHEMA_CACHE] Loaded {self.table_name} metadata at version {version}")
+            return entry
+
+    def invalidate(self):
+        self._entry = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "table": self.table_name,
+            "version": get_table_version(self.table_name),
+            "cached_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+schema_cache = SchemaCache(
+    "Ecommerce_Data",
+    ttl_seconds=float(os.getenv("SCHEMA_CACHE_TTL_SECONDS", "300")),
+)
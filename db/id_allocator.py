@@ -0,0 +1,89 @@
+import logging
+import os
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Seeded from the highest user_id already in orders so existing ids are never
+# reused; an empty table starts at 10 to keep the 2-digit-then-3-digit numbering.
+_seed_query = text("""
+    INSERT INTO user_id_sequence (name, next_id)
+    SELECT :name, CASE WHEN MAX(user_id) >= 10 THEN MAX(user_id) + 1 ELSE 10 END
+    FROM orders
+""")
+
+
+class SequenceAllocator:
+    """
+    Hands out ids from a counter row in user_id_sequence.
+    Each reservation advances the counter by `block_size` with a single atomic
+    UPDATE, so concurrent workers always get disjoint ranges. The reserved
+    block is then served from memory.
+    """
+
+    def __init__(self, name: str, block_size: int = 1):
+        self.name = name
+        self.block_size = max(1, block_size)
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+        self.reservations = 0
+
+    def _reserve_block(self) -> int:
+        """Advances the counter and returns the end (exclusive) of the reserved block."""
+        params = {"name": self.name, "block": self.block_size}
+
+        with engine.begin() as conn:
+            if engine.dialect.name == "mysql":
+                # LAST_INSERT_ID(expr) makes the new value come back in the OK packet,
+                # so the reservation is one round trip.
+                result = conn.execute(text("""
+                    UPDATE user_id_sequence
+                    SET next_id = LAST_INSERT_ID(next_id + :block)
+                    WHERE name = :name
+                """), params)
+                if result.rowcount:
+                    return result.lastrowid
+            else:
+                row = conn.execute(text("""
+                    UPDATE user_id_sequence
+                    SET next_id = next_id + :block
+                    WHERE name = :name
+                    RETURNING next_id
+                """), params).fetchone()
+                if row:
+                    return row[0]
+
+        self._seed()
+        return self._reserve_block()
+
+    def _seed(self):
+        try:
+            with engine.begin() as conn:
+                conn.execute(_seed_query, {"name": self.name})
+            logger.info(f"[ID_ALLOCATOR] Seeded sequence '{self.name}'")
+        except IntegrityError:
+            # Another worker seeded it first.
+            pass
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next >= self._end:
+                self._end = self._reserve_block()
+                self._next = self._end - self.block_size
+                self.reservations += 1
+
+            value = self._next
+            self._next += 1
+            return value
+
+
+user_id_allocator = SequenceAllocator(
+    "user_id",
+    block_size=int(os.getenv("USER_ID_BLOCK_SIZE", "1")),
+)
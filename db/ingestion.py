@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+from sqlalchemy import BigInteger, Float, Text, inspect, text
+
+from db.database import engine
+from db.migrations import apply_catalog_indexes
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "50000"))
+INSERT_BATCH_ROWS = int(os.getenv("INGEST_INSERT_BATCH_ROWS", "1000"))
+MAX_TRACKED_JOBS = 50
+
+# Column kinds from narrowest to widest; a column takes the widest kind any
+# of its values needs.
+COLUMN_KINDS = ("integer", "float", "text")
+SQL_TYPES = {"integer": BigInteger(), "float": Float(precision=53), "text": Text()}
+_INTEGER = r"^[+-]?\d{1,18}$"
+
+# job_id -> progress dict, newest last. Read by GET /uploadfile/jobs.
+ingestion_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _new_job(table_name: str, filename: str) -> str:
+    job_id = uuid.uuid4().hex[:12]
+    with _jobs_lock:
+        ingestion_jobs[job_id] = {
+            "job_id": job_id,
+            "table": table_name,
+            "filename": filename,
+            "status": "running",
+            "rows": 0,
+            "chunks": 0,
+            "started_at": time.time(),
+            "elapsed_seconds": 0.0,
+            "error": None,
+        }
+        while len(ingestion_jobs) > MAX_TRACKED_JOBS:
+            ingestion_jobs.pop(next(iter(ingestion_jobs)))
+    return job_id
+
+
+def _quote(name: str) -> str:
+    return engine.dialect.identifier_preparer.quote(name)
+
+
+def _swap_in(conn, staging_table: str, table_name: str):
+    """Replaces `table_name` with the fully loaded staging table."""
+    target, staging, old = _quote(table_name), _quote(staging_table), _quote(f"{table_name}__old")
+
+    conn.execute(text(f"DROP TABLE IF EXISTS {old}"))
+    if engine.dialect.name == "mysql":
+        if inspect(conn).has_table(table_name):
+            # RENAME TABLE swaps both names atomically; readers never see a partial catalog.
+            conn.execute(text(f"RENAME TABLE {target} TO {old}, {staging} TO {target}"))
+            conn.execute(text(f"DROP TABLE {old}"))
+        else:
+            conn.execute(text(f"RENAME TABLE {staging} TO {target}"))
+    else:
+        conn.execute(text(f"DROP TABLE IF EXISTS {target}"))
+        conn.execute(text(f"ALTER TABLE {staging} RENAME TO {target}"))
+
+
+def _value_kind(values: pd.Series):
+    """The narrowest kind that holds every non-empty value, or None if there are none."""
+    values = values.dropna().astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return None
+    if values.str.match(_INTEGER).all():
+        return "integer"
+    if pd.to_numeric(values, errors="coerce").notna().all():
+        return "float"
+    return "text"
+
+
+def infer_column_kinds(frames) -> dict:
+    """
+    Column -> "integer" | "float" | "text" over every chunk of string-typed
+    frames, so all chunks are written with one schema (per-chunk inference
+    would type the staging table from the first chunk only). Columns that
+    are empty throughout are text.
+    """
+    kinds = {}
+    for chunk in frames:
+        for column in chunk.columns:
+            kind = _value_kind(chunk[column])
+            previous = kinds.get(column)
+            if previous is None or (kind is not None and COLUMN_KINDS.index(kind) > COLUMN_KINDS.index(previous)):
+                kinds[column] = kind
+    return {column: kind or "text" for column, kind in kinds.items()}
+
+
+def cast_frame(chunk: pd.DataFrame, kinds: dict) -> pd.DataFrame:
+    """Converts a string-typed chunk to the inferred column kinds."""
+    chunk = chunk.copy()
+    for column, kind in kinds.items():
+        if kind == "text" or column not in chunk:
+            continue
+        values = pd.to_numeric(chunk[column].where(chunk[column].str.strip() != ""), errors="raise")
+        chunk[column] = values.astype("Int64") if kind == "integer" else values.astype("float64")
+    return chunk
+
+
+def ingest_frames(frames, table_name: str, filename: str = "", dtype: dict = None) -> dict:
+    """
+    Loads an iterable of DataFrame chunks into `table_name`.
+    Rows go into a staging table using batched multi-row INSERTs (pymysql's
+    executemany), with `dtype` (column -> SQLAlchemy type) fixing the schema
+    for every chunk; then the staging table replaces the target.
+    Only one chunk is held in memory at a time.
+    On SQLite the whole load is one transaction. On MySQL DDL commits
+    implicitly, so the staging rows are committed before the swap; readers
+    still never see a partial catalog, because RENAME TABLE swaps both names
+    atomically and the target is untouched until then. Catalog indexes are
+    re-applied to the new table after the swap.
+    """
+    job_id = _new_job(table_name, filename)
+    job = ingestion_jobs[job_id]
+    staging_table = f"{table_name}__staging"
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {_quote(staging_table)}"))
+
+            for chunk in frames:
+                chunk.to_sql(
+                    staging_table,
+                    con=conn,
+                    if_exists="append",
+                    index=False,
+                    chunksize=INSERT_BATCH_ROWS,
+                    dtype=dtype,
+                )
+                job["rows"] += len(chunk)
+                job["chunks"] += 1
+                job["elapsed_seconds"] = round(time.time() - job["started_at"], 3)
+                logger.info(f"[INGEST] {job_id}: {job['rows']} rows loaded into {staging_table}")
+
+            if job["rows"] == 0:
+                raise ValueError("The uploaded file has no rows")
+
+            _swap_in(conn, staging_table, table_name)
+            job["indexed_columns"] = apply_catalog_indexes(conn, table_name)
+
+        job["status"] = "completed"
+
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.error(f"[INGEST] {job_id} failed: {e}")
+        raise
+
+    finally:
+        job["elapsed_seconds"] = round(time.time() - job["started_at"], 3)
+
+    logger.info(f"[INGEST] {job_id}: {job['rows']} rows in {job['elapsed_seconds']}s")
+    return dict(job)
+
+
+def ingest_upload(fileobj, file_type: str, table_name: str, filename: str = "") -> dict:
+    """
+    Streams a CSV file object in CHUNK_ROWS-sized chunks, twice: the first pass
+    infers each column's type from all rows, the second casts and inserts.
+    The file object must be seekable (uploads are spooled). Excel files
+    cannot be parsed incrementally and are read whole, then inserted in the
+    same batches.
+    """
+    if file_type == 'csv':
+        start = fileobj.tell()
+        kinds = infer_column_kinds(pd.read_csv(fileobj, chunksize=CHUNK_ROWS, dtype=str))
+        fileobj.seek(start)
+        chunks = pd.read_csv(fileobj, chunksize=CHUNK_ROWS, dtype=str)
+    else:
+        df = pd.read_excel(fileobj, dtype=str)
+        kinds = infer_column_kinds([df])
+        chunks = (df.iloc[start:start + CHUNK_ROWS] for start in range(0, len(df), CHUNK_ROWS))
+
+    frames = (cast_frame(chunk, kinds) for chunk in chunks)
+    dtype = {column: SQL_TYPES[kind] for column, kind in kinds.items()}
+    return ingest_frames(frames, table_name, filename, dtype=dtype)
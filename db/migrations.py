@@ -0,0 +1,175 @@
+import logging
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+
+from db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Columns of an uploaded catalog that generated queries filter or sort on.
+CATALOG_INDEX_COLUMNS = ["Category", "Price", "Product_Name"]
+
+# MySQL cannot index TEXT columns (which pandas creates for strings) without
+# a prefix length.
+TEXT_INDEX_PREFIX = 191
+
+create_schema_migrations_table = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def _is_mysql() -> bool:
+    return engine.dialect.name == "mysql"
+
+
+def create_index(conn, table_name: str, index_name: str, columns: list):
+    """Creates an index unless one with that name exists; TEXT columns get a prefix on MySQL."""
+    inspector = inspect(conn)
+    if any(index["name"] == index_name for index in inspector.get_indexes(table_name)):
+        return False
+
+    column_types = {col["name"]: str(col["type"]).upper() for col in inspector.get_columns(table_name)}
+    quote = conn.dialect.identifier_preparer.quote
+
+    parts = []
+    for column in columns:
+        part = quote(column)
+        if _is_mysql() and ("TEXT" in column_types.get(column, "") or "BLOB" in column_types.get(column, "")):
+            part += f"({TEXT_INDEX_PREFIX})"
+        parts.append(part)
+
+    conn.execute(text(f"CREATE INDEX {quote(index_name)} ON {quote(table_name)} ({', '.join(parts)})"))
+    logger.info(f"[MIGRATIONS] Created index {index_name} on {table_name}({', '.join(columns)})")
+    return True
+
+
+def _create_orders(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id VARCHAR(255) PRIMARY KEY,
+            product_name VARCHAR(255) NOT NULL,
+            user_id INT NOT NULL,
+            is_complaint TINYINT(1) DEFAULT 0,
+            complaint_text TEXT,
+            complaint_file_url VARCHAR(500),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def _create_user_id_sequence(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS user_id_sequence (
+            name VARCHAR(64) PRIMARY KEY,
+            next_id INT NOT NULL
+        )
+    """))
+
+
+def _create_complaint_attachments(conn):
+    # One row per complaint evidence file. Replaces appending ';'-separated URLs
+    # to orders.complaint_file_url, which is kept only for rows written before.
+    id_column = "id INT AUTO_INCREMENT PRIMARY KEY" if _is_mysql() else "id INTEGER PRIMARY KEY AUTOINCREMENT"
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS complaint_attachments (
+            {id_column},
+            order_id VARCHAR(255) NOT NULL,
+            file_url VARCHAR(500) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    create_index(conn, "complaint_attachments", "idx_complaint_attachments_order_id", ["order_id"])
+
+
+def _index_orders_user_id(conn):
+    # /Orders looks orders up by user_id.
+    create_index(conn, "orders", "idx_orders_user_id", ["user_id"])
+
+
+def _index_orders_complaints(conn):
+    # /check_complaints filters on order_id AND is_complaint.
+    create_index(conn, "orders", "idx_orders_order_id_is_complaint", ["order_id", "is_complaint"])
+
+
+def _index_catalog(conn):
+    if inspect(conn).has_table("Ecommerce_Data"):
+        apply_catalog_indexes(conn, "Ecommerce_Data")
+
+
+# Append-only. Each step must be safe to re-run against a database that was
+# created before the migration runner existed.
+MIGRATIONS = [
+    (1, "create_orders", _create_orders),
+    (2, "create_user_id_sequence", _create_user_id_sequence),
+    (3, "create_complaint_attachments", _create_complaint_attachments),
+    (4, "index_orders_user_id", _index_orders_user_id),
+    (5, "index_orders_complaints", _index_orders_complaints),
+    (6, "index_catalog", _index_catalog),
+]
+
+
+def apply_catalog_indexes(conn, table_name: str) -> list:
+    """
+    Indexes the catalog filter columns present in `table_name`. Called by the
+    migrations and again after every upload, since uploads recreate the table.
+    """
+    existing = {col["name"].lower(): col["name"] for col in inspect(conn).get_columns(table_name)}
+    created = []
+
+    for column in CATALOG_INDEX_COLUMNS:
+        actual = existing.get(column.lower())
+        if actual and create_index(conn, table_name, f"idx_{table_name}_{column}".lower(), [actual]):
+            created.append(actual)
+
+    return created
+
+
+@contextmanager
+def _migration_lock(conn):
+    """Serializes runners across workers that boot at the same time (MySQL only)."""
+    if not _is_mysql():
+        yield
+        return
+
+    conn.execute(text("SELECT GET_LOCK('sparkmart_migrations', 60)"))
+    try:
+        yield
+    finally:
+        conn.execute(text("SELECT RELEASE_LOCK('sparkmart_migrations')"))
+
+
+def run_migrations() -> list:
+    """Applies pending migrations in version order and returns the versions applied."""
+    applied_now = []
+
+    with engine.connect() as conn:
+        with _migration_lock(conn):
+            conn.execute(text(create_schema_migrations_table))
+            conn.commit()
+
+            applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+            for version, name, step in MIGRATIONS:
+                if version in applied:
+                    continue
+
+                logger.info(f"[MIGRATIONS] Applying {version}: {name}")
+                step(conn)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                    {"version": version, "name": name},
+                )
+                conn.commit()
+                applied_now.append(version)
+
+        if _is_mysql():
+            result = conn.execute(text("SELECT NOW();")).fetchone()
+            print(f"Orders table is ready. Current DB Time (IST): {result[0]}")
+
+    logger.info(f"[MIGRATIONS] Schema is at version {MIGRATIONS[-1][0]} ({len(applied_now)} applied now)")
+    return applied_now
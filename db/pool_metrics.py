@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from common.telemetry import record_span
+
+
+class PoolMetrics:
+    """Checkout latency, occupancy and connection churn for one SQLAlchemy pool."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.pool = None
+
+    def record_checkout_wait(self, seconds: float):
+        record_span("db_pool", "checkout", seconds)
+        with self._lock:
+            self._waits.append(seconds)
+            self.checkouts += 1
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def attach(self, engine):
+        self.pool = engine.pool
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(engine, "close")
+        def _on_close(dbapi_connection, connection_record):
+            self.closes += 1
+
+        @event.listens_for(engine, "close_detached")
+        def _on_close_detached(dbapi_connection):
+            self.closes += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+
+        stats = {
+            "checkouts": self.checkouts,
+            "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "checkout_wait_p95_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0,
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+            "connections_opened": self.connects,
+            "connections_closed": self.closes,
+            "connections_invalidated": self.invalidations,
+        }
+
+        if isinstance(self.pool, QueuePool):
+            stats.update({
+                "pool_size": self.pool.size(),
+                "checked_out": self.pool.checkedout(),
+                "checked_in": self.pool.checkedin(),
+                "overflow": self.pool.overflow(),
+            })
+
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_checkout_wait(time.perf_counter() - start)
@@ -0,0 +1,30 @@
+import threading
+
+# Monotonic per-table version counters. Anything that rewrites a table bumps
+# its version, and caches derived from the table compare versions instead of
+# being cleared one by one.
+_versions = {}
+_listeners = []
+_lock = threading.Lock()
+
+
+def get_table_version(table_name: str) -> int:
+    return _versions.get(table_name.lower(), 0)
+
+
+def add_table_listener(callback):
+    """Registers `callback(table_name, version)` to run after a table version is bumped."""
+    _listeners.append(callback)
+
+
+def bump_table_version(table_name: str) -> int:
+    """Marks a table as changed, notifies listeners and returns its new version."""
+    with _lock:
+        key = table_name.lower()
+        _versions[key] = _versions.get(key, 0) + 1
+        version = _versions[key]
+
+    for callback in _listeners:
+        callback(key, version)
+
+    return version
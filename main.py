@@ -1,17 +1,75 @@
-import pandas as pd
-import io
+import asyncio
+import json
+import os
+import time
 import uuid
-from fastapi import FastAPI, File, UploadFile, Header
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, Header, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy import text
 from typing import Annotated, Optional
 from pydantic import BaseModel
 
-from core.supervisor_agent import supervisor_agent
-from utils.utility_functions import upload_file_to_supabase
-from db.database import db, engine
-
-app = FastAPI()
+from common.readiness import readiness
+from common.registry import COMPONENT_WARMUP, registry
+from core.router import pre_router, run_chat_turn, turn_stats
+from core.agents.history import history_stats
+from core.streaming import stream_chat_events
+from utils.storage import LOCAL_STORAGE_DIR, LOCAL_STORAGE_URL, STORAGE_BACKEND, start_upload, uploads
+from common.shared_config import checkpointer, store
+from common.llm_cache import llm_cache_stats
+from common.llm import llm_gateway_stats
+from common.telemetry import RequestTracingMiddleware, bind_session, trace_log
+from core.workflow.recommendation_graph import graph_checkpointer, graph_timings
+from db.database import db, engine, run_db, warm_up
+from db.pool_metrics import pool_metrics
+from db.migrations import run_migrations
+from db.table_versions import bump_table_version
+from db.ingestion import ingest_upload, ingestion_jobs
+from core.workflow.schema_cache import schema_cache
+from core.workflow.query_cache import nl_sql_cache
+from core.workflow.result_cache import result_cache
+from core.workflow.formatters import formatter_counts
+from core.search.bm25_index import catalog_search
+
+readiness.record("process_start_to_app_import", time.time() - readiness.process_started_at)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Agents, the graph and the LLM/Supabase clients build in threads while
+    # the database warms up.
+    components = None
+    if COMPONENT_WARMUP in ("blocking", "background"):
+        components = asyncio.create_task(registry.warm_up())
+
+    # Nothing above connects to the database; the first connections and the
+    # table listing happen here, off the import path.
+    with readiness.phase("db_warmup"):
+        await run_db(warm_up)
+
+    with readiness.phase("migrations"):
+        await run_db(run_migrations)
+
+    # After migrations, so the agents' table list includes the tables they create.
+    with readiness.phase("schema_reflection"):
+        await run_db(db.load)
+
+    catalog_search.schedule_rebuild()
+
+    if COMPONENT_WARMUP == "blocking":
+        with readiness.phase("components"):
+            await components
+
+    readiness.mark_ready()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(RequestTracingMiddleware, skip_paths=("/metrics", "/ready"))
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,6 +79,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Serves complaint files written by the local storage backend.
+if STORAGE_BACKEND == "local" and LOCAL_STORAGE_URL.startswith("/"):
+    os.makedirs(LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(LOCAL_STORAGE_URL, StaticFiles(directory=LOCAL_STORAGE_DIR), name="files")
+
 class ChatResponse(BaseModel):
     session_id: str
     response: str  # or dict, depending on your response format
@@ -28,6 +91,19 @@ class ChatResponse(BaseModel):
     message: Optional[str] = None
 
 
+def resolve_session(session_id: Optional[str]):
+    """Returns (session_id, is_new_session), creating a new session when none is given."""
+    if not session_id or session_id.strip() == "":
+        session_id = str(uuid.uuid4())
+        print(f"NEW SESSION CREATED: {session_id}")
+        bind_session(session_id)
+        return session_id, True
+
+    print(f"CONTINUING SESSION: {session_id}")
+    bind_session(session_id)
+    return session_id, False
+
+
 @app.post("/Chat", response_model=ChatResponse)
 async def chat(
         query: Annotated[str, "Enter your query:"],
@@ -45,19 +121,14 @@ async def chat(
     is_new_session = False
 
     try:
-        if not session_id or session_id.strip() == "":
-            session_id = str(uuid.uuid4())
-            is_new_session = True
-            print(f"NEW SESSION CREATED: {session_id}")
-        else:
-            is_new_session = False
-            print(f"CONTINUING SESSION: {session_id}")
+        session_id, is_new_session = resolve_session(session_id)
 
         file_url = None
 
         try:
             if file is not None:
-                file_url = upload_file_to_supabase(file, order_id=session_id)
+                # The upload streams in the background; the turn runs meanwhile.
+                file_url = start_upload(file, order_id=session_id)
         except Exception as e:
             return ChatResponse(
                 session_id=session_id,
@@ -66,16 +137,9 @@ async def chat(
                 message=f"File upload failed: {str(e)}"
             )
 
-        supervisor_input = f"Session ID: {session_id} | User Query: {query}"
-
-        if file_url:
-            supervisor_input += f" | FileURL: {file_url}"
-
+        upload_error = None
         try:
-            result = supervisor_agent.invoke(
-                {"messages": [{"role": "user", "content": supervisor_input}]},
-                {"configurable": {"thread_id": session_id}},
-            )
+            response_content = await run_chat_turn(session_id, query, file_url)
         except Exception as e:
             return ChatResponse(
                 session_id=session_id,
@@ -83,11 +147,14 @@ async def chat(
                 is_new_session=is_new_session,
                 message=f"LLM service error: {str(e)}"
             )
-
-        response_content = result["messages"][-1].content if hasattr(result["messages"][-1], 'content') else str(
-            result["messages"][-1])
-
-        if is_new_session:
+        finally:
+            # The spooled file is closed once the response is sent.
+            if file_url:
+                upload_error = await uploads.wait(file_url)
+
+        if upload_error:
+            message = f"File upload failed: {upload_error}"
+        elif is_new_session:
             message = f"New session started! Response generated for: {query}"
         else:
             message = f"Response generated for: {query}"
@@ -109,42 +176,190 @@ async def chat(
 
 
 
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@app.post("/ChatStream")
+async def chat_stream(
+        query: Annotated[str, "Enter your query:"],
+        file: Optional[UploadFile] = File(None),
+        session_id: Annotated[Optional[str], Header()] = None
+):
+    """
+    Server-Sent Events variant of /Chat with the same session semantics.
+    Emits a `session` event first, then `token`, `tool` and `node` events as the
+    supervisor and sub-agents produce them, and finally a `done` event.
+    """
+    session_id, is_new_session = resolve_session(session_id)
+
+    file_url = None
+    upload_error = None
+    try:
+        if file is not None:
+            file_url = start_upload(file, order_id=session_id)
+    except Exception as e:
+        upload_error = f"File upload failed: {str(e)}"
+
+    async def event_source():
+        yield _sse({"type": "session", "session_id": session_id, "is_new_session": is_new_session})
+
+        if upload_error:
+            yield _sse({"type": "error", "message": upload_error})
+            return
+
+        try:
+            async for event in stream_chat_events(session_id, query, file_url):
+                yield _sse(event)
+        except Exception as e:
+            yield _sse({"type": "error", "message": f"LLM service error: {str(e)}"})
+        finally:
+            failed = await uploads.wait(file_url) if file_url else None
+
+        if failed:
+            yield _sse({"type": "error", "message": f"File upload failed: {failed}"})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "session_id": session_id},
+    )
+
+
+@app.websocket("/ws/Chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    WebSocket variant of /Chat. The client sends JSON messages of the form
+    {"query": "...", "session_id": "..."}; the session_id may be omitted on the
+    first message and the one announced in the `session` event reused afterwards.
+    File attachments go through /Chat or /ChatStream.
+    """
+    await websocket.accept()
+    session_id = None
+
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            query = payload.get("query", "")
+            session_id, is_new_session = resolve_session(payload.get("session_id") or session_id)
+
+            await websocket.send_json({"type": "session", "session_id": session_id, "is_new_session": is_new_session})
+
+            try:
+                async for event in stream_chat_events(session_id, query):
+                    await websocket.send_text(json.dumps(event, default=str))
+            except Exception as e:
+                await websocket.send_json({"type": "error", "message": f"LLM service error: {str(e)}"})
+
+    except WebSocketDisconnect:
+        print(f"WEBSOCKET CLOSED: {session_id}")
+
+
 @app.post("/uploadfile/")
 async def create_upload_file(file: Annotated[UploadFile, File(description="Upload a csv or excel file")],table_name: Annotated[str, "Enter your table name:"] = "Ecommerce_Data"):
     try:
         file_type = file.filename
         file_type = file_type.split('.')[-1]
 
-        if file_type == 'csv':
-            contents = await file.read()
-            df = pd.read_csv(io.BytesIO(contents))
-        elif file_type in ['xlsx', 'xls']:
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
-        else:
+        if file_type not in ['csv', 'xlsx', 'xls']:
             return {"message": "Please upload a csv or excel file"}
 
-        df.to_sql(table_name, con=engine, if_exists="replace", index=False)
+        # The spooled upload file is parsed chunk by chunk, never read into memory whole.
+        job = await run_db(ingest_upload, file.file, file_type, table_name, file.filename)
+        bump_table_version(table_name)
 
-        return {"message": "Your file is uploaded successfully"}
+        return {
+            "message": "Your file is uploaded successfully",
+            "job_id": job["job_id"],
+            "rows": job["rows"],
+            "elapsed_seconds": job["elapsed_seconds"],
+        }
 
     except Exception as e:
         return f"Got an error:{e}"
 
 
+@app.get("/uploadfile/jobs")
+async def upload_jobs():
+    return {"jobs": list(ingestion_jobs.values())}
+
+
 @app.get("/check")
 async def check():
     return {"Tables": db.get_usable_table_names()}
 
+@app.get("/cache_stats")
+async def cache_stats():
+    return {
+        "schema_cache": schema_cache.stats(),
+        "nl_sql_cache": nl_sql_cache.stats(),
+        "result_cache": result_cache.stats(),
+        "catalog_search": catalog_search.stats(),
+        "llm_responses": llm_cache_stats(),
+    }
+
+@app.get("/router_stats")
+async def router_stats():
+    return {
+        "pre_router": pre_router.stats(),
+        "turns": turn_stats.stats(),
+        "response_formatter": formatter_counts.stats(),
+    }
+
+@app.get("/graph_stats")
+async def graph_stats():
+    return {"recommendation_graph": graph_timings.stats()}
+
+@app.get("/history_stats")
+async def get_history_stats():
+    return {"agents": history_stats()}
+
+@app.get("/checkpoint_stats")
+async def checkpoint_stats():
+    return {
+        "agents": checkpointer.stats(),
+        "recommendation_graph": graph_checkpointer.stats(),
+        "store": store.stats(),
+    }
+
+@app.get("/llm_stats")
+async def llm_stats():
+    return {"providers": llm_gateway_stats()}
+
+@app.get("/ready")
+async def ready():
+    return JSONResponse(
+        {**readiness.stats(), "components": registry.stats()},
+        status_code=200 if readiness.is_ready else 503,
+    )
+
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/traces")
+async def traces(limit: int = 20, session_id: Optional[str] = None):
+    return {"traces": trace_log.recent(limit, session_id)}
+
+@app.get("/pool_stats")
+async def pool_stats():
+    return {"pool": pool_metrics.snapshot()}
+
+@app.get("/upload_stats")
+async def upload_stats():
+    return {"uploads": uploads.stats()}
+
 @app.get("/ViewData")
 async def view_data(db_name: Annotated[str, "Enter your database name:"] = "Ecommerce_Data"):
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT * FROM {db_name} LIMIT 5"))
-            rows = result.fetchall()
-            columns = result.keys()
+        def _preview():
+            with engine.connect() as conn:
+                result = conn.execute(text(f"SELECT * FROM {db_name} LIMIT 5"))
+                rows = result.fetchall()
+                columns = result.keys()
+            return [dict(zip(columns, row)) for row in rows]
 
-        data = [dict(zip(columns, row)) for row in rows]
+        data = await run_db(_preview)
 
         return {"data": data}
 
@@ -154,9 +369,13 @@ async def view_data(db_name: Annotated[str, "Enter your database name:"] = "Ecom
 @app.post("/ClearData")
 async def clear_data(table_name: Annotated[str, "Enter your table name:"]):
     try:
-        with engine.connect() as conn:
-            conn.execute(text(f"TRUNCATE TABLE {table_name}"))
-            conn.commit()
+        def _truncate():
+            with engine.connect() as conn:
+                conn.execute(text(f"TRUNCATE TABLE {table_name}"))
+                conn.commit()
+
+        await run_db(_truncate)
+        bump_table_version(table_name)
 
         return {"message": f"Table {table_name} data has been cleared successfully."}
 
@@ -185,11 +404,31 @@ def orders(user_id: Annotated[str, "Enter your user id:"]):
 def check_complaints(order_id: Annotated[str, "Enter your order_id:"]):
     try:
         with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT order_id,product_name,complaint_text,complaint_file_url FROM orders where order_id = '{order_id}' AND is_complaint = 1"))
+            result = conn.execute(text("""
+                SELECT o.order_id, o.product_name, o.complaint_text, o.complaint_file_url, a.file_url
+                FROM orders o
+                LEFT JOIN complaint_attachments a ON a.order_id = o.order_id
+                WHERE o.order_id = :order_id AND o.is_complaint = 1
+                ORDER BY a.id
+            """), {"order_id": order_id})
             rows = result.fetchall()
-            columns = result.keys()
 
-        data = [dict(zip(columns, row)) for row in rows]
+        data = []
+        for row in rows:
+            if not data:
+                # URLs saved before complaint_attachments existed live in the legacy column.
+                legacy_urls = [url for url in (row.complaint_file_url or "").split(";") if url]
+                data.append({
+                    "order_id": row.order_id,
+                    "product_name": row.product_name,
+                    "complaint_text": row.complaint_text,
+                    "complaint_file_urls": legacy_urls,
+                })
+            if row.file_url:
+                data[0]["complaint_file_urls"].append(row.file_url)
+
+        for complaint in data:
+            complaint["complaint_file_url"] = ";".join(complaint["complaint_file_urls"]) or None
 
         return {"data": data}
 
@@ -0,0 +1,62 @@
+"""
+Tests run offline against a throwaway SQLite database, with the benchmark
+stand-ins for the LLM providers and Supabase (benchmarks/standins.py).
+The stand-ins must be installed before any app module is imported.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import standins  # noqa: E402
+
+_fd, DB_PATH = tempfile.mkstemp(prefix="sparkmart_tests_", suffix=".sqlite")
+os.close(_fd)
+standins.install(DB_PATH)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The test database with every migration applied."""
+    from db.migrations import run_migrations
+
+    run_migrations()
+
+
+@pytest.fixture(scope="session")
+def catalog(database):
+    """A 500-row synthetic Ecommerce_Data table, indexed for catalog search."""
+    from benchmarks.catalog import catalog_frame
+    from core.search.bm25_index import catalog_search
+    from db.database import engine
+    from db.table_versions import bump_table_version
+
+    catalog_frame(0, 500).to_sql("Ecommerce_Data", engine, if_exists="replace", index=False)
+    bump_table_version("Ecommerce_Data")
+    # The version bump also schedules a rebuild on the DB executor; whichever
+    # run holds the rebuild lock, wait for it to publish the snapshot.
+    catalog_search.rebuild()
+    deadline = time.monotonic() + 30
+    while not catalog_search.is_ready():
+        assert time.monotonic() < deadline, "catalog index was not rebuilt"
+        time.sleep(0.05)
+    return catalog_search
+
+
+@pytest.fixture(scope="session")
+def client(catalog):
+    """The app, served in-process, over the indexed test catalog."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from core.search import bm25_index
+from core.search.bm25_index import BM25Index, CatalogSearch, is_simple_lookup
+from db.database import engine
+from db.table_versions import bump_table_version
+
+TABLE = "Catalog_Search_Test"
+ROWS = [
+    {"Product_Name": "Samsung Galaxy S21", "Category": "Electronics", "Price": 699.0},
+    {"Product_Name": "Samsung Galaxy Buds", "Category": "Electronics", "Price": 99.0},
+    {"Product_Name": "Sony Headphones", "Category": "Electronics", "Price": 199.0},
+    {"Product_Name": "Trail Jacket", "Category": "Clothing", "Price": 79.0},
+]
+
+
+def test_bm25_ranks_the_closest_row_first():
+    index = BM25Index()
+    index.add_documents(ROWS[:2])
+    index.add_documents(ROWS[2:])
+
+    (_, best), *_ = index.search("galaxy s21")
+    assert best["Product_Name"] == "Samsung Galaxy S21"
+    assert [row["Product_Name"] for _, row in index.search("samsung s21", require_all_terms=True)] == ["Samsung Galaxy S21"]
+    assert index.search("samsung tablet", require_all_terms=True) == []
+
+
+@pytest.mark.parametrize("query, simple", [
+    ("samsung galaxy s21", True),
+    ("show me sony headphones", True),
+    ("cheapest samsung phone", False),
+    ("headphones under 100", False),
+    ("is that one waterproof", False),
+    ("", False),
+])
+def test_simple_lookups(query, simple):
+    assert is_simple_lookup(query) is simple
+
+
+@pytest.fixture
+def search(database):
+    pd.DataFrame(ROWS).to_sql(TABLE, engine, if_exists="replace", index=False)
+    bump_table_version(TABLE)
+    search = CatalogSearch(TABLE)
+    search.rebuild()
+    return search
+
+
+def test_lookup_answers_from_the_current_snapshot(search):
+    assert [row["Product_Name"] for row in search.lookup("galaxy buds")] == ["Samsung Galaxy Buds"]
+    assert search.lookup("cheapest galaxy") is None
+    assert search.lookup("galaxy tablet") is None
+    assert search.stats()["documents"] == 4
+
+
+def test_a_stale_snapshot_is_never_used(search):
+    bump_table_version(TABLE)
+    assert not search.is_ready()
+    assert search.lookup("galaxy buds") is None
+    assert not search.knows_any({"galaxy"})
+
+    search.rebuild()
+    assert search.knows_any({"galaxy"})
+
+
+def test_vectors_are_swapped_in_with_their_rows(search, monkeypatch):
+    monkeypatch.setattr(bm25_index, "VECTOR_RETRIEVAL_MODE", "candidates")
+    search.rebuild()
+    snapshot = search.current()
+    assert snapshot.vectors.size == len(snapshot.index)
+
+    score, row = search.semantic_search("wireless samsung earbuds galaxy", k=1)[0]
+    assert row["Product_Name"].startswith("Samsung Galaxy")
+
+
+def test_tables_over_the_row_limit_are_not_indexed(search, monkeypatch):
+    monkeypatch.setattr(bm25_index, "MAX_INDEXED_ROWS", 2)
+    search.rebuild()
+    assert search.snapshot is None and search.lookup("galaxy buds") is None
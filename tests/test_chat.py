@@ -0,0 +1,34 @@
+def _chat(client, query: str, session_id: str = None):
+    headers = {"session-id": session_id} if session_id else {}
+    response = client.post("/Chat", params={"query": query}, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_supervisor_turn_runs_the_recommendation_graph(client):
+    from core.router import pre_router
+
+    fallbacks = pre_router.fallbacks
+    body = _chat(client, "samsung galaxy s21")
+
+    assert body["is_new_session"] and body["session_id"]
+    assert pre_router.fallbacks == fallbacks + 1
+    assert "**Samsung Galaxy S21" in body["response"]
+    assert not body["message"].startswith(("LLM service error", "Unexpected error"))
+
+
+def test_pre_routed_turn_continues_the_session(client):
+    from core.router import pre_router
+
+    session_id = _chat(client, "samsung galaxy s21")["session_id"]
+    hits = pre_router.route_hits["browse_phrase"]
+    body = _chat(client, "show me samsung laptops", session_id)
+
+    assert body["session_id"] == session_id and not body["is_new_session"]
+    assert pre_router.route_hits["browse_phrase"] == hits + 1
+    assert body["response"]
+
+
+def test_greeting_is_answered_by_the_general_agent(client):
+    body = _chat(client, "hi")
+    assert body["response"] and not body["message"].startswith("LLM service error")
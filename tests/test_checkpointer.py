@@ -0,0 +1,82 @@
+import time
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from common.checkpointer import BoundedInMemorySaver, BoundedInMemoryStore
+
+
+def _save(saver, thread_id: str, payload: str = "x"):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": payload}
+    checkpoint["channel_versions"] = {"messages": 1}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, checkpoint, {}, {"messages": 1})
+
+
+def _load(saver, thread_id: str):
+    return saver.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+
+
+def test_least_recently_used_session_is_evicted():
+    saver = BoundedInMemorySaver("test", max_sessions=2)
+    _save(saver, "a")
+    _save(saver, "b")
+    _load(saver, "a")
+    _save(saver, "c")
+
+    assert _load(saver, "b") is None
+    assert _load(saver, "a") is not None
+    assert saver.evictions["sessions"] >= 1
+
+
+def test_byte_cap_keeps_the_current_session():
+    saver = BoundedInMemorySaver("test", max_bytes=1)
+    _save(saver, "a", "x" * 1000)
+    _save(saver, "b", "y" * 1000)
+
+    assert saver.stats()["resident_sessions"] == 1
+    assert saver.evictions["bytes"] == 1
+    assert _load(saver, "a") is None
+    assert _load(saver, "b") is not None
+
+
+def test_evicted_sessions_are_restored_from_the_spill_file(tmp_path):
+    saver = BoundedInMemorySaver("test", max_sessions=1, spill_path=str(tmp_path / "spill.sqlite"))
+    _save(saver, "a", "hello")
+    _save(saver, "b")
+    assert saver.stats()["spilled_sessions"] == 1
+
+    restored = _load(saver, "a")
+    assert restored.checkpoint["channel_values"]["messages"] == "hello"
+    assert saver.restores == 1
+
+
+def test_delete_thread_releases_its_bytes():
+    saver = BoundedInMemorySaver("test")
+    _save(saver, "a", "x" * 1000)
+    saver.delete_thread("a")
+    assert saver.stats()["resident_bytes"] == 0
+    assert _load(saver, "a") is None
+
+
+def test_store_evicts_least_recently_written_namespaces():
+    store = BoundedInMemoryStore(max_namespaces=2)
+    store.put(("memories", "a"), "k", {"v": 1})
+    store.put(("memories", "b"), "k", {"v": 2})
+    store.put(("memories", "a"), "k2", {"v": 3})
+    store.put(("memories", "c"), "k", {"v": 4})
+
+    assert store.get(("memories", "b"), "k") is None
+    assert store.get(("memories", "a"), "k2").value == {"v": 3}
+    assert store.stats()["namespaces"] == 2
+    assert store.evictions["namespaces"] == 1
+
+
+def test_store_drops_idle_namespaces():
+    store = BoundedInMemoryStore(ttl_seconds=0.01)
+    store.put(("memories", "a"), "k", {"v": 1})
+    time.sleep(0.02)
+    store.put(("memories", "b"), "k", {"v": 2})
+
+    assert store.get(("memories", "a"), "k") is None
+    assert store.evictions["ttl"] == 1
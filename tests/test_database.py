@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from db.database import LazySQLDatabase, _pool_args
+from db.pool_metrics import TimedQueuePool
+
+
+@pytest.mark.parametrize("url, poolclass", [
+    ("mysql+pymysql://user:pw@host:3306/db", TimedQueuePool),
+    ("sqlite://", StaticPool),
+    ("sqlite:///:memory:", StaticPool),
+    ("sqlite:///file:shared?mode=memory&uri=true", StaticPool),
+    ("sqlite:///sparkmart.db", None),
+])
+def test_pool_per_backend(url, poolclass):
+    assert _pool_args(url).get("poolclass") is poolclass
+
+
+def test_in_memory_sqlite_is_shared_across_connections():
+    engine = create_engine("sqlite://", **_pool_args("sqlite://"))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (x INT)")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM t").scalar() == 0
+
+
+def test_nothing_connects_until_first_use(tmp_path):
+    db = LazySQLDatabase(create_engine(f"sqlite:///{tmp_path / 'missing' / 'app.db'}"))
+    assert "_engine" not in db.__dict__
+
+
+def test_a_failed_load_is_retried(tmp_path):
+    folder = tmp_path / "later"
+    db = LazySQLDatabase(create_engine(f"sqlite:///{folder / 'app.db'}"))
+
+    with pytest.raises(OperationalError):
+        db.get_usable_table_names()
+    assert "_engine" not in db.__dict__
+
+    folder.mkdir()
+    assert list(db.get_usable_table_names()) == []
+    assert db.dialect == "sqlite"
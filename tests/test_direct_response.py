@@ -0,0 +1,18 @@
+from core.router import turn_stats
+from core.supervisor_agent import DIRECT_RESPONSE_TOOLS, supervisor_tools
+
+
+def test_every_sub_agent_answers_directly_by_default():
+    assert DIRECT_RESPONSE_TOOLS == {tool.name for tool in supervisor_tools}
+    assert all(tool.return_direct for tool in supervisor_tools)
+
+
+def test_supervisor_turn_makes_only_the_routing_call(client):
+    before = dict(turn_stats.modes["direct_response"])
+    response = client.post("/Chat", params={"query": "samsung galaxy s21"}).json()
+    after = turn_stats.modes["direct_response"]
+
+    assert "**Samsung Galaxy S21" in response["response"]
+    assert after["turns"] == before["turns"] + 1
+    # The supervisor picks the tool and stops; the tool's answer is the reply.
+    assert after["supervisor_calls"] == before["supervisor_calls"] + 1
@@ -0,0 +1,56 @@
+import pytest
+
+from core.workflow import formatters
+from core.workflow.formatters import needs_llm, render_products
+
+ROWS = [
+    {"Product_Name": "Trail Jacket", "Brand": "Acme", "Price": "79.5", "Rating": "4.5"},
+    {"Product_Name": "Rain Shell", "Brand": "Acme", "Price": 120, "Rating": None},
+]
+
+
+@pytest.fixture(autouse=True)
+def auto_mode(monkeypatch):
+    monkeypatch.setattr(formatters, "RESPONSE_FORMATTER_MODE", "auto")
+
+
+@pytest.mark.parametrize("query", [
+    "recommend me a waterproof jacket",
+    "suggest some headphones under 100",
+    "any advice on laptops for students",
+    "waterproof jackets",
+])
+def test_lists_are_rendered_locally(query):
+    assert not needs_llm(query)
+
+
+@pytest.mark.parametrize("query", [
+    "compare the sony and bose headphones",
+    "sony vs bose",
+    "which jacket is better for rain",
+    "why is this one so expensive",
+    "is the first one waterproof",
+])
+def test_judgements_and_references_use_the_llm(query):
+    assert needs_llm(query)
+
+
+def test_mode_overrides(monkeypatch):
+    monkeypatch.setattr(formatters, "RESPONSE_FORMATTER_MODE", "template")
+    assert not needs_llm("compare these")
+    monkeypatch.setattr(formatters, "RESPONSE_FORMATTER_MODE", "llm")
+    assert needs_llm("jackets")
+
+
+def test_render_products_formats_known_columns():
+    response = render_products("jackets", ROWS)
+    assert "1. **Trail Jacket**" in response
+    assert "Price: $79.50" in response and "Rating: 4.5/5" in response
+    assert "Price: $120.00" in response
+    assert response.count("Rating:") == 1
+
+
+def test_render_products_without_rows_lists_categories():
+    response = render_products("tents", [], categories=["Jackets", "Shoes"])
+    assert "don't have products matching \"tents\"" in response
+    assert "Jackets, Shoes" in response
@@ -0,0 +1,52 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from core.agents.history import HistoryCompactionMiddleware, extract_facts
+
+
+def _turn(i: int, product: str = None):
+    answer = f"Here you go: **{product}**" if product else f"answer {i}"
+    return [
+        HumanMessage(content=f"Session ID: s | User Query: question {i} " + "x" * 200),
+        AIMessage(content="", tool_calls=[{"name": "recommendation_tool", "args": {"request": f"q{i}"}, "id": f"c{i}"}]),
+        ToolMessage(content=answer, tool_call_id=f"c{i}"),
+        AIMessage(content=answer),
+    ]
+
+
+def test_short_history_is_sent_whole():
+    middleware = HistoryCompactionMiddleware("supervisor", max_turns=6, token_budget=100000)
+    messages = _turn(1) + _turn(2)
+    assert middleware.compact(messages) == (messages, "")
+
+
+def test_only_the_last_turns_are_kept_verbatim():
+    middleware = HistoryCompactionMiddleware("supervisor", max_turns=2, token_budget=100000)
+    messages = [message for i in range(5) for message in _turn(i, product=f"Jacket {i}")]
+
+    kept, facts = middleware.compact(messages)
+    assert kept == messages[-8:]
+    assert "Jacket 0" in facts and "Jacket 2" in facts and "Jacket 3" not in facts
+
+
+def test_token_budget_drops_turns_but_keeps_the_current_one():
+    middleware = HistoryCompactionMiddleware("supervisor", max_turns=6, token_budget=1)
+    messages = _turn(1) + _turn(2)
+    kept, _ = middleware.compact(messages)
+    assert kept == messages[4:]
+
+
+def test_facts_keep_ids_products_and_attachments():
+    facts = extract_facts([
+        HumanMessage(content="Session ID: s | User Query: my order_ab12 is broken | FileURL: /files/complaints/x.png"),
+        AIMessage(content="", tool_calls=[{"name": "save_order_tool", "args": {"product_name": "Trail Jacket"}, "id": "c"}]),
+        AIMessage(content="Saved. Your user id: 42"),
+    ])
+    assert "- User ID: 42" in facts
+    assert "order_ab12" in facts
+    assert "Trail Jacket" in facts
+    assert "/files/complaints/x.png" in facts
+    assert "my order_ab12 is broken" in facts
+
+
+def test_nothing_to_extract_gives_no_note():
+    assert extract_facts([AIMessage(content="hello")]) == ""
@@ -0,0 +1,49 @@
+import threading
+import uuid
+
+from sqlalchemy import text
+
+from db.database import engine
+from db.id_allocator import SequenceAllocator
+
+
+def _allocator(block_size: int = 1):
+    return SequenceAllocator(f"test_{uuid.uuid4().hex[:8]}", block_size=block_size)
+
+
+def _max_user_id():
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT MAX(user_id) FROM orders")).scalar()
+
+
+def test_ids_continue_after_existing_orders(database):
+    highest = _max_user_id()
+    first = _allocator().next_id()
+    assert first == (highest + 1 if highest and highest >= 10 else 10)
+
+
+def test_blocks_are_served_from_memory(database):
+    allocator = _allocator(block_size=5)
+    ids = [allocator.next_id() for _ in range(7)]
+    assert ids == list(range(ids[0], ids[0] + 7))
+    assert allocator.reservations == 2
+
+
+def test_workers_sharing_a_sequence_get_disjoint_ids(database):
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    workers = [SequenceAllocator(name, block_size=3) for _ in range(4)]
+    ids, lock = [], threading.Lock()
+
+    def allocate(allocator):
+        for _ in range(25):
+            value = allocator.next_id()
+            with lock:
+                ids.append(value)
+
+    threads = [threading.Thread(target=allocate, args=(worker,)) for worker in workers for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(ids) == len(set(ids)) == 200
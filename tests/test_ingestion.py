@@ -0,0 +1,73 @@
+import io
+
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+
+from db import ingestion
+from db.database import engine
+from db.ingestion import cast_frame, infer_column_kinds, ingest_upload
+
+TABLE = "Ingest_Test"
+
+CSV = (
+    "Product_Name,Stock,Price,Code,Notes\n"
+    "Trail Jacket,3,10,001,\n"
+    "Rain Shell,4,12,002,\n"
+    "Yoga Mat,5,12.5,A7,\n"
+    "Desk Lamp,,7,004,\n"
+)
+
+
+def _frames(*rows):
+    return [pd.DataFrame(chunk, dtype=str) for chunk in rows]
+
+
+def test_kinds_come_from_every_chunk():
+    frames = _frames({"a": ["1", "2"], "b": ["1", "2"]}, {"a": ["3", "4.5"], "b": ["x", None]})
+    assert infer_column_kinds(frames) == {"a": "float", "b": "text"}
+
+
+def test_empty_columns_are_text():
+    assert infer_column_kinds(_frames({"a": [None, " "]}, {"a": [""]})) == {"a": "text"}
+
+
+def test_cast_keeps_missing_integers_as_nulls():
+    chunk = cast_frame(pd.DataFrame({"n": ["1", ""], "s": ["001", "x"]}, dtype=str), {"n": "integer", "s": "text"})
+    assert str(chunk["n"].dtype) == "Int64" and chunk["n"].isna().tolist() == [False, True]
+    assert chunk["s"].tolist() == ["001", "x"]
+
+
+@pytest.fixture
+def small_chunks(database, monkeypatch):
+    monkeypatch.setattr(ingestion, "CHUNK_ROWS", 2)
+    yield
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+
+def test_upload_is_typed_from_all_rows(small_chunks):
+    job = ingest_upload(io.BytesIO(CSV.encode()), "csv", TABLE, "catalog.csv")
+    assert (job["status"], job["rows"], job["chunks"]) == ("completed", 4, 2)
+
+    types = {column["name"]: str(column["type"]).upper() for column in inspect(engine).get_columns(TABLE)}
+    assert types["Stock"] == "BIGINT"
+    assert types["Price"].startswith("FLOAT")  # 12.5 is only in the second chunk
+    assert types["Code"] == "TEXT"  # so are the non-numeric codes
+    assert types["Notes"] == "TEXT"
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT Stock, Price, Code FROM {TABLE} ORDER BY Product_Name")).fetchall()
+    assert [tuple(row) for row in rows] == [(None, 7.0, "004"), (4, 12.0, "002"), (3, 10.0, "001"), (5, 12.5, "A7")]
+
+
+def test_failed_upload_keeps_the_previous_table(small_chunks):
+    ingest_upload(io.BytesIO(CSV.encode()), "csv", TABLE, "catalog.csv")
+
+    with pytest.raises(ValueError):
+        ingest_upload(io.BytesIO(b"Product_Name,Stock\n"), "csv", TABLE, "empty.csv")
+
+    with engine.connect() as conn:
+        assert conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar() == 4
+    failed = list(ingestion.ingestion_jobs.values())[-1]
+    assert failed["status"] == "failed" and "no rows" in failed["error"]
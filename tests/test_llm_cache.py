@@ -0,0 +1,56 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.standins import BenchChatModel
+from common.cache import LRUCache
+from common.llm_cache import LLMResponseCache, SQLiteResponseStore, cache_key
+
+
+def _cache(disk=None):
+    return LLMResponseCache("test", LRUCache(maxsize=8), disk)
+
+
+def _ask(model, text: str):
+    return asyncio.run(model.ainvoke([HumanMessage(content=text)]))
+
+
+def test_repeated_prompt_is_served_from_memory():
+    cache = _cache()
+    model = BenchChatModel(cache=cache)
+
+    first = _ask(model, "Format response for User Query: jackets")
+    second = _ask(model, "Format response for User Query: jackets")
+
+    assert second.content == first.content
+    assert (cache.misses, cache.memory_hits, cache.writes) == (1, 1, 1)
+
+
+def test_model_parameters_are_part_of_the_key():
+    assert cache_key("prompt", "model-a temperature=0") != cache_key("prompt", "model-a temperature=1")
+
+
+def test_disk_tier_survives_a_new_memory_tier(tmp_path):
+    disk = SQLiteResponseStore(str(tmp_path / "llm_cache.sqlite"), ttl_seconds=60)
+    _ask(BenchChatModel(cache=_cache(disk)), "Format response for User Query: tents")
+
+    restarted = _cache(disk)
+    answer = _ask(BenchChatModel(cache=restarted), "Format response for User Query: tents")
+
+    assert answer.content == 'Here are the products I found for "tents".'
+    assert (restarted.disk_hits, restarted.misses) == (1, 0)
+    assert len(restarted.memory) == 1
+
+
+def test_expired_disk_entries_are_not_returned(tmp_path):
+    disk = SQLiteResponseStore(str(tmp_path / "llm_cache.sqlite"), ttl_seconds=-1)
+    disk.put("key", "[]")
+    assert disk.get("key") is None
+
+
+def test_only_listed_nodes_get_a_cache(monkeypatch):
+    from core.workflow import nodes
+
+    monkeypatch.setattr(nodes, "LLM_CACHE_NODES", {"query_generator"})
+    assert nodes._build_node_model("query_generator").cache.name == "query_generator"
+    assert nodes._build_node_model("response_formatter").cache is None
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+
+from benchmarks.standins import BenchChatModel
+from common.llm_gateway import GatewayChatModel, ProviderLimiter, request_key
+
+PROMPT = "Format response for User Query: jackets"
+
+
+def _gateway(latency_ms: float = 50.0, max_concurrency: int = 4):
+    limiter = ProviderLimiter("test", max_concurrency)
+    return GatewayChatModel(inner=BenchChatModel(latency_ms=latency_ms), provider="test", limiter=limiter), limiter
+
+
+def test_identical_concurrent_calls_share_one_upstream_call():
+    model, limiter = _gateway()
+
+    async def main():
+        return await asyncio.gather(*(model.ainvoke([HumanMessage(content=PROMPT)]) for _ in range(5)))
+
+    answers = asyncio.run(main())
+    assert {answer.content for answer in answers} == {'Here are the products I found for "jackets".'}
+    assert (limiter.calls, limiter.coalesced) == (1, 4)
+
+
+def test_different_prompts_are_not_coalesced():
+    model, limiter = _gateway()
+
+    async def main():
+        await asyncio.gather(
+            model.ainvoke([HumanMessage(content=PROMPT)]),
+            model.ainvoke([HumanMessage(content=PROMPT.replace("jackets", "tents"))]),
+        )
+
+    asyncio.run(main())
+    assert (limiter.calls, limiter.coalesced) == (2, 0)
+
+
+def test_message_ids_do_not_change_the_key():
+    first = request_key("test", {}, [HumanMessage(content=PROMPT, id="a")], None, {})
+    second = request_key("test", {}, [HumanMessage(content=PROMPT, id="b")], None, {})
+    assert first == second
+
+
+def test_a_cancelled_caller_does_not_fail_the_others():
+    model, limiter = _gateway(latency_ms=100)
+
+    async def main():
+        leader = asyncio.create_task(model.ainvoke([HumanMessage(content=PROMPT)]))
+        follower = asyncio.create_task(model.ainvoke([HumanMessage(content=PROMPT)]))
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()).content == 'Here are the products I found for "jackets".'
+    assert limiter.calls == 1 and limiter.errors == 0
+
+
+def test_concurrency_is_capped_per_provider():
+    model, limiter = _gateway(latency_ms=30, max_concurrency=2)
+
+    async def main():
+        await asyncio.gather(*(model.ainvoke([HumanMessage(content=f"{PROMPT} {i}")]) for i in range(6)))
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert stats["calls"] == 6 and stats["in_flight"] == 0
+    assert stats["max_queue_depth"] >= 4
+
+
+def test_bound_tools_are_part_of_the_request():
+    @tool
+    def lookup(query: str) -> str:
+        """Looks a product up."""
+        return query
+
+    model, limiter = _gateway(latency_ms=0)
+    bound = model.bind_tools([lookup])
+    assert bound.kwargs["tools"][0]["function"]["name"] == "lookup"
+
+    asyncio.run(bound.ainvoke([HumanMessage(content=PROMPT)]))
+    asyncio.run(model.ainvoke([HumanMessage(content=PROMPT)]))
+    assert limiter.calls == 2
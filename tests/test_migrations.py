@@ -0,0 +1,33 @@
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from db.database import engine
+from db.migrations import MIGRATIONS, apply_catalog_indexes, run_migrations
+
+
+def _indexes(table_name: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def test_every_migration_is_recorded_once(database):
+    assert run_migrations() == []
+    with engine.connect() as conn:
+        versions = conn.execute(text("SELECT version FROM schema_migrations ORDER BY version")).scalars().all()
+    assert versions == [version for version, _, _ in MIGRATIONS]
+
+
+def test_hot_path_indexes_exist(database):
+    assert {"idx_orders_user_id", "idx_orders_order_id_is_complaint"} <= _indexes("orders")
+
+
+def test_catalog_indexes_are_reapplied_and_idempotent(database):
+    pd.DataFrame({"Product_Name": ["a"], "category": ["b"], "Price": [1.0], "Other": [1]}).to_sql(
+        "Index_Test", engine, if_exists="replace", index=False
+    )
+    with engine.begin() as conn:
+        created = apply_catalog_indexes(conn, "Index_Test")
+        assert apply_catalog_indexes(conn, "Index_Test") == []
+        conn.execute(text("DROP TABLE Index_Test"))
+
+    # Column names match case-insensitively; unknown columns are skipped.
+    assert "category" in created and "Price" in created and "Other" not in created
@@ -0,0 +1,53 @@
+import asyncio
+import re
+
+from sqlalchemy import text
+
+from core.agents.tools import save_order_tool
+from db.database import engine
+
+
+def _save(details: dict) -> str:
+    return asyncio.run(save_order_tool.ainvoke({"order_details": details}))
+
+
+def _place_order(product: str = "Trail Jacket") -> str:
+    answer = _save({"product_name": product})
+    return re.search(r"Order ID: `(order_[0-9a-f]+)`", answer).group(1)
+
+
+def test_order_is_placed_with_a_user_id(database):
+    order_id = _place_order()
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT product_name, user_id, is_complaint FROM orders WHERE order_id = :id"), {"id": order_id}
+        ).one()
+    assert row.product_name == "Trail Jacket" and row.user_id >= 10 and not row.is_complaint
+
+
+def test_complaint_and_attachments_are_recorded_together(database):
+    order_id = _place_order()
+    _save({"order_id": order_id, "complaint_text": "zip is broken", "complaint_file_url": "/files/complaints/a.png"})
+    answer = _save({"order_id": order_id, "complaint_file_url": "/files/complaints/b.png"})
+    assert "with attached evidence" in answer
+
+    with engine.connect() as conn:
+        order = conn.execute(
+            text("SELECT is_complaint, complaint_text FROM orders WHERE order_id = :id"), {"id": order_id}
+        ).one()
+        files = conn.execute(
+            text("SELECT file_url FROM complaint_attachments WHERE order_id = :id ORDER BY file_url"), {"id": order_id}
+        ).scalars().all()
+
+    # A later attachment without text keeps the first complaint text.
+    assert order.is_complaint and order.complaint_text == "zip is broken"
+    assert files == ["/files/complaints/a.png", "/files/complaints/b.png"]
+
+
+def test_complaint_for_an_unknown_order(database):
+    answer = _save({"order_id": "order_missing", "complaint_text": "never arrived", "complaint_file_url": "/files/x.png"})
+    assert "could not find an order" in answer
+    with engine.connect() as conn:
+        assert not conn.execute(
+            text("SELECT COUNT(*) FROM complaint_attachments WHERE order_id = 'order_missing'")
+        ).scalar()
@@ -0,0 +1,51 @@
+import pytest
+
+from core.workflow.query_cache import NLToSQLCache, normalize_query
+
+JACKETS_SQL = "SELECT * FROM Ecommerce_Data WHERE Product_Name LIKE '%jacket%'"
+
+
+@pytest.fixture
+def cache(database):
+    return NLToSQLCache("Query_Cache_Test", maxsize=16, ttl_seconds=60)
+
+
+def test_normalization_ignores_wording():
+    assert normalize_query("Show me some affordable jackets") == normalize_query("cheap jacket")
+    assert normalize_query("jackets under budget") == ("cheap", "jacket")
+
+
+def test_referential_queries_are_not_cached(cache):
+    assert normalize_query("show me the first one") is None
+    cache.store("buy that one", JACKETS_SQL)
+    assert len(cache._cache) == 0
+
+
+def test_exact_and_filler_only_differences_hit(cache):
+    cache.store("waterproof hiking jackets", JACKETS_SQL)
+    assert cache.lookup("show me waterproof hiking jackets") == JACKETS_SQL
+    assert cache.lookup("waterproof hiking jacket products") == JACKETS_SQL
+    assert (cache.exact_hits, cache.similar_hits) == (1, 1)
+
+
+@pytest.mark.parametrize("stored, asked", [
+    # The cached SQL filters on a word the new query does not have.
+    ("waterproof hiking jackets men", "waterproof hiking jackets"),
+    # The new query asks for a filter the cached SQL lacks.
+    ("waterproof hiking jackets", "waterproof hiking jackets men"),
+    ("cheap jackets", "cheapest jackets"),
+    ("good headphones", "top headphones"),
+    ("headphones under 100", "headphones under 200"),
+])
+def test_different_filters_miss(cache, stored, asked):
+    cache.store(stored, JACKETS_SQL)
+    assert cache.lookup(asked) is None
+    assert cache.misses == 1
+
+
+def test_entries_expire_with_the_catalog_version(cache):
+    from db.table_versions import bump_table_version
+
+    cache.store("waterproof jackets", JACKETS_SQL)
+    bump_table_version("Query_Cache_Test")
+    assert cache.lookup("waterproof jackets") is None
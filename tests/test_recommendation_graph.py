@@ -0,0 +1,52 @@
+import asyncio
+import time
+import uuid
+
+from core.workflow import recommendation_graph as module
+
+
+def _run(graph, query: str) -> dict:
+    config = {"configurable": {"thread_id": f"test_{uuid.uuid4().hex}"}}
+    return asyncio.run(graph.ainvoke({"user_query": query, "session_id": "test", "node_timings": None}, config))
+
+
+def _slow(node, seconds: float):
+    async def run(state):
+        await asyncio.sleep(seconds)
+        return await node(state) if asyncio.iscoroutinefunction(node) else node(state)
+    return run
+
+
+def test_keyword_lookup_skips_sql(catalog):
+    state = _run(module.build_recommendation_graph(), "samsung galaxy s21")
+    assert state["search_source"] == "bm25"
+    assert set(state["node_timings"]) == {"intent_detector", "schema_inspector", "catalog_search", "response_formatter"}
+    assert "**Samsung Galaxy S21" in state["formatted_response"]
+
+
+def test_other_queries_go_through_sql(catalog):
+    state = _run(module.build_recommendation_graph(), "warm jacket under 200 dollars")
+    assert state["search_source"] == "sql"
+    assert {"query_generator", "query_validator", "query_executor"} <= set(state["node_timings"])
+    assert state["sql_query"].lower().startswith("select")
+
+
+def test_intent_and_schema_run_in_parallel(catalog, monkeypatch):
+    monkeypatch.setattr(module, "intent_detector_node", _slow(module.intent_detector_node, 0.2))
+    monkeypatch.setattr(module, "inspect_schema_node", _slow(module.inspect_schema_node, 0.2))
+    graph = module.build_recommendation_graph()
+
+    start = time.perf_counter()
+    state = _run(graph, "samsung galaxy s21")
+    assert time.perf_counter() - start < 0.35
+    assert state["node_timings"]["intent_detector"] >= 200 and state["node_timings"]["schema_inspector"] >= 200
+
+
+def test_errors_skip_to_the_formatter(catalog, monkeypatch):
+    async def broken_schema(state):
+        return {"error_message": "Database schema inspection failed: down"}
+
+    monkeypatch.setattr(module, "inspect_schema_node", broken_schema)
+    state = _run(module.build_recommendation_graph(), "warm jacket under 200 dollars")
+    assert "query_generator" not in state["node_timings"]
+    assert state["formatted_response"]
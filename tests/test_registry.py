@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from common.readiness import Readiness
+from common.registry import ComponentRegistry
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_concurrent_gets_build_once():
+    registry, builds = ComponentRegistry(), []
+
+    def factory():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry.register("model", factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("model"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1 and len({id(result) for result in results}) == 1
+
+
+def test_factories_can_depend_on_other_components():
+    registry = ComponentRegistry()
+    registry.register("client", lambda: "client")
+    registry.register("agent", lambda: f"agent({registry.get('client')})")
+    assert registry.get("agent") == "agent(client)"
+    assert registry.is_built("client")
+
+
+def test_a_failed_build_is_reported_and_retried():
+    registry, attempts = ComponentRegistry(), []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("provider unreachable")
+        return "ok"
+
+    registry.register("flaky", flaky)
+    asyncio.run(registry.warm_up())
+    assert registry.stats()["flaky"] == {"built": False, "build_seconds": None, "error": "provider unreachable"}
+
+    assert registry.get("flaky") == "ok"
+    assert registry.stats()["flaky"]["error"] is None
+
+
+def test_readiness_records_failed_phases():
+    readiness = Readiness()
+    with readiness.phase("migrations"):
+        pass
+    with readiness.phase("warm_up"):
+        raise RuntimeError("database down")
+    readiness.mark_ready()
+
+    stats = readiness.stats()
+    assert set(stats["phases"]) == {"migrations", "warm_up"}
+    assert stats["errors"] == {"warm_up": "database down"} and not readiness.is_ready
+
+
+def test_importing_the_app_builds_nothing(tmp_path):
+    script = (
+        "import json, sys\n"
+        "from benchmarks import standins\n"
+        f"standins.install({str(tmp_path / 'app.sqlite')!r})\n"
+        "import main\n"
+        "from common.registry import registry\n"
+        "print(json.dumps({name: entry['built'] for name, entry in registry.stats().items()}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    built = json.loads(result.stdout.strip().splitlines()[-1])
+    assert {"supervisor_agent", "recommendation_graph", "supabase", "storage"} <= set(built)
+    assert not any(built.values())
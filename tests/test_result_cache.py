@@ -0,0 +1,65 @@
+import pytest
+
+from core.workflow import result_cache as module
+from core.workflow.result_cache import ResultCache, canonicalize_sql, referenced_tables
+
+SQL = "SELECT * FROM Ecommerce_Data WHERE Product_Name LIKE '%Galaxy  S21%' LIMIT 10;"
+ROWS = [{"Product_Name": "Samsung Galaxy S21", "Price": 699.0}]
+
+
+@pytest.fixture
+def cache(database):
+    return ResultCache(max_entries=8, max_bytes=1024 * 1024, ttl_seconds=60)
+
+
+def test_canonical_sql_keeps_string_literals():
+    assert canonicalize_sql(SQL) == "select * from ecommerce_data where product_name like '%Galaxy  S21%' limit 10"
+    assert referenced_tables(canonicalize_sql("SELECT a FROM x JOIN `y` ON 1 WHERE b = 'from z'")) == {"x", "y"}
+
+
+def test_hit_for_the_same_query_in_other_wording(cache):
+    key, rows = cache.get(SQL)
+    assert key is not None and rows is None
+    cache.put(key, ROWS)
+
+    _, rows = cache.get("select *  from ecommerce_data where product_name like '%Galaxy  S21%' limit 10")
+    assert rows == ROWS
+
+
+def test_callers_cannot_mutate_cached_rows(cache):
+    key, _ = cache.get(SQL)
+    rows = [dict(row) for row in ROWS]
+    cache.put(key, rows)
+    rows[0]["Price"] = 1.0
+
+    _, first = cache.get(SQL)
+    first[0]["Price"] = 2.0
+    assert cache.get(SQL)[1] == ROWS
+
+
+def test_tables_without_versions_bypass_the_cache(cache):
+    assert cache.get("SELECT * FROM orders") == (None, None)
+    assert cache.get("SELECT * FROM Ecommerce_Data JOIN orders ON 1") == (None, None)
+    assert cache.stats()["bypassed"] == 2
+
+
+def test_rows_are_stored_under_the_version_read_before_the_query(cache, monkeypatch):
+    key, _ = cache.get(SQL)
+    # The table changes while the query runs; its rows must not be served for the new version.
+    monkeypatch.setattr(module, "get_table_version", lambda table: 99)
+    cache.put(key, ROWS)
+    assert cache.get(SQL)[1] is None
+
+
+def test_table_change_clears_entries(cache):
+    key, _ = cache.get(SQL)
+    cache.put(key, ROWS)
+    cache._on_table_change("ecommerce_data", 2)
+    assert cache.stats()["entries"] == 0
+
+
+def test_results_over_the_byte_budget_are_not_stored(database):
+    cache = ResultCache(max_entries=8, max_bytes=100, ttl_seconds=60)
+    key, _ = cache.get(SQL)
+    cache.put(key, ROWS * 10)
+    assert cache.get(SQL)[1] is None
@@ -0,0 +1,60 @@
+import pytest
+
+from core.router import PreRouter, pre_router
+
+ROUTED = [
+    ("hi", "general_query_tool"),
+    ("thank you so much!", "general_query_tool"),
+    ("my headphones arrived broken", "complain_handler_tool"),
+    ("where is my order", "complain_handler_tool"),
+    ("what is the status of order_ab12cd34", "complain_handler_tool"),
+    ("i want to buy it", "purchase_agent_tool"),
+    ("buy the samsung galaxy s21", "purchase_agent_tool"),
+    ("i'll take the first one", "purchase_agent_tool"),
+    ("add it to my cart", "purchase_agent_tool"),
+    ("checkout", "purchase_agent_tool"),
+    ("show me headphones", "recommendation_tool"),
+    ("do you have samsung laptops", "recommendation_tool"),
+    ("recommend me a jacket", "recommendation_tool"),
+    ("what products do you have", "recommendation_tool"),
+]
+
+FALLBACK = [
+    "list my orders",
+    "do you have refunds policy",
+    "do you have a store in delhi",
+    "I want to buy headphones, what do you recommend",
+    "i want to buy a gift, any suggestions",
+    "buying guide for laptops",
+    "buyers recommend which phone",
+    "purchased headphones last week and now they are gone",
+    "checkout the new jackets",
+    "is the sony laptop better than the dell one",
+    "hi, show me headphones or fix my order",
+]
+
+
+@pytest.mark.parametrize("query, tool", ROUTED)
+def test_confident_queries_are_dispatched(catalog, query, tool):
+    decision = pre_router.route(query)
+    assert decision is not None and decision[1] == tool
+
+
+@pytest.mark.parametrize("query", FALLBACK)
+def test_ambiguous_queries_go_to_the_supervisor(catalog, query):
+    assert pre_router.route(query) is None
+
+
+def test_attachment_routes_to_complaints(catalog):
+    assert pre_router.route("here is the photo", file_url="/files/complaints/x.png") == (
+        "complaint_attachment", "complain_handler_tool"
+    )
+
+
+def test_conflicting_rules_fall_back(catalog):
+    # Purchase phrase plus complaint keyword: two tools, so no dispatch.
+    assert pre_router.route("i want to buy the broken one") is None
+
+
+def test_disabled_router_never_dispatches(catalog):
+    assert PreRouter(enabled=False).route("hi") is None
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from core.workflow.schema_cache import SchemaCache
+from db.table_versions import bump_table_version
+
+TABLE = "Schema_Cache_Test"
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return ["Product_Name"], ["Jackets"], [f"load {self.calls}"]
+
+
+def test_concurrent_misses_share_one_load():
+    cache, loader = SchemaCache(TABLE, ttl_seconds=60), Loader()
+
+    async def main():
+        return await asyncio.gather(*(cache.get(loader) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert loader.calls == 1
+    assert all(result == results[0] for result in results)
+    assert (cache.misses, cache.hits) == (1, 4)
+
+
+def test_a_version_bump_reloads():
+    cache, loader = SchemaCache(TABLE, ttl_seconds=60), Loader()
+    asyncio.run(cache.get(loader))
+    asyncio.run(cache.get(loader))
+    bump_table_version(TABLE)
+
+    assert asyncio.run(cache.get(loader))[2] == ["load 2"]
+
+
+def test_entries_expire_after_the_ttl():
+    cache, loader = SchemaCache(TABLE, ttl_seconds=0), Loader()
+    asyncio.run(cache.get(loader))
+    asyncio.run(cache.get(loader))
+    assert loader.calls == 2
+
+
+def test_a_failed_load_is_not_cached():
+    cache, loader = SchemaCache(TABLE, ttl_seconds=60), Loader()
+
+    async def failing():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get(failing))
+    assert asyncio.run(cache.get(loader))[2] == ["load 1"]
+
+
+def test_inspect_schema_node_reads_the_catalog(catalog):
+    from core.workflow import nodes
+    from core.workflow.schema_cache import schema_cache
+
+    schema_cache.invalidate()
+    update = asyncio.run(nodes.inspect_schema_node({}))
+    assert "Product_Name" in update["available_columns"]
+    assert update["available_categories"] and len(update["sample_products"]) == 10
@@ -0,0 +1,82 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from utils import storage
+from utils.storage import LimitedReader, LocalStorage, UploadTooLarge, storage_path
+
+
+@pytest.mark.parametrize("order_id, filename, prefix, ext", [
+    ("order_ab12", "photo.png", "order_ab12_", ".png"),
+    ("../../etc", "passwd", "etc_", ""),
+    ("a/b\\c", "x.tar.gz", "abc_", ".gz"),
+    ("", "evil.p/../hp", "upload_", ".hp"),
+    (None, None, "upload_", ""),
+])
+def test_storage_paths_are_flat_and_unique(order_id, filename, prefix, ext):
+    first, second = storage_path(order_id, filename), storage_path(order_id, filename)
+    assert first != second
+    assert first.startswith(prefix) and first.endswith(ext)
+    assert "/" not in first and "\\" not in first and ".." not in first
+
+
+def test_limited_reader_stops_past_the_limit():
+    reader = io.BufferedReader(LimitedReader(io.BytesIO(b"x" * 10), "f", limit=10))
+    assert reader.read() == b"x" * 10
+
+    reader = io.BufferedReader(LimitedReader(io.BytesIO(b"x" * 11), "f", limit=10))
+    with pytest.raises(UploadTooLarge):
+        reader.read()
+
+
+def test_local_storage_writes_inside_its_bucket(tmp_path):
+    local = LocalStorage(str(tmp_path), "/files", "complaints")
+    local.put("a.png", io.BytesIO(b"png"), "image/png")
+    assert (tmp_path / "complaints" / "a.png").read_bytes() == b"png"
+    assert local.public_url("a.png") == "/files/complaints/a.png"
+
+    with pytest.raises(ValueError):
+        local.put("../escaped.png", io.BytesIO(b"png"), None)
+    assert not (tmp_path / "escaped.png").exists()
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path):
+    local = LocalStorage(str(tmp_path), "/files", "complaints")
+    reader = io.BufferedReader(LimitedReader(io.BytesIO(b"x" * 100), "f", limit=10))
+    with pytest.raises(UploadTooLarge):
+        local.put("big.png", reader, None)
+    assert os.listdir(tmp_path / "complaints") == []
+
+
+def _upload_file(data: bytes, size=None):
+    return UploadFile(io.BytesIO(data), size=size, filename="photo.png", headers=Headers({"content-type": "image/png"}))
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    local = LocalStorage(str(tmp_path), "/files", "complaints")
+    monkeypatch.setattr(storage.registry, "get", lambda name: local)
+    return tmp_path
+
+
+def test_upload_runs_in_the_background_and_can_be_awaited(local_storage):
+    url = storage.start_upload(_upload_file(b"png"), order_id="order_1")
+    assert url.startswith("/files/complaints/order_1_") and url.endswith(".png")
+
+    assert asyncio.run(storage.uploads.wait(url)) is None
+    assert (local_storage / "complaints" / url.rsplit("/", 1)[1]).read_bytes() == b"png"
+
+
+def test_oversized_uploads_are_rejected(local_storage, monkeypatch):
+    monkeypatch.setattr(storage, "UPLOAD_MAX_BYTES", 4)
+    with pytest.raises(UploadTooLarge):
+        storage.start_upload(_upload_file(b"x" * 10, size=10), order_id="order_1")
+
+    # Without a declared size the limit is enforced while streaming.
+    url = storage.start_upload(_upload_file(b"x" * 10), order_id="order_1")
+    assert "larger than the 4 byte limit" in asyncio.run(storage.uploads.wait(url))
+    assert os.listdir(local_storage / "complaints") == []
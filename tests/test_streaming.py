@@ -0,0 +1,39 @@
+import json
+
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append(json.loads(lines["data"]))
+    return events
+
+
+def test_sse_turn_streams_tokens_and_ends_with_the_response(client):
+    response = client.post("/ChatStream", params={"query": "samsung galaxy s21"})
+    events = _events(response.text)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert events[0]["type"] == "session" and events[0]["is_new_session"]
+    assert events[-1]["type"] == "done"
+    assert "**Samsung Galaxy S21" in events[-1]["response"]
+    assert {"tool", "node"} <= {event["type"] for event in events}
+
+
+def test_sse_keeps_the_session(client):
+    first = _events(client.post("/ChatStream", params={"query": "hi"}).text)[0]["session_id"]
+    again = _events(client.post("/ChatStream", params={"query": "hi"}, headers={"session-id": first}).text)[0]
+    assert again == {"type": "session", "session_id": first, "is_new_session": False}
+
+
+def test_websocket_turns_share_the_announced_session(client):
+    with client.websocket_connect("/ws/Chat") as websocket:
+        websocket.send_json({"query": "show me samsung laptops"})
+        session = websocket.receive_json()
+        events = []
+        while not events or events[-1]["type"] not in ("done", "error"):
+            events.append(websocket.receive_json())
+        assert events[-1]["type"] == "done" and events[-1]["response"]
+
+        websocket.send_json({"query": "hi"})
+        assert websocket.receive_json()["session_id"] == session["session_id"]
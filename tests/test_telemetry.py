@@ -0,0 +1,67 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+from common.telemetry import (
+    RequestTracingMiddleware, current_trace, record_span, span, span_seconds, start_trace, summarize, trace_log,
+)
+
+
+def _request_count(name: str) -> float:
+    return sum(
+        sample.value
+        for metric in span_seconds.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_count") and sample.labels["kind"] == "request" and sample.labels["name"] == name
+    )
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.add_middleware(RequestTracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with span("sql", "select"):
+            pass
+        return {"item_id": item_id}
+
+    app.mount("/files", StaticFiles(directory=str(tmp_path)), name="files")
+    return TestClient(app)
+
+
+def test_requests_are_labelled_by_route_template(client):
+    before = _request_count("GET /items/{item_id}")
+    for item_id in ("a", "b", "c"):
+        client.get(f"/items/{item_id}").raise_for_status()
+    assert _request_count("GET /items/{item_id}") == before + 3
+
+
+def test_mounts_and_unmatched_paths_have_fixed_labels(client):
+    files, unmatched = _request_count("GET /files/{path}"), _request_count("GET unmatched")
+    client.get("/files/complaints/x.png")
+    client.get("/no/such/path/123")
+    assert _request_count("GET /files/{path}") == files + 1
+    assert _request_count("GET unmatched") == unmatched + 1
+
+
+def test_request_id_is_echoed_and_spans_are_traced(client):
+    response = client.get("/items/a", headers={"x-request-id": "req-1", "session-id": "s-1"})
+    assert response.headers["x-request-id"] == "req-1"
+
+    trace = trace_log.recent(1, session_id="s-1")[0]
+    assert trace["route"] == "GET /items/{item_id}" and trace["status_code"] == 200
+    assert trace["breakdown"]["sql"]["count"] == 1
+
+
+def test_summarize_groups_spans_by_kind():
+    trace, token = start_trace("r")
+    try:
+        record_span("llm", "groq/model", 0.25)
+        record_span("llm", "groq/model", 0.5)
+        record_span("sql", "select", 0.001)
+    finally:
+        current_trace.reset(token)
+    assert summarize(trace) == {"llm": {"count": 2, "ms": 750.0}, "sql": {"count": 1, "ms": 1.0}}
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from core.search.vector_index import VectorIndex
+
+TEXTS = [
+    "Sony WH-1000XM4 wireless noise cancelling headphones",
+    "Samsung Galaxy S21 smartphone 128GB",
+    "Dell XPS 13 laptop",
+    "Waterproof hiking jacket for men",
+]
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_nearest_product_ranks_first(quantize):
+    index = VectorIndex(dim=256, quantize=quantize)
+    index.add_documents(TEXTS[:2])
+    index.add_documents(TEXTS[2:])
+    index.finalize()
+
+    (score, position), *_ = index.search("noise cancelling headphone", k=2)
+    assert position == 0 and score > 0
+
+
+def test_quantized_index_is_a_quarter_of_the_size():
+    full, small = VectorIndex(dim=256), VectorIndex(dim=256, quantize=True)
+    for index in (full, small):
+        index.add_documents(TEXTS)
+        index.finalize()
+    # int8 vectors plus one float32 scale per row.
+    assert small.nbytes() == full.nbytes() // 4 + 4 * len(TEXTS)
+
+
+def test_memory_mapped_index_removes_its_files(tmp_path):
+    path = str(tmp_path / "catalog_v1")
+    index = VectorIndex(dim=64, quantize=True, mmap_path=path, capacity=len(TEXTS))
+    index.add_documents(TEXTS)
+    index.finalize()
+
+    assert index.search("dell laptop", k=1)[0][1] == 2
+    assert not os.path.exists(path + ".raw.npy")
+    index.remove_files()
+    assert not os.path.exists(path + ".int8.npy")
+
+
+def test_capacity_is_enforced(tmp_path):
+    index = VectorIndex(dim=64, mmap_path=str(tmp_path / "v"), capacity=1)
+    with pytest.raises(ValueError):
+        index.add_documents(TEXTS[:2])
@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import io
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import UploadFile
+
+from common.registry import registry
+from common.telemetry import span
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# supabase - the Supabase storage bucket (production)
+# local    - files under LOCAL_STORAGE_DIR, served by the app at LOCAL_STORAGE_URL
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "complaints")
+LOCAL_STORAGE_DIR = os.path.abspath(os.getenv("LOCAL_STORAGE_DIR", "storage"))
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/files").rstrip("/")
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "4"))
+UPLOAD_WAIT_TIMEOUT = float(os.getenv("UPLOAD_WAIT_TIMEOUT", "120"))
+
+
+# Storage paths are built from the session id header and the file name, both
+# client-controlled; anything outside this set is dropped.
+UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def storage_path(order_id: str, filename: str) -> str:
+    """`<order id>_<uuid>.<ext>` with both parts reduced to letters, digits, `_` and `-`."""
+    order_id = UNSAFE_PATH_CHARS.sub("", order_id or "")[:64] or "upload"
+    _, _, file_ext = (filename or "").rpartition(".")
+    file_ext = UNSAFE_PATH_CHARS.sub("", file_ext)[:16] if "." in (filename or "") else ""
+    path = f"{order_id}_{uuid.uuid4().hex}"
+    return f"{path}.{file_ext}" if file_ext else path
+
+
+class LimitedReader(io.RawIOBase):
+    """Reads a file object in chunks and fails as soon as more than `limit` bytes have come through."""
+
+    def __init__(self, source, name: str, limit: int):
+        self._source = source
+        self.name = name
+        self.limit = limit
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._source.read(min(len(buffer), UPLOAD_CHUNK_BYTES))
+        self.bytes_read += len(data)
+        if self.bytes_read > self.limit:
+            raise UploadTooLarge(f"file is larger than the {self.limit} byte limit")
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def build_supabase_client():
+    from supabase import create_client
+
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+
+class SupabaseStorage:
+    name = "supabase"
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    def public_url(self, path: str) -> str:
+        # Built from the project URL; no request is made.
+        return registry.get("supabase").storage.from_(self.bucket).get_public_url(path)
+
+    def put(self, path: str, reader, content_type: Optional[str]):
+        # A BufferedReader is sent as a streamed multipart body.
+        options = {"content-type": content_type} if content_type else None
+        res = registry.get("supabase").storage.from_(self.bucket).upload(path, reader, options)
+        if isinstance(res, dict) and res.get("error"):
+            raise RuntimeError(res["error"])
+
+
+class LocalStorage:
+    """Stand-in for Supabase: writes into a directory the app serves as static files."""
+
+    name = "local"
+
+    def __init__(self, root: str, base_url: str, bucket: str):
+        self.root = root
+        self.base_url = base_url
+        self.bucket = bucket
+
+    def public_url(self, path: str) -> str:
+        return f"{self.base_url}/{self.bucket}/{path}"
+
+    def put(self, path: str, reader, content_type: Optional[str]):
+        bucket_dir = os.path.realpath(os.path.join(self.root, self.bucket))
+        target = os.path.realpath(os.path.join(bucket_dir, path))
+        if os.path.dirname(target) != bucket_dir:
+            raise ValueError(f"storage path {path!r} escapes {bucket_dir}")
+        os.makedirs(bucket_dir, exist_ok=True)
+        partial = f"{target}.part"
+        try:
+            with open(partial, "wb") as f:
+                shutil.copyfileobj(reader, f, UPLOAD_CHUNK_BYTES)
+            os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+
+def build_storage():
+    if STORAGE_BACKEND == "local":
+        return LocalStorage(LOCAL_STORAGE_DIR, LOCAL_STORAGE_URL, STORAGE_BUCKET)
+    return SupabaseStorage(STORAGE_BUCKET)
+
+
+registry.register("supabase", build_supabase_client)
+registry.register("storage", build_storage)
+
+
+class UploadTracker:
+    """
+    In-flight and recently finished uploads by public URL, so whoever is handed
+    a URL before its upload finishes (the complaint agent, via save_order_tool)
+    can wait for the file to land and find out whether it did.
+    """
+
+    def __init__(self, maxlen: int = 1024):
+        self._lock = threading.Lock()
+        self._futures = OrderedDict()
+        self._maxlen = maxlen
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.bytes_uploaded = 0
+        self.upload_seconds = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def add(self, url: str, future):
+        with self._lock:
+            self.started += 1
+            self._futures[url] = future
+            while len(self._futures) > self._maxlen:
+                self._futures.popitem(last=False)
+
+    def record_done(self, size: Optional[int], seconds: float):
+        with self._lock:
+            self.upload_seconds += seconds
+            if size is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self.bytes_uploaded += size
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    async def wait(self, url: str, timeout: float = UPLOAD_WAIT_TIMEOUT) -> Optional[str]:
+        """Waits for the upload behind `url`; returns an error message, or None once the file is stored (or untracked)."""
+        with self._lock:
+            future = self._futures.get(url)
+        if future is None:
+            return None
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            return None
+        except asyncio.TimeoutError:
+            return f"upload did not finish within {timeout:.0f}s"
+        except Exception as e:
+            return str(e)
+        finally:
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = sum(1 for future in self._futures.values() if not future.done())
+            finished = self.completed + self.failed
+            return {
+                "backend": STORAGE_BACKEND,
+                "max_bytes": UPLOAD_MAX_BYTES,
+                "max_concurrency": UPLOAD_MAX_CONCURRENCY,
+                "started": self.started,
+                "in_flight": in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "bytes_uploaded": self.bytes_uploaded,
+                "avg_upload_ms": round(self.upload_seconds / finished * 1000, 1) if finished else 0.0,
+                "waits": self.waits,
+                "avg_wait_ms": round(self.wait_seconds / self.waits * 1000, 1) if self.waits else 0.0,
+            }
+
+
+uploads = UploadTracker()
+
+# Storage SDK calls block, so uploads run here; at most UPLOAD_MAX_CONCURRENCY
+# at a time, the rest queue instead of taking threads from the request pool.
+upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_MAX_CONCURRENCY, thread_name_prefix="upload-worker")
+
+
+def _upload(storage, file: UploadFile, path: str) -> int:
+    """Blocking: streams the spooled upload to storage chunk by chunk and returns its size."""
+    reader = io.BufferedReader(LimitedReader(file.file, path, UPLOAD_MAX_BYTES), buffer_size=UPLOAD_CHUNK_BYTES)
+    start = time.perf_counter()
+    size = None
+    try:
+        with span("storage", f"{storage.name}_upload") as attrs:
+            try:
+                storage.put(path, reader, file.content_type)
+            finally:
+                attrs["bytes"] = reader.raw.bytes_read
+        size = reader.raw.bytes_read
+        logger.info(f"[UPLOAD] Stored {path} ({size} bytes) in {time.perf_counter() - start:.2f}s")
+        return size
+    except Exception as e:
+        logger.error(f"[UPLOAD] Storing {path} failed: {e}")
+        raise
+    finally:
+        uploads.record_done(size, time.perf_counter() - start)
+
+
+def start_upload(file: UploadFile, order_id: str) -> str:
+    """
+    Starts uploading `file` on the upload executor and returns its public URL
+    immediately; the URL does not depend on the upload, so the chat turn can
+    run while it is in flight. Raises UploadTooLarge up front when the size is
+    already known to be over the limit.
+    """
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+        uploads.record_rejected()
+        raise UploadTooLarge(f"file is larger than the {UPLOAD_MAX_BYTES} byte limit")
+
+    path = storage_path(order_id, file.filename)
+
+    storage = registry.get("storage")
+    url = storage.public_url(path)
+    ctx = contextvars.copy_context()
+    uploads.add(url, upload_executor.submit(ctx.run, _upload, storage, file, path))
+    return url